@@ -0,0 +1,83 @@
+import io
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+import pandas as pd
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel, ValidationError
+
+from api.core.config import MAX_BATCH_CSV_BYTES, MAX_BATCH_ROWS
+
+READ_CHUNK_BYTES = 1 << 16
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+    )
+
+
+def _read_capped(file: UploadFile, limit: int) -> bytes:
+    chunks, size = [], 0
+    while True:
+        chunk = file.file.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(413, f"{file.filename or 'Upload'} exceeds the {limit // 2**20} MB limit")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def read_csv_records(file: UploadFile) -> List[Dict[str, Any]]:
+    """
+    Parse an uploaded CSV into one dict per row (blank cells become None).
+    The upload is capped at MAX_BATCH_CSV_BYTES while reading and parsing
+    stops one row past MAX_BATCH_ROWS.
+    """
+    data = _read_capped(file, MAX_BATCH_CSV_BYTES)
+    try:
+        df = pd.read_csv(io.BytesIO(data), nrows=MAX_BATCH_ROWS + 1)
+    except Exception:
+        raise HTTPException(400, "Uploaded file is not a readable CSV")
+    if len(df) > MAX_BATCH_ROWS:
+        raise HTTPException(413, f"Batch too large: more than {MAX_BATCH_ROWS} rows")
+
+    df.columns = df.columns.str.strip()
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient="records")
+
+
+def run_batch(
+    records: List[Dict[str, Any]],
+    schema: Type[BaseModel],
+    predict_rows: Callable[[List[BaseModel]], List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """
+    Validate every record against `schema` in one pass, hand all valid rows
+    to `predict_rows` (one vectorized model call), and merge the outcome
+    back into input order. Rows that fail validation or prediction carry an
+    "error" instead of a result, so one bad row never fails the batch.
+    """
+    if len(records) > MAX_BATCH_ROWS:
+        raise HTTPException(413, f"Batch too large: {len(records)} rows (max {MAX_BATCH_ROWS})")
+
+    results: List[Dict[str, Any]] = [None] * len(records)
+    valid: List[Tuple[int, BaseModel]] = []
+
+    for i, record in enumerate(records):
+        try:
+            valid.append((i, schema.parse_obj(record)))
+        except ValidationError as e:
+            results[i] = {"index": i, "error": _format_validation_error(e)}
+
+    if valid:
+        outputs = predict_rows([item for _, item in valid])
+        for (i, _), output in zip(valid, outputs):
+            results[i] = {"index": i, **output}
+
+    return {
+        "count": len(records),
+        "errors": sum(1 for r in results if "error" in r),
+        "results": results,
+    }
@@ -1,17 +1,31 @@
+import os
 from pathlib import Path
 
+# Irrigation crop names -> crop_type_encoded, shared with src/irrigation_scheduler
+from src.irrigation_scheduler.crops import CROP_ENCODING_MAP  # noqa: F401
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 
-CROP_ENCODING_MAP = {
-    "Barley": 0,
-    "Cotton": 1,
-    "Ground Nuts": 2,
-    "Maize": 3,
-    "Millets": 4,
-    "Oil seeds": 5,
-    "Paddy": 6,
-    "Pulses": 7,
-    "Sugarcane": 8,
-    "Tobacco": 9,
-    "Wheat": 10
-}
+# Largest number of records accepted by a single /batch request
+MAX_BATCH_ROWS = 50000
+# Largest CSV accepted by the /batch/csv routes, enforced while reading the upload
+MAX_BATCH_CSV_BYTES = int(float(os.getenv("ANNADATA_MAX_BATCH_CSV_MB", "32")) * 2**20)
+
+# Micro-batching of concurrent single-record requests (per model).
+# A batch is flushed after MICROBATCH_MAX_WAIT_MS or MICROBATCH_MAX_SIZE items.
+MICROBATCH_ENABLED = os.getenv("ANNADATA_MICROBATCH", "1") != "0"
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("ANNADATA_MICROBATCH_WAIT_MS", "2"))
+MICROBATCH_MAX_SIZE = int(os.getenv("ANNADATA_MICROBATCH_MAX_SIZE", "64"))
+
+# Largest image accepted by /predict/disease, enforced while reading the upload
+MAX_IMAGE_BYTES = int(float(os.getenv("ANNADATA_MAX_IMAGE_MB", "10")) * 2**20)
+
+# /predict/disease/batch: most images per request (zip members included)
+# and total upload size
+MAX_DISEASE_BATCH_FILES = int(os.getenv("ANNADATA_DISEASE_BATCH_FILES", "256"))
+MAX_DISEASE_BATCH_BYTES = int(float(os.getenv("ANNADATA_DISEASE_BATCH_MB", "200")) * 2**20)
+
+# Dedicated executor for disease (TensorFlow) inference. Requests beyond
+# workers + queue are rejected with 503 instead of piling up.
+DISEASE_EXECUTOR_WORKERS = int(os.getenv("ANNADATA_DISEASE_WORKERS", str(os.cpu_count() or 1)))
+DISEASE_EXECUTOR_QUEUE = int(os.getenv("ANNADATA_DISEASE_QUEUE", "64"))
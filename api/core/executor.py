@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+_EXECUTORS: Dict[str, "BoundedExecutor"] = {}
+
+
+class BoundedExecutor:
+    """
+    Dedicated thread pool for blocking inference with a bounded backlog.
+
+    At most `max_workers` calls run at once and at most `max_queue` more
+    wait for a thread. `await run(fn, ...)` beyond that raises a 503 right
+    away, so an overloaded worker sheds load instead of letting latency
+    grow without bound. Time spent waiting for a thread is recorded.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._stats_lock = threading.Lock()
+
+        self.in_flight = 0
+        self.running = 0
+        self.submitted = 0
+        self.started = 0
+        self.rejected = 0
+        self.failed = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+        _EXECUTORS[name] = self
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix=f"{self.name}-infer")
+        return self._pool
+
+    def _call(self, enqueued: float, fn: Callable[..., Any], args, kwargs):
+        started = time.perf_counter()
+        waited = started - enqueued
+        with self._stats_lock:
+            self.started += 1
+            self.running += 1
+            self.queue_seconds_total += waited
+            self.queue_seconds_max = max(self.queue_seconds_max, waited)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._stats_lock:
+                self.running -= 1
+                self.run_seconds_total += time.perf_counter() - started
+
+    def _release(self, _future) -> None:
+        # runs when the pool is done with the call (finished or cancelled before
+        # starting), not when the awaiting request goes away: a cancelled request
+        # must keep its slot while its thread is still busy
+        with self._stats_lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the pool, or raise 503 if the backlog is full."""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HTTPException(503, f"{self.name} inference is at capacity, retry shortly",
+                                headers={"Retry-After": "1"})
+
+        with self._stats_lock:
+            self.submitted += 1
+            self.in_flight += 1
+        try:
+            future = self._executor().submit(self._call, time.perf_counter(), fn, args, kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception:
+            self.failed += 1
+            raise
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.started
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": max(self.in_flight - self.running, 0),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "mean_queue_ms": round(1000 * self.queue_seconds_total / started, 3) if started else None,
+            "max_queue_ms": round(1000 * self.queue_seconds_max, 3),
+            "mean_run_ms": round(1000 * self.run_seconds_total / started, 3) if started else None,
+        }
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: e.stats() for name, e in sorted(_EXECUTORS.items())}
+
+
+def shutdown_executors():
+    for executor in _EXECUTORS.values():
+        executor.shutdown()
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from api.core.config import MICROBATCH_ENABLED, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS
+
+# Upper bounds of the batch-size histogram buckets
+_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_BATCHERS: Dict[str, "MicroBatcher"] = {}
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-record requests for one model.
+
+    Handlers `await submit(item)`; a worker task gathers whatever arrives
+    within `max_wait_ms` (or until `max_size` items), runs `predict_rows`
+    once on the whole list in the thread pool, and resolves each caller's
+    future with its own result. `predict_rows` must return one result per
+    item, in order. When a batch raises, its items are retried one at a
+    time so only the callers whose own record fails get the exception.
+    """
+
+    def __init__(self, name: str, predict_rows: Callable[[List[Any]], List[Any]],
+                 max_wait_ms: float = MICROBATCH_MAX_WAIT_MS,
+                 max_size: int = MICROBATCH_MAX_SIZE,
+                 enabled: bool = MICROBATCH_ENABLED):
+        self.name = name
+        self.predict_rows = predict_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_size = max(1, max_size)
+        self.enabled = enabled
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.batches = 0
+        self.size_histogram = {b: 0 for b in _SIZE_BUCKETS}
+        self.size_histogram["+Inf"] = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+        self.failed_batches = 0
+
+        _BATCHERS[name] = self
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        # (re)bind to the running loop, e.g. after a test client restarts the app
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one record and wait for its result."""
+        self.requests += 1
+        if not self.enabled:
+            self._observe(1, 0.0)
+            return (await run_in_threadpool(self.predict_rows, [item]))[0]
+
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # anything already queued rides along for free
+        while len(batch) < self.max_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self._observe_wait(started - enqueued)
+            self._observe(len(batch), None)
+
+            items = [item for item, _, _ in batch]
+            try:
+                outcomes = [(None, result) for result in await run_in_threadpool(self._predict, items)]
+            except Exception as e:
+                self.failed_batches += 1
+                outcomes = [(e, None)] if len(items) == 1 else await run_in_threadpool(self._predict_each, items)
+            finally:
+                self.run_seconds_total += time.perf_counter() - started
+
+            for (_, future, _), (error, result) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _predict(self, items: List[Any]) -> List[Any]:
+        results = self.predict_rows(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"{self.name}: predict_rows returned {len(results)} results for {len(items)} items"
+            )
+        return results
+
+    def _predict_each(self, items: List[Any]) -> List[Any]:
+        """(error, result) per item, each predicted on its own after its batch failed."""
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append((None, self._predict([item])[0]))
+            except Exception as e:
+                outcomes.append((e, None))
+        return outcomes
+
+    def _observe_wait(self, seconds: float):
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def _observe(self, size: int, wait: Optional[float]):
+        self.batches += 1
+        for bound in _SIZE_BUCKETS:
+            if size <= bound:
+                self.size_histogram[bound] += 1
+                break
+        else:
+            self.size_histogram["+Inf"] += 1
+        if wait is not None:
+            self._observe_wait(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_size": self.max_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 3) if self.batches else None,
+            "batch_size_histogram": {str(k): v for k, v in self.size_histogram.items()},
+            "mean_wait_ms": round(1000 * self.wait_seconds_total / self.requests, 3) if self.requests else None,
+            "max_wait_ms_observed": round(1000 * self.wait_seconds_max, 3),
+            "mean_batch_run_ms": round(1000 * self.run_seconds_total / self.batches, 3) if self.batches else None,
+            "failed_batches": self.failed_batches,
+        }
+
+
+def batching_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: b.stats() for name, b in sorted(_BATCHERS.items())}
@@ -1,5 +1,8 @@
 from fastapi import FastAPI
-from api.routers import crop, fertilizer, yield_, irrigation, soil_health, disease
+from api.routers import crop, fertilizer, yield_, irrigation, soil_health, disease, metrics
+from api.core.executor import shutdown_executors
+from api.core.logging import logger
+from src.serving import registry
 
 app = FastAPI(title="AnnadataAI API")
 
@@ -9,6 +12,33 @@ app.include_router(yield_.router)
 app.include_router(irrigation.router)
 app.include_router(soil_health.router)
 app.include_router(disease.router)
+app.include_router(metrics.router)
+
+@app.on_event("startup")
+def warm_models():
+    # Load every registered artifact once so no request pays deserialization
+    for name, info in registry.warm().items():
+        if info.get("loaded"):
+            logger.info(
+                "Model %s loaded in %.2fs (+%.1f MB RSS)",
+                name, info["load_seconds"], info["rss_delta_bytes"] / 2**20
+            )
+        else:
+            logger.warning("Model %s not loaded: %s", name, info.get("error"))
+
+    memory = registry.process_memory()
+    logger.info(
+        "Worker %s resident: %.1f MB RSS, %.1f MB PSS",
+        memory["pid"], memory["rss"] / 2**20, memory.get("pss", memory["rss"]) / 2**20
+    )
+
+    # Pick up retrained artifacts without restarting the worker
+    registry.start_watcher()
+
+@app.on_event("shutdown")
+def stop_model_watcher():
+    registry.stop_watcher()
+    shutdown_executors()
 
 @app.get("/")
 def home():
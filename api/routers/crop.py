@@ -1,72 +1,116 @@
-from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, File, HTTPException, UploadFile
 from fastapi.encoders import jsonable_encoder
 from api.schemas.crop import CropInput
+from api.core.batch import read_csv_records, run_batch
 from api.core.logging import logger
+from api.core.microbatch import MicroBatcher
 
 router = APIRouter(prefix="/predict", tags=["Crop"])
 
 try:
-    from src.recommendation.predict import predict as legacy_crop_predict
+    from src.recommendation.predict import predict_batch as legacy_crop_predict_batch
 except Exception:
-    legacy_crop_predict = None
+    legacy_crop_predict_batch = None
+
+
+def _normalize_result(result):
+    # --------------------------------------------------
+    # Normalize legacy model output (IMPORTANT)
+    # --------------------------------------------------
+
+    # Case 1: legacy returns string
+    if isinstance(result, str):
+        return {
+            "recommended_crop": result,
+            "top3": [{"crop": result}],
+            "rationale": "Crop recommended based on soil and weather conditions"
+        }
+
+    # Case 2: legacy returns dict with top3
+    if isinstance(result, dict):
+        recommended = result.get("recommended_crop", "—")
+
+        # If recommended is dict, extract crop name
+        if isinstance(recommended, dict):
+            recommended = recommended.get("crop", "—")
+
+        top3_raw = result.get("top3", [])
+        top3 = []
+
+        for item in top3_raw:
+            if isinstance(item, dict) and "crop" in item:
+                top3.append({"crop": item["crop"]})
+            elif isinstance(item, str):
+                top3.append({"crop": item})
+
+        if not top3 and recommended != "—":
+            top3 = [{"crop": recommended}]
+
+        return {
+            "recommended_crop": recommended,
+            "top3": top3,
+            "rationale": result.get(
+                "rationale",
+                "Top crops selected based on predicted suitability"
+            )
+        }
+
+    # Fallback (should not happen)
+    return {
+        "recommended_crop": "Unknown",
+        "top3": [],
+        "rationale": "Unable to determine crop"
+    }
+
+
+def _predict_crop_rows(rows: List[CropInput]):
+    results = legacy_crop_predict_batch([row.dict() for row in rows])
+    return [_normalize_result(result) for result in results]
+
+
+# concurrent single-record requests share one predict_proba call
+_batcher = MicroBatcher("crop", _predict_crop_rows)
 
 
 @router.post("/crop")
-def predict_crop(data: CropInput):
-    if legacy_crop_predict is None:
+async def predict_crop(data: CropInput):
+    if legacy_crop_predict_batch is None:
         raise HTTPException(503, "Crop predictor unavailable")
 
     try:
-        result = legacy_crop_predict(data.dict())
-
-        # --------------------------------------------------
-        # Normalize legacy model output (IMPORTANT)
-        # --------------------------------------------------
-
-        # Case 1: legacy returns string
-        if isinstance(result, str):
-            return jsonable_encoder({
-                "recommended_crop": result,
-                "top3": [{"crop": result}],
-                "rationale": "Crop recommended based on soil and weather conditions"
-            })
-
-        # Case 2: legacy returns dict with top3
-        if isinstance(result, dict):
-            recommended = result.get("recommended_crop", "—")
-
-            # If recommended is dict, extract crop name
-            if isinstance(recommended, dict):
-                recommended = recommended.get("crop", "—")
-
-            top3_raw = result.get("top3", [])
-            top3 = []
-
-            for item in top3_raw:
-                if isinstance(item, dict) and "crop" in item:
-                    top3.append({"crop": item["crop"]})
-                elif isinstance(item, str):
-                    top3.append({"crop": item})
-
-            if not top3 and recommended != "—":
-                top3 = [{"crop": recommended}]
-
-            return jsonable_encoder({
-                "recommended_crop": recommended,
-                "top3": top3,
-                "rationale": result.get(
-                    "rationale",
-                    "Top crops selected based on predicted suitability"
-                )
-            })
-
-        # Fallback (should not happen)
-        return jsonable_encoder({
-            "recommended_crop": "Unknown",
-            "top3": [],
-            "rationale": "Unable to determine crop"
-        })
+        result = await _batcher.submit(data)
+        return jsonable_encoder(result)
 
+    except FileNotFoundError:
+        logger.exception("Crop model missing")
+        raise HTTPException(503, "Crop predictor unavailable")
     except Exception:
         logger.exception("Crop prediction error")
         raise HTTPException(500, "Internal server error")
+
+
+def _crop_batch(records):
+    if legacy_crop_predict_batch is None:
+        raise HTTPException(503, "Crop predictor unavailable")
+
+    try:
+        return jsonable_encoder(run_batch(records, CropInput, _predict_crop_rows))
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        logger.exception("Crop model missing")
+        raise HTTPException(503, "Crop predictor unavailable")
+    except Exception:
+        logger.exception("Crop batch prediction error")
+        raise HTTPException(500, "Internal server error")
+
+
+@router.post("/crop/batch")
+def predict_crop_batch(records: List[Dict[str, Any]] = Body(...)):
+    return _crop_batch(records)
+
+
+@router.post("/crop/batch/csv")
+def predict_crop_batch_csv(file: UploadFile = File(...)):
+    return _crop_batch(read_csv_records(file))
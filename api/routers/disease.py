@@ -1,31 +1,128 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import io
+import zipfile
+from typing import List, Tuple
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
-import shutil, uuid
-from api.core.config import BASE_DIR
+from api.core.config import (
+    MAX_IMAGE_BYTES, MAX_DISEASE_BATCH_FILES, MAX_DISEASE_BATCH_BYTES,
+    DISEASE_EXECUTOR_WORKERS, DISEASE_EXECUTOR_QUEUE,
+)
+from api.core.executor import BoundedExecutor
 from api.core.logging import logger
 
 router = APIRouter(prefix="/predict", tags=["Disease"])
 
-from src.disease_prediction.predict import predict_disease
+from src.disease_prediction.predict import predict_disease, predict_disease_batch
+
+READ_CHUNK_BYTES = 1 << 16
+
+# TensorFlow calls block; they run here so the event loop keeps serving
+_executor = BoundedExecutor("disease", DISEASE_EXECUTOR_WORKERS, DISEASE_EXECUTOR_QUEUE)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tif", ".tiff")
+
+
+async def read_upload(file: UploadFile, limit: int = MAX_IMAGE_BYTES) -> bytes:
+    """Read an upload into memory, rejecting it as soon as it exceeds `limit`."""
+    chunks, size = [], 0
+    while True:
+        chunk = await file.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(413, f"{file.filename or 'Upload'} exceeds the {limit // 2**20} MB limit")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _is_zip(file: UploadFile) -> bool:
+    return (file.content_type in ("application/zip", "application/x-zip-compressed")
+            or (file.filename or "").lower().endswith(".zip"))
+
+
+def _zip_images(name: str, data: bytes, budget: int) -> List[Tuple[str, bytes]]:
+    """Image members of a zip archive, checked against size limits before extraction."""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise HTTPException(400, f"{name} is not a valid zip archive")
+
+    images = []
+    with archive:
+        for info in archive.infolist():
+            member = info.filename
+            if info.is_dir() or member.startswith("__MACOSX/") or not member.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            if info.file_size > MAX_IMAGE_BYTES:
+                raise HTTPException(413, f"{name}:{member} exceeds the {MAX_IMAGE_BYTES // 2**20} MB limit")
+            budget -= info.file_size
+            if budget < 0:
+                raise HTTPException(413, f"Batch exceeds the {MAX_DISEASE_BATCH_BYTES // 2**20} MB limit")
+            images.append((f"{name}/{member}", archive.read(info)))
+    return images
 
-TEMP_DIR = BASE_DIR / "temp"
-TEMP_DIR.mkdir(exist_ok=True)
 
 @router.post("/disease")
 async def predict_disease_api(file: UploadFile = File(...)):
-    if not file.content_type.startswith("image/"):
+    if not (file.content_type or "").startswith("image/"):
         raise HTTPException(400, "Uploaded file must be an image")
 
-    temp_path = TEMP_DIR / f"{uuid.uuid4().hex}_{file.filename}"
+    data = await read_upload(file)
 
     try:
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        return jsonable_encoder(predict_disease(str(temp_path)))
+        return jsonable_encoder(await _executor.run(predict_disease, data))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception:
         logger.exception("Disease prediction error")
         raise HTTPException(500, "Internal server error")
-    finally:
-        if temp_path.exists():
-            temp_path.unlink()
+
+
+@router.post("/disease/batch")
+async def predict_disease_batch_api(
+    files: List[UploadFile] = File(...),
+    top_k: int = Query(3, ge=1, le=10),
+):
+    """
+    Classify many leaf photos in one request: several image files, zip
+    archives of images, or both. Results keep upload order (zip members in
+    archive order); an image that cannot be decoded gets an "error" entry.
+    """
+    images: List[Tuple[str, bytes]] = []
+    budget = MAX_DISEASE_BATCH_BYTES
+    for file in files:
+        if budget <= 0:
+            raise HTTPException(413, f"Batch exceeds the {MAX_DISEASE_BATCH_BYTES // 2**20} MB limit")
+        data = await read_upload(file, limit=budget)
+        if _is_zip(file):
+            members = _zip_images(file.filename or "upload.zip", data, budget)
+            budget -= sum(len(d) for _, d in members)
+            images.extend(members)
+        else:
+            if len(data) > MAX_IMAGE_BYTES:
+                raise HTTPException(413, f"{file.filename} exceeds the {MAX_IMAGE_BYTES // 2**20} MB limit")
+            budget -= len(data)
+            images.append((file.filename, data))
+        if len(images) > MAX_DISEASE_BATCH_FILES:
+            raise HTTPException(413, f"Batch exceeds {MAX_DISEASE_BATCH_FILES} images")
+
+    try:
+        predictions = await _executor.run(predict_disease_batch, [d for _, d in images], top_k)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Disease batch prediction error")
+        raise HTTPException(500, "Internal server error")
+
+    results = [
+        {"index": i, "filename": name, **prediction}
+        for i, ((name, _), prediction) in enumerate(zip(images, predictions))
+    ]
+    return jsonable_encoder({
+        "count": len(results),
+        "errors": sum(1 for r in results if "error" in r),
+        "results": results,
+    })
@@ -1,26 +1,74 @@
-from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, File, HTTPException, UploadFile
 from fastapi.encoders import jsonable_encoder
 from api.schemas.fertilizer import FertilizerInput
+from api.core.batch import read_csv_records, run_batch
 from api.core.logging import logger
+from api.core.microbatch import MicroBatcher
 
 router = APIRouter(prefix="/predict", tags=["Fertilizer"])
 
 try:
-    from src.fertilizer_recom.predict import predict_from_dict
+    from src.fertilizer_recom.predict import predict_batch_from_dicts
     _fert_available = True
 except Exception:
-    predict_from_dict = None
+    predict_batch_from_dicts = None
     _fert_available = False
 
+
+def _payload(data: FertilizerInput):
+    payload = data.dict(by_alias=True, exclude_none=True)
+    if "Temparature" in payload and "Temperature" not in payload:
+        payload["Temperature"] = payload.pop("Temparature")
+    return payload
+
+
+def _predict_fertilizer_rows(rows: List[FertilizerInput]):
+    return predict_batch_from_dicts([_payload(row) for row in rows])
+
+
+# concurrent single-record requests share one pipeline.predict call
+_batcher = MicroBatcher("fertilizer", _predict_fertilizer_rows)
+
+
 @router.post("/fertilizer")
-def predict_fertilizer(data: FertilizerInput):
+async def predict_fertilizer(data: FertilizerInput):
     if not _fert_available:
         raise HTTPException(503, "Fertilizer predictor unavailable")
     try:
-        payload = data.dict(by_alias=True, exclude_none=True)
-        if "Temparature" in payload and "Temperature" not in payload:
-            payload["Temperature"] = payload.pop("Temparature")
-        return jsonable_encoder(predict_from_dict(payload))
+        result = await _batcher.submit(data)
+    except FileNotFoundError:
+        logger.exception("Fertilizer model missing")
+        raise HTTPException(503, "Fertilizer predictor unavailable")
     except Exception:
         logger.exception("Fertilizer prediction error")
         raise HTTPException(500, "Internal server error")
+
+    if "error" in result:
+        raise HTTPException(400, result["error"])
+    return jsonable_encoder(result)
+
+
+def _fertilizer_batch(records):
+    if not _fert_available:
+        raise HTTPException(503, "Fertilizer predictor unavailable")
+    try:
+        return jsonable_encoder(run_batch(records, FertilizerInput, _predict_fertilizer_rows))
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        logger.exception("Fertilizer model missing")
+        raise HTTPException(503, "Fertilizer predictor unavailable")
+    except Exception:
+        logger.exception("Fertilizer batch prediction error")
+        raise HTTPException(500, "Internal server error")
+
+
+@router.post("/fertilizer/batch")
+def predict_fertilizer_batch(records: List[Dict[str, Any]] = Body(...)):
+    return _fertilizer_batch(records)
+
+
+@router.post("/fertilizer/batch/csv")
+def predict_fertilizer_batch_csv(file: UploadFile = File(...)):
+    return _fertilizer_batch(read_csv_records(file))
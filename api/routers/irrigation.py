@@ -1,39 +1,132 @@
-from fastapi import APIRouter, HTTPException
-from api.schemas.irrigation import IrrigationInput
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, File, HTTPException, Query, UploadFile
+from api.schemas.irrigation import IrrigationInput, IrrigationPlanInput
+from api.core.batch import read_csv_records, run_batch
 from api.core.config import CROP_ENCODING_MAP
 from api.core.logging import logger
+from api.core.microbatch import MicroBatcher
 
 router = APIRouter(prefix="/predict", tags=["Irrigation"])
 
 try:
-    from src.irrigation_scheduler.scheduler import irrigation_scheduler
+    from src.irrigation_scheduler.scheduler import irrigation_scheduler_batch
     _available = True
 except Exception:
-    irrigation_scheduler = None
+    irrigation_scheduler_batch = None
     _available = False
 
-@router.post("/irrigation")
-def predict_irrigation(data: IrrigationInput):
-    if not _available:
-        raise HTTPException(503, "Irrigation scheduler unavailable")
+from src.irrigation_scheduler.planner import DEFAULT_HORIZON_DAYS, MAX_HORIZON_DAYS, plan_fields
 
+
+def _encode(data: IrrigationInput):
     crop = data.crop_type.strip()
     rain = data.rain_forecast.lower()
 
     if crop not in CROP_ENCODING_MAP:
-        raise HTTPException(400, f"Unsupported crop type: {crop}")
+        raise ValueError(f"Unsupported crop type: {crop}")
 
     rain_encoded = 1 if rain == "yes" else 0
 
+    return dict(
+        soil_moisture=data.soil_moisture,
+        temperature=data.temperature,
+        humidity=data.humidity,
+        rain_forecast=rain_encoded,
+        crop_type_encoded=CROP_ENCODING_MAP[crop],
+    )
+
+
+def _predict_irrigation_rows(rows: List[IrrigationInput]):
+    results = [None] * len(rows)
+    readings, positions = [], []
+    for i, row in enumerate(rows):
+        try:
+            readings.append(_encode(row))
+            positions.append(i)
+        except ValueError as e:
+            results[i] = {"error": str(e)}
+
+    for i, decision in zip(positions, irrigation_scheduler_batch(readings)):
+        results[i] = {"irrigation_decision": decision}
+    return results
+
+
+# concurrent single-record requests share one model.predict call
+_batcher = MicroBatcher("irrigation", irrigation_scheduler_batch)
+
+
+@router.post("/irrigation")
+async def predict_irrigation(data: IrrigationInput):
+    if not _available:
+        raise HTTPException(503, "Irrigation scheduler unavailable")
+
     try:
-        decision = irrigation_scheduler(
-            soil_moisture=data.soil_moisture,
-            temperature=data.temperature,
-            humidity=data.humidity,
-            rain_forecast=rain_encoded,
-            crop_type_encoded=CROP_ENCODING_MAP[crop],
-        )
+        features = _encode(data)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    try:
+        decision = await _batcher.submit(features)
         return {"irrigation_decision": decision}
+    except FileNotFoundError:
+        logger.exception("Irrigation model missing")
+        raise HTTPException(503, "Irrigation scheduler unavailable")
     except Exception:
         logger.exception("Irrigation error")
         raise HTTPException(500, "Internal server error")
+
+
+def _irrigation_batch(records):
+    if not _available:
+        raise HTTPException(503, "Irrigation scheduler unavailable")
+    try:
+        return run_batch(records, IrrigationInput, _predict_irrigation_rows)
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        logger.exception("Irrigation model missing")
+        raise HTTPException(503, "Irrigation scheduler unavailable")
+    except Exception:
+        logger.exception("Irrigation batch error")
+        raise HTTPException(500, "Internal server error")
+
+
+@router.post("/irrigation/batch")
+def predict_irrigation_batch(records: List[Dict[str, Any]] = Body(...)):
+    return _irrigation_batch(records)
+
+
+@router.post("/irrigation/batch/csv")
+def predict_irrigation_batch_csv(file: UploadFile = File(...)):
+    return _irrigation_batch(read_csv_records(file))
+
+
+def _plan_rows(rows: List[IrrigationPlanInput], days: int):
+    results = [None] * len(rows)
+    fields, positions = [], []
+    for i, row in enumerate(rows):
+        crop = row.crop_type.strip()
+        if crop not in CROP_ENCODING_MAP:
+            results[i] = {"error": f"Unsupported crop type: {crop}"}
+        elif not row.forecast:
+            results[i] = {"error": "forecast must contain at least one day"}
+        else:
+            fields.append(row.dict())
+            positions.append(i)
+
+    for i, plan in zip(positions, plan_fields(fields, days)):
+        results[i] = plan
+    return results
+
+
+@router.post("/irrigation/plan")
+def plan_irrigation(records: List[Dict[str, Any]] = Body(...),
+                    days: int = Query(DEFAULT_HORIZON_DAYS, ge=1, le=MAX_HORIZON_DAYS)):
+    """Day-by-day irrigation schedule per field from its weather forecast (soil water balance)."""
+    try:
+        return run_batch(records, IrrigationPlanInput, lambda rows: _plan_rows(rows, days))
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Irrigation planning error")
+        raise HTTPException(500, "Internal server error")
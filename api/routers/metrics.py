@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.encoders import jsonable_encoder
+from api.core.executor import executor_stats
+from api.core.microbatch import batching_stats
+from src.serving import registry
+from src.serving.cache import cache_stats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/models")
+def model_metrics():
+    return jsonable_encoder(registry.stats())
+
+@router.get("/process")
+def process_metrics():
+    # per-worker numbers: each uvicorn worker answers for itself
+    return registry.process_memory()
+
+@router.get("/batching")
+def batching_metrics():
+    return batching_stats()
+
+@router.get("/executors")
+def executor_metrics():
+    return executor_stats()
+
+@router.get("/cache")
+def cache_metrics():
+    return cache_stats()
@@ -1,27 +1,61 @@
-from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, File, HTTPException, UploadFile
 from fastapi.encoders import jsonable_encoder
-import joblib, pandas as pd
 from api.schemas.soil_health import SoilHealthInput
-from api.core.config import BASE_DIR
+from api.core.batch import read_csv_records, run_batch
 from api.core.logging import logger
+from api.core.microbatch import MicroBatcher
 
 router = APIRouter(prefix="/predict", tags=["Soil Health"])
 
-MODEL_PATH = BASE_DIR / "models" / "soil_health" / "soil_health_model.pkl"
-soil_health_model = joblib.load(MODEL_PATH)
-FEATURES = ["N", "P", "K", "ph"]
+try:
+    from src.soil_health.prediction import predict_soil_health_batch
+    _available = True
+except Exception:
+    predict_soil_health_batch = None
+    _available = False
+
+def _predict_soil_health_rows(rows: List[SoilHealthInput]):
+    return predict_soil_health_batch([row.dict() for row in rows])
+
+# concurrent single-record requests share one predict_proba call
+_batcher = MicroBatcher("soil_health", _predict_soil_health_rows)
 
 @router.post("/soil-health")
-def predict_soil_health(data: SoilHealthInput):
+async def predict_soil_health(data: SoilHealthInput):
+    if not _available:
+        raise HTTPException(503, "Soil health predictor unavailable")
     try:
-        df = pd.DataFrame([[data.N, data.P, data.K, data.ph]], columns=FEATURES)
-        prediction = soil_health_model.predict(df)[0]
-        probs = soil_health_model.predict_proba(df)[0]
-        return jsonable_encoder({
-            "soil_health_class": prediction,
-            "confidence": round(max(probs), 3),
-            "class_probabilities": dict(zip(soil_health_model.classes_, probs))
-        })
+        result = await _batcher.submit(data)
+    except FileNotFoundError:
+        logger.exception("Soil health model missing")
+        raise HTTPException(503, "Soil health predictor unavailable")
     except Exception:
         logger.exception("Soil health error")
         raise HTTPException(500, "Internal server error")
+
+    if "error" in result:
+        raise HTTPException(400, result["error"])
+    return jsonable_encoder(result)
+
+def _soil_health_batch(records):
+    if not _available:
+        raise HTTPException(503, "Soil health predictor unavailable")
+    try:
+        return jsonable_encoder(run_batch(records, SoilHealthInput, _predict_soil_health_rows))
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        logger.exception("Soil health model missing")
+        raise HTTPException(503, "Soil health predictor unavailable")
+    except Exception:
+        logger.exception("Soil health batch error")
+        raise HTTPException(500, "Internal server error")
+
+@router.post("/soil-health/batch")
+def predict_soil_health_batch_api(records: List[Dict[str, Any]] = Body(...)):
+    return _soil_health_batch(records)
+
+@router.post("/soil-health/batch/csv")
+def predict_soil_health_batch_csv(file: UploadFile = File(...)):
+    return _soil_health_batch(read_csv_records(file))
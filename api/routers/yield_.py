@@ -1,21 +1,72 @@
-from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, File, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
 from api.schemas.yield_ import YieldInput
+from api.core.batch import read_csv_records, run_batch
 from api.core.logging import logger
+from api.core.microbatch import MicroBatcher
 
 router = APIRouter(prefix="/predict", tags=["Yield"])
 
 try:
-    from src.yield_pred.predict import predict_single, load_model
-    _model = load_model()
+    from src.yield_pred.predict import predict_batch, load_model
+    _available = True
 except Exception:
-    _model = None
+    predict_batch, load_model = None, None
+    _available = False
 
-@router.post("/yield")
-def predict_yield(data: YieldInput):
-    if _model is None:
+
+def _resident_model():
+    if not _available:
+        raise HTTPException(503, "Yield predictor unavailable")
+    try:
+        return load_model()
+    except FileNotFoundError:
+        logger.exception("Yield model missing")
         raise HTTPException(503, "Yield predictor unavailable")
+
+
+def _predict_yield_rows(rows: List[YieldInput]):
+    return predict_batch([row.dict() for row in rows], model=load_model())
+
+
+# concurrent single-record requests share one model.predict call
+_batcher = MicroBatcher("yield", _predict_yield_rows)
+
+
+@router.post("/yield")
+async def predict_yield(data: YieldInput):
+    _resident_model()
     try:
-        return {"predicted_yield": predict_single(data.dict(), model=_model)}
+        result = await _batcher.submit(data)
     except Exception:
         logger.exception("Yield prediction error")
         raise HTTPException(500, "Internal server error")
+
+    if "error" in result:
+        raise HTTPException(400, result["error"])
+    return result
+
+
+def _yield_batch(records):
+    model = _resident_model()
+    try:
+        return jsonable_encoder(run_batch(
+            records, YieldInput,
+            lambda rows: predict_batch([row.dict() for row in rows], model=model)
+        ))
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Yield batch prediction error")
+        raise HTTPException(500, "Internal server error")
+
+
+@router.post("/yield/batch")
+def predict_yield_batch(records: List[Dict[str, Any]] = Body(...)):
+    return _yield_batch(records)
+
+
+@router.post("/yield/batch/csv")
+def predict_yield_batch_csv(file: UploadFile = File(...)):
+    return _yield_batch(read_csv_records(file))
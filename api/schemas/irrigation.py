@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class IrrigationInput(BaseModel):
@@ -6,3 +7,17 @@ class IrrigationInput(BaseModel):
     humidity: float
     rain_forecast: str = Field(..., example="no")
     crop_type: str = Field(..., example="Maize")
+
+
+class ForecastDay(BaseModel):
+    temperature: float
+    humidity: float
+    rain_probability: float = Field(..., ge=0, le=1, example=0.2)
+    rain_mm: Optional[float] = None
+
+
+class IrrigationPlanInput(BaseModel):
+    field_id: Optional[str] = None
+    soil_moisture: float
+    crop_type: str = Field(..., example="Maize")
+    forecast: List[ForecastDay]
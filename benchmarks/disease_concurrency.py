@@ -0,0 +1,100 @@
+# benchmarks/disease_concurrency.py
+# 32 parallel /predict/disease uploads against one worker, with /health
+# polled meanwhile, comparing:
+#   inline    TensorFlow called directly inside the async handler (blocks the loop)
+#   executor  the current router, which dispatches to the bounded executor
+#
+#   python -m benchmarks.disease_concurrency [--uploads 32] [--image leaf.jpg]
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+import warnings
+
+import httpx
+import numpy as np
+from fastapi import FastAPI, File, UploadFile
+
+
+def _sample_image() -> bytes:
+    from PIL import Image
+    pixels = np.random.default_rng(0).integers(0, 255, (256, 256, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _inline_app() -> FastAPI:
+    from src.disease_prediction.predict import predict_disease
+
+    app = FastAPI()
+
+    @app.post("/predict/disease")
+    async def predict(file: UploadFile = File(...)):
+        return predict_disease(await file.read())
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    return app
+
+
+async def _run(app, image: bytes, uploads: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        files = {"file": ("leaf.jpg", image, "image/jpeg")}
+        await client.post("/predict/disease", files=files)  # warm up
+
+        done = asyncio.Event()
+        health_ms = []
+
+        async def poll_health():
+            while not done.is_set():
+                t = time.perf_counter()
+                await client.get("/health")
+                health_ms.append((time.perf_counter() - t) * 1000)
+                await asyncio.sleep(0.01)
+
+        poller = asyncio.create_task(poll_health())
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[client.post("/predict/disease", files=files) for _ in range(uploads)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poller
+
+    codes = [r.status_code for r in responses]
+    return {
+        "seconds": elapsed,
+        "ok": codes.count(200),
+        "rejected": codes.count(503),
+        "health_p50": statistics.median(health_ms) if health_ms else float("nan"),
+        "health_max": max(health_ms) if health_ms else float("nan"),
+        "health_n": len(health_ms),
+    }
+
+
+async def main(uploads: int, image: bytes):
+    from api.main import app
+
+    print(f"{uploads} concurrent uploads\n")
+    print(f"{'mode':10s} {'total s':>8s} {'img/s':>7s} {'ok':>4s} {'503':>4s} "
+          f"{'/health p50 ms':>15s} {'max ms':>8s} {'polls':>6s}")
+    for mode, target in (("inline", _inline_app()), ("executor", app)):
+        async with app.router.lifespan_context(app):
+            r = await _run(target, image, uploads)
+        print(f"{mode:10s} {r['seconds']:8.2f} {r['ok'] / r['seconds']:7.1f} {r['ok']:4d} {r['rejected']:4d} "
+              f"{r['health_p50']:15.1f} {r['health_max']:8.1f} {r['health_n']:6d}")
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    parser = argparse.ArgumentParser(description="Disease endpoint under concurrent uploads.")
+    parser.add_argument("--uploads", type=int, default=32)
+    parser.add_argument("--image", help="Leaf photo to upload (default: random JPEG)")
+    args = parser.parse_args()
+
+    image = open(args.image, "rb").read() if args.image else _sample_image()
+    asyncio.run(main(args.uploads, image))
@@ -0,0 +1,61 @@
+# benchmarks/disease_input.py
+# Images/sec of the disease training and evaluation input pipelines:
+# ImageDataGenerator.flow_from_directory vs. tf.data (first epoch decodes
+# and fills the cache, later epochs read the cache).
+#
+#   python -m benchmarks.disease_input [--train-dir DIR] [--val-dir DIR] [--epochs 2]
+
+import argparse
+import tempfile
+import time
+
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+from src.disease_prediction.config import TRAIN_DIR, VAL_DIR, IMG_HEIGHT, IMG_WIDTH, BATCH_SIZE
+from src.disease_prediction.preprocess import make_dataset
+
+
+def _generator(directory, training):
+    if training:
+        datagen = ImageDataGenerator(rescale=1.0 / 255, rotation_range=20, zoom_range=0.2, horizontal_flip=True)
+    else:
+        datagen = ImageDataGenerator(rescale=1.0 / 255)
+    return datagen.flow_from_directory(directory, target_size=(IMG_HEIGHT, IMG_WIDTH),
+                                       batch_size=BATCH_SIZE, class_mode="categorical", shuffle=training)
+
+
+def _generator_epoch(gen):
+    start, images = time.perf_counter(), 0
+    for _ in range(len(gen)):
+        x, _ = next(gen)
+        images += len(x)
+    return images / (time.perf_counter() - start)
+
+
+def _dataset_epoch(ds):
+    start, images = time.perf_counter(), 0
+    for x, _ in ds:
+        images += int(x.shape[0])
+    return images / (time.perf_counter() - start)
+
+
+def main(train_dir, val_dir, epochs):
+    print(f"{'split':6s} {'pipeline':22s} {'images/s':>9s}")
+    for split, directory, training in (("train", train_dir, True), ("eval", val_dir, False)):
+        gen = _generator(directory, training)
+        print(f"{split:6s} {'ImageDataGenerator':22s} {_generator_epoch(gen):9.1f}")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ds, _ = make_dataset(directory, training=training, cache_dir=cache_dir)
+            for epoch in range(1, epochs + 1):
+                label = "tf.data (decode+cache)" if epoch == 1 else f"tf.data (cached, ep {epoch})"
+                print(f"{split:6s} {label:22s} {_dataset_epoch(ds):9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Disease input pipeline throughput.")
+    parser.add_argument("--train-dir", default=TRAIN_DIR)
+    parser.add_argument("--val-dir", default=VAL_DIR)
+    parser.add_argument("--epochs", type=int, default=2, help="tf.data epochs (first one fills the cache)")
+    args = parser.parse_args()
+    main(args.train_dir, args.val_dir, args.epochs)
@@ -0,0 +1,94 @@
+# benchmarks/disease_latency.py
+# Cold (first request in a fresh process) and steady-state latency of
+# predict_disease, comparing:
+#   legacy    load_model + compile + model.predict on every request (original code)
+#   resident  model kept loaded, but still model.predict per request
+#   traced    resident model behind the traced tf.function (current code)
+#
+#   python -m benchmarks.disease_latency [--image leaf.jpg] [--repeat 20]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+MODES = ("legacy", "resident", "traced")
+
+
+def _sample_image(path):
+    """Random RGB JPEG, used when no real leaf photo is given."""
+    from PIL import Image
+    pixels = np.random.default_rng(0).integers(0, 255, (256, 256, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path, format="JPEG")
+    return path
+
+
+def _child(mode, image_path, repeat):
+    start = time.perf_counter()
+
+    if mode == "traced":
+        from src.disease_prediction.predict import predict_disease
+        call = lambda: predict_disease(image_path)  # noqa: E731
+    else:
+        from tensorflow.keras.models import load_model
+        from tensorflow.keras.optimizers import Adam
+        from tensorflow.keras.preprocessing import image
+        from src.disease_prediction.config import MODEL_PATH, IMG_HEIGHT, IMG_WIDTH
+
+        def load():
+            model = load_model(MODEL_PATH)
+            model.compile(optimizer=Adam(learning_rate=0.001),
+                          loss="categorical_crossentropy", metrics=["accuracy"])
+            return model
+
+        resident = load() if mode == "resident" else None
+
+        def call():
+            model = resident if resident is not None else load()
+            img = image.load_img(image_path, target_size=(IMG_HEIGHT, IMG_WIDTH))
+            batch = np.expand_dims(image.img_to_array(img) / 255.0, axis=0)
+            return model.predict(batch, verbose=0)
+
+    call()
+    cold = time.perf_counter() - start
+
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - t)
+
+    print(json.dumps({"cold_ms": cold * 1000, "steady_ms": statistics.median(samples) * 1000}))
+
+
+def main(image_path, repeat):
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    print(f"{'mode':10s} {'cold ms':>10s} {'steady ms':>10s}")
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.disease_latency", "--child", mode,
+             "--image", image_path, "--repeat", str(repeat if mode != "legacy" else max(repeat // 4, 1))],
+            capture_output=True, text=True, env=env, check=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:10s} {result['cold_ms']:10.0f} {result['steady_ms']:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Disease prediction latency.")
+    parser.add_argument("--image", help="Leaf photo to classify (default: random JPEG)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.image, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            main(args.image or _sample_image(os.path.join(tmp, "leaf.jpg")), args.repeat)
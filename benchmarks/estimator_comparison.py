@@ -0,0 +1,160 @@
+# benchmarks/estimator_comparison.py
+# Random forests vs. gradient boosting (src/training/estimators.py) for the
+# tabular models, each built exactly as its training script builds it:
+#
+#   crop, soil_health   forest vs. hist_gb (numeric features only)
+#   yield, fertilizer   forest (one-hot) vs. hist_gb (ordinal codes with
+#                       native categorical splits), plus xgboost if installed
+#
+# Every backend is fitted on the same training split and reports the test
+# score (accuracy, or R2 for yield), fit time, pickle size, unpickle time and
+# one-row latency both through sklearn on a one-row DataFrame and through the
+# serving fast path (src/serving/fast_path.py) on a dict. Artifacts are
+# written to a temporary folder, never over models/; --rows subsamples the
+# training split.
+#
+#   python -m benchmarks.estimator_comparison [--models crop yield] [--rows 20000] [--repeat 300]
+
+import argparse
+import importlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import joblib
+from sklearn.metrics import accuracy_score, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from src.serving import fast_path
+from src.training.estimators import default_encoding
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _xgboost_available():
+    return importlib.util.find_spec("xgboost") is not None
+
+
+def _crop():
+    from src.recommendation.config import DATA_PATH
+    from src.recommendation.data_preprocessing import load_data, split_data
+    from src.recommendation.train_model import CROP_ESTIMATORS, build_model
+
+    X_train, X_test, y_train, y_test = split_data(load_data(DATA_PATH))
+    return CROP_ESTIMATORS, build_model, (X_train, X_test, y_train, y_test), accuracy_score
+
+
+def _soil_health():
+    from src.soil_health import training
+
+    X, y = training.prepare_data(training.load_processed_data())
+    # the same split training_pipeline() makes
+    split = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    return training.SOIL_ESTIMATORS, training.build_model, split, accuracy_score
+
+
+def _yield():
+    from src.yield_pred.preprocess import build_preprocessing_pipeline, load_data, train_test_split_df
+    from src.yield_pred.train import build_model
+
+    df = load_data()
+    split = train_test_split_df(df)
+
+    def build(kind):
+        encoding = default_encoding(kind)
+        preprocessor, feature_info = build_preprocessing_pipeline(df, encoding=encoding)
+        return Pipeline([("preprocessor", preprocessor), ("model", build_model(kind, encoding, feature_info))])
+
+    return ["forest", "hist_gb", "xgboost"], build, split, r2_score
+
+
+def _fertilizer():
+    # train.py / preprocess.py are scripts importing their siblings by bare name
+    sys.path.insert(0, os.path.join(ROOT_DIR, "src", "fertilizer_recom"))
+    preprocess = importlib.import_module("preprocess")
+    train = importlib.import_module("train")
+    from src.fertilizer_recom.config import RANDOM_STATE
+
+    df = preprocess.load_data()
+    df.columns = df.columns.str.strip()
+    target = "Fertilizer Name"
+    preps = {encoding: preprocess.prepare_train_test(df, target_col=target, random_state=RANDOM_STATE,
+                                                     encoding=encoding)
+             for encoding in ("onehot", "ordinal")}
+    prep = preps["onehot"]  # same split for both encodings: only the preprocessor differs
+    le = LabelEncoder()
+    split = (prep["X_train"], prep["X_test"], le.fit_transform(prep["y_train"].astype(str)),
+             le.transform(prep["y_test"].astype(str)))
+
+    def build(kind):
+        p = preps[default_encoding(kind)]
+        clf = train.build_classifier(kind, default_encoding(kind), p["numeric_cols"], p["categorical_cols"])
+        return Pipeline([("preprocessor", p["preprocessor"]), ("clf", clf)])
+
+    return ["forest", "hist_gb", "xgboost"], build, split, accuracy_score
+
+
+SETUPS = {"crop": _crop, "soil_health": _soil_health, "yield": _yield, "fertilizer": _fertilizer}
+
+
+def _median_seconds(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run(name, rows, repeat):
+    kinds, build, (X_train, X_test, y_train, y_test), metric = SETUPS[name]()
+    if rows:
+        X_train = X_train.iloc[:rows]
+        y_train = y_train.iloc[:rows] if hasattr(y_train, "iloc") else y_train[:rows]
+    kinds = [k for k in kinds if k != "xgboost" or _xgboost_available()]
+
+    row = X_test.iloc[:1]
+    record = row.to_dict("records")
+    print(f"\n{name}: {len(X_train):,} training rows, {len(X_test):,} test rows")
+    print(f"{'estimator':<9} {'score':>7} {'fit s':>7} {'pickle MB':>10} {'load ms':>8} "
+          f"{'1-row sklearn us':>17} {'1-row fast us':>14}")
+
+    baseline = None
+    with tempfile.TemporaryDirectory(prefix="annadata-estimators-") as tmp:
+        for kind in kinds:
+            start = time.perf_counter()
+            model = build(kind).fit(X_train, y_train)
+            fit_s = time.perf_counter() - start
+            score = metric(y_test, model.predict(X_test))
+
+            path = os.path.join(tmp, f"{name}_{kind}.pkl")
+            joblib.dump(model, path)
+            size = os.path.getsize(path)
+            load_s = _median_seconds(lambda: joblib.load(path), 3)
+
+            sklearn_s = _median_seconds(lambda: model.predict(row), repeat)
+            fast = fast_path.fast_model(model)
+            fast_s = _median_seconds(lambda: fast.predict(record), repeat) if fast is not None else float("nan")
+
+            baseline = baseline or (size, load_s, fast_s)
+            print(f"{kind:<9} {score:7.4f} {fit_s:7.1f} {size / 2 ** 20:10.2f} {load_s * 1e3:8.1f} "
+                  f"{sklearn_s * 1e6:17.0f} {fast_s * 1e6:14.0f}   ({size / baseline[0]:.3g}x size, "
+                  f"{load_s / baseline[1]:.3g}x load, {fast_s / baseline[2]:.3g}x fast latency)", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forest vs. gradient-boosting accuracy, size and latency.")
+    parser.add_argument("--models", nargs="+", choices=list(SETUPS), default=list(SETUPS))
+    parser.add_argument("--rows", type=int, default=None, help="Use only the first N training rows.")
+    parser.add_argument("--repeat", type=int, default=300, help="One-row predictions timed per estimator.")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for model_name in args.models:
+            run(model_name, args.rows, args.repeat)
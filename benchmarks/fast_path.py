@@ -0,0 +1,99 @@
+# benchmarks/fast_path.py
+# Single-record latency: one-row DataFrame + sklearn vs. the NumPy fast path.
+#
+#   python -m benchmarks.fast_path [--repeat 2000]
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.serving import fast_path, registry
+
+
+def _sample_records():
+    """One realistic input per model, taken from the training data."""
+    from src.recommendation.config import DATA_PATH as CROP_DATA
+    from src.soil_health.config import PROCESSED_DATA_PATH as SOIL_DATA
+    from src.fertilizer_recom.config import RAW_DATA_PATH as FERT_DATA
+    from src.yield_pred.config import DATA_PATH as YIELD_DATA
+    from src.irrigation_scheduler.scheduler import FEATURE_COLUMNS as IRRIGATION_COLUMNS
+    from src.soil_health.prediction import FEATURE_ORDER as SOIL_COLUMNS
+
+    crop = pd.read_csv(CROP_DATA).drop(columns="label").iloc[0].to_dict()
+    soil = pd.read_csv(SOIL_DATA)[SOIL_COLUMNS].iloc[0].to_dict()
+    fert = pd.read_csv(FERT_DATA).iloc[0].drop("Fertilizer Name").to_dict()
+    yld = pd.read_csv(YIELD_DATA).drop(columns="hg/ha_yield").iloc[0].to_dict()
+    irrigation = dict(zip(IRRIGATION_COLUMNS, [28.0, 36.0, 40.0, 0, 3]))
+
+    return {
+        "crop": (crop, None),
+        "soil_health": (soil, SOIL_COLUMNS),
+        "irrigation": (irrigation, IRRIGATION_COLUMNS),
+        "fertilizer": (fert, None),
+        "yield": (yld, None),
+    }
+
+
+def _resident_models():
+    # importing the predictors registers their artifacts
+    import src.recommendation.predict  # noqa: F401
+    import src.soil_health.prediction  # noqa: F401
+    import src.irrigation_scheduler.scheduler  # noqa: F401
+    import src.fertilizer_recom.predict  # noqa: F401
+    import src.yield_pred.predict  # noqa: F401
+
+    models = {}
+    for name in ("crop", "soil_health", "irrigation", "fertilizer", "yield"):
+        try:
+            model = registry.get(name)
+        except FileNotFoundError as e:
+            print(f"skip {name}: {e}")
+            continue
+        models[name] = model["pipeline"] if isinstance(model, dict) else model
+    return models
+
+
+def _time_per_call(fn, repeat):
+    fn()  # warm caches / first-call allocation
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(repeat=2000):
+    samples = _sample_records()
+    rows = []
+
+    for name, model in _resident_models().items():
+        record, columns = samples[name]
+        fast = fast_path.fast_model(model, columns)
+        if fast is None:
+            print(f"skip {name}: model shape not supported by the fast path")
+            continue
+
+        frame_columns = columns or list(model.feature_names_in_)
+        predict_df = lambda: model.predict(pd.DataFrame([record], columns=frame_columns))
+        predict_np = lambda: fast.predict([record])
+
+        same = np.array_equal(predict_df(), predict_np())
+        df_us = _time_per_call(predict_df, repeat)
+        np_us = _time_per_call(predict_np, repeat)
+        rows.append((name, df_us, np_us, df_us / np_us, same))
+
+    print(f"\n{'model':<12} {'DataFrame us':>13} {'fast us':>9} {'speedup':>8}  identical")
+    for name, df_us, np_us, speedup, same in rows:
+        print(f"{name:<12} {df_us:>13.1f} {np_us:>9.1f} {speedup:>7.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare DataFrame vs NumPy single-record inference.")
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per model and path.")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        run(repeat=args.repeat)
@@ -0,0 +1,123 @@
+# benchmarks/hyperparameter_search.py
+# Current exhaustive searches vs. successive halving, on the real training
+# pipelines and search spaces:
+#
+#   yield        GridSearchCV over train.PARAM_GRID (18 candidates)
+#                vs. SuccessiveHalving, resource n_samples and n_estimators
+#   fertilizer   RandomizedSearchCV, 12 of train.PARAM_DIST's 81 candidates
+#                vs. SuccessiveHalving over 12 candidates (either resource) and
+#                over the whole grid (resource n_estimators)
+#
+# Every search runs on the shared float32 training matrix (same for all of
+# them) and reports wall-clock, best CV score and the refitted model's score
+# on the held-out test split. --rows subsamples the training split so the
+# exhaustive baselines finish on small machines.
+#
+#   python -m benchmarks.hyperparameter_search [--models yield fertilizer] [--rows 5000] [--n-jobs -1]
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import warnings
+
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import accuracy_score, r2_score
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from src.training.matrices import fit_search_shared
+from src.training.search import SuccessiveHalving
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _yield_setup(rows):
+    from src.yield_pred import config
+    from src.yield_pred.preprocess import build_preprocessing_pipeline, load_data, train_test_split_df
+    from src.yield_pred.train import PARAM_GRID
+
+    df = load_data()
+    preprocessor, _ = build_preprocessing_pipeline(df)
+    X_train, X_test, y_train, y_test = train_test_split_df(df)
+    if rows:
+        X_train, y_train = X_train.iloc[:rows], y_train.iloc[:rows]
+    model = RandomForestRegressor(random_state=config.RANDOM_STATE)
+    pipeline = Pipeline([("preprocessor", preprocessor), ("model", model)])
+    common = dict(cv=config.CV_FOLDS, scoring="neg_mean_squared_error")
+    halving = dict(random_state=config.RANDOM_STATE)
+    searches = [
+        ("grid", GridSearchCV, {}),
+        ("halving/n_samples", SuccessiveHalving, dict(resource="n_samples", **halving)),
+        ("halving/n_estimators", SuccessiveHalving, dict(resource="n_estimators", **halving)),
+    ]
+    return pipeline, PARAM_GRID, common, searches, (X_train, X_test, y_train, y_test), r2_score, "test R2"
+
+
+def _fertilizer_setup(rows):
+    # train.py / preprocess.py are scripts importing their siblings by bare name
+    sys.path.insert(0, os.path.join(ROOT_DIR, "src", "fertilizer_recom"))
+    preprocess = importlib.import_module("preprocess")
+    train = importlib.import_module("train")
+    from src.fertilizer_recom.config import RANDOM_STATE, RF_MAX_DEPTH, RF_N_ESTIMATORS
+
+    df = preprocess.load_data()
+    df.columns = df.columns.str.strip()
+    prep = preprocess.prepare_train_test(df, target_col="Fertilizer Name", random_state=RANDOM_STATE)
+    le = LabelEncoder()
+    y_train = le.fit_transform(prep["y_train"].astype(str))
+    y_test = le.transform(prep["y_test"].astype(str))
+    X_train, X_test = prep["X_train"], prep["X_test"]
+    if rows:
+        X_train, y_train = X_train.iloc[:rows], y_train[:rows]
+
+    clf = RandomForestClassifier(n_estimators=RF_N_ESTIMATORS, max_depth=RF_MAX_DEPTH, random_state=RANDOM_STATE,
+                                 n_jobs=-1)
+    pipeline = Pipeline([("preprocessor", prep["preprocessor"]), ("clf", clf)])
+    common = dict(cv=StratifiedKFold(n_splits=4, shuffle=True, random_state=RANDOM_STATE), scoring="accuracy",
+                  random_state=RANDOM_STATE)
+    # with resource n_samples, n_candidates=12 draws the same 12 candidates as the randomized search
+    searches = [
+        ("random (12)", RandomizedSearchCV, dict(n_iter=12)),
+        ("halving/n_samples 12", SuccessiveHalving, dict(resource="n_samples", n_candidates=12)),
+        ("halving/n_estim. 12", SuccessiveHalving, dict(resource="n_estimators", n_candidates=12)),
+        ("halving/n_estim. all", SuccessiveHalving, dict(resource="n_estimators")),
+    ]
+    return pipeline, train.PARAM_DIST, common, searches, (X_train, X_test, y_train, y_test), accuracy_score, \
+        "test accuracy"
+
+
+SETUPS = {"yield": _yield_setup, "fertilizer": _fertilizer_setup}
+
+
+def run(model, rows, n_jobs):
+    pipeline, params, common, searches, (X_train, X_test, y_train, y_test), metric, metric_name = \
+        SETUPS[model](rows)
+    print(f"\n{model}: {len(y_train):,} training rows, {len(y_test):,} test rows")
+    print(f"{'search':<22} {'seconds':>8} {'CV score':>12} {metric_name:>14}  best params")
+
+    baseline = None
+    for label, search_cls, extra in searches:
+        start = time.perf_counter()
+        fitted, search = fit_search_shared(search_cls, pipeline, params, X_train, y_train,
+                                           n_jobs=n_jobs, **common, **extra)
+        seconds = time.perf_counter() - start
+        score = metric(y_test, fitted.predict(X_test))
+        baseline = baseline or seconds
+        print(f"{label:<22} {seconds:8.1f} {search.best_score_:12.6g} {score:14.4f}  {search.best_params_}"
+              f"  ({seconds / baseline:.2f}x time)", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exhaustive vs. successive-halving hyperparameter search.")
+    parser.add_argument("--models", nargs="+", choices=list(SETUPS), default=list(SETUPS))
+    parser.add_argument("--rows", type=int, default=None, help="Use only the first N training rows.")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Search worker processes.")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for name in args.models:
+            run(name, args.rows, args.n_jobs)
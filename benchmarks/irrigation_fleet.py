@@ -0,0 +1,130 @@
+# benchmarks/irrigation_fleet.py
+# Replay a synthetic probe fleet through the streaming irrigation engine.
+#
+# Readings follow the ranges of src/irrigation_scheduler/data_generation.py
+# (moisture 10-80 %, temperature 20-45 C, humidity 20-90 %, rain forecast
+# 30 % of the time, 11 crops) but as time series: every field reports every
+# 15 minutes, moisture drifts down and jumps back after rain or
+# irrigation, the forecast only arrives hourly and the crop only with the
+# first reading. The replay is checked against a pandas reference
+# (groupby forward-fill + model.predict + shift) and timed:
+#
+#   engine     in-memory batches through FleetScheduler.process
+#   csv        end to end from a readings CSV (parsing included)
+#   per-call   irrigation_scheduler() once per reading, for comparison
+#
+#   python -m benchmarks.irrigation_fleet [--fields 10000] [--ticks 200]
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.irrigation_scheduler.fleet import BATCH_ROWS, FleetScheduler, csv_source, READING_COLUMNS
+from src.irrigation_scheduler.scheduler import FEATURE_COLUMNS, MODEL_NAME, irrigation_scheduler
+from src.serving import registry
+
+N_CROPS = 11
+PROBE_INTERVAL_SECONDS = 15 * 60
+
+
+def synthesize(n_fields: int, ticks: int, seed: int = 42) -> pd.DataFrame:
+    """Readings of `n_fields` probes over `ticks` intervals, in time order."""
+    rng = np.random.default_rng(seed)
+    moisture = rng.uniform(10, 80, n_fields)
+    crop = rng.integers(0, N_CROPS, n_fields).astype(np.float64)
+    rain = (rng.random(n_fields) < 0.3).astype(np.float64)
+    ids = np.array([f"field-{i:06d}" for i in range(n_fields)], dtype=object)
+
+    frames = []
+    for tick in range(ticks):
+        if tick % 4 == 0:
+            rain = (rng.random(n_fields) < 0.3).astype(np.float64)
+        wetting = rng.random(n_fields) < np.where(rain == 1, 0.05, 0.01)
+        moisture = np.where(wetting, rng.uniform(50, 80, n_fields),
+                            moisture - rng.uniform(0, 0.6, n_fields))
+        moisture = np.clip(moisture, 10, 80)
+
+        frames.append(pd.DataFrame({
+            "timestamp": tick * PROBE_INTERVAL_SECONDS + rng.integers(0, 60, n_fields),
+            "field_id": ids,
+            "soil_moisture": np.round(moisture, 2),
+            "temperature": np.round(rng.uniform(20, 45, n_fields), 2),
+            "humidity": np.round(rng.uniform(20, 90, n_fields), 2),
+            "rain_forecast": rain if tick % 4 == 0 else np.nan,
+            "crop_type_encoded": crop if tick == 0 else np.nan,
+        }))
+    return pd.concat(frames, ignore_index=True)[READING_COLUMNS]
+
+
+def reference_changes(readings: pd.DataFrame, model) -> pd.DataFrame:
+    """Decision changes computed the slow, obvious way with pandas."""
+    merged = readings.copy()
+    merged[FEATURE_COLUMNS] = readings.groupby("field_id", sort=False)[FEATURE_COLUMNS].ffill()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        decision = model.predict(merged[FEATURE_COLUMNS])
+    merged["decision"] = np.where(decision == 1, "Irrigate", "Do Not Irrigate")
+    previous = merged.groupby("field_id", sort=False)["decision"].shift()
+    return merged.loc[merged["decision"] != previous, ["timestamp", "field_id", "decision"]]
+
+
+def _batches(readings: pd.DataFrame, batch_rows: int):
+    for start in range(0, len(readings), batch_rows):
+        yield readings.iloc[start:start + batch_rows]
+
+
+def main(n_fields: int, ticks: int, batch_rows: int, per_call_sample: int):
+    model = registry.get(MODEL_NAME)
+    readings = synthesize(n_fields, ticks)
+    n = len(readings)
+    print(f"{n_fields:,} fields x {ticks} readings = {n:,} readings, batches of {batch_rows:,}\n")
+
+    engine = FleetScheduler()
+    batches = list(_batches(readings, batch_rows))
+    start = time.perf_counter()
+    changes = pd.concat([engine.process(b) for b in batches], ignore_index=True)
+    engine_s = time.perf_counter() - start
+
+    expected = reference_changes(readings, model).reset_index(drop=True)
+    same = changes.reset_index(drop=True).equals(expected.astype(changes.dtypes.to_dict()))
+    print(f"changes emitted: {len(changes):,} ({len(changes) / n:.2%} of readings), "
+          f"{'identical to' if same else 'DIFFERENT from'} the pandas reference")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "readings.csv")
+        readings.to_csv(path, index=False)
+        start = time.perf_counter()
+        replay = FleetScheduler()
+        csv_changes = sum(len(c) for c in replay.run(csv_source(path, batch_rows)))
+        csv_s = time.perf_counter() - start
+
+    sample = readings.groupby("field_id", sort=False)[FEATURE_COLUMNS].ffill().head(per_call_sample)
+    records = sample.to_dict("records")
+    start = time.perf_counter()
+    for r in records:
+        irrigation_scheduler(**r)
+    per_call_s = (time.perf_counter() - start) * n / len(records)
+
+    print(f"\n{'path':10s} {'seconds':>9s} {'readings/min':>14s}")
+    for label, seconds in (("engine", engine_s), ("csv", csv_s), ("per-call", per_call_s)):
+        print(f"{label:10s} {seconds:9.2f} {n / seconds * 60:14,.0f}")
+    print(f"\n(per-call timed on {len(records):,} readings and scaled; csv emitted {csv_changes:,} changes)")
+
+    if not same:
+        raise SystemExit("Engine output does not match the reference")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming irrigation replay benchmark.")
+    parser.add_argument("--fields", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200, help="15-minute reporting intervals.")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--per-call-sample", type=int, default=20000)
+    args = parser.parse_args()
+
+    main(args.fields, args.ticks, args.batch_rows, args.per_call_sample)
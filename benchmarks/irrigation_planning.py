@@ -0,0 +1,78 @@
+# benchmarks/irrigation_planning.py
+# Time 7-day irrigation planning for a large fleet of fields:
+#
+#   arrays    plan_irrigation() on (fields, days) NumPy forecasts
+#   records   plan_fields() on API-shaped dicts, JSON-ready output included
+#
+#   python -m benchmarks.irrigation_planning [--fields 100000] [--days 7]
+
+import argparse
+import time
+
+import numpy as np
+
+from src.irrigation_scheduler.crops import CROP_ENCODING_MAP
+from src.irrigation_scheduler.planner import plan_fields, plan_irrigation
+
+
+def synthesize(n_fields: int, days: int, seed: int = 42):
+    """Fields and forecasts over the value ranges of data_generation.py."""
+    rng = np.random.default_rng(seed)
+    return {
+        "soil_moisture": rng.uniform(10, 80, n_fields),
+        "crop_type_encoded": rng.integers(0, len(CROP_ENCODING_MAP), n_fields),
+        "temperature": rng.uniform(20, 45, (n_fields, days)),
+        "humidity": rng.uniform(20, 90, (n_fields, days)),
+        "rain_probability": np.where(rng.random((n_fields, days)) < 0.3, rng.uniform(0.5, 1, (n_fields, days)),
+                                     rng.uniform(0, 0.2, (n_fields, days))),
+    }
+
+
+def _records(arrays):
+    crops = sorted(CROP_ENCODING_MAP, key=CROP_ENCODING_MAP.get)
+    return [
+        {
+            "field_id": f"field-{i:06d}",
+            "soil_moisture": float(arrays["soil_moisture"][i]),
+            "crop_type": crops[arrays["crop_type_encoded"][i]],
+            "forecast": [
+                {"temperature": t, "humidity": h, "rain_probability": p}
+                for t, h, p in zip(arrays["temperature"][i].tolist(), arrays["humidity"][i].tolist(),
+                                   arrays["rain_probability"][i].tolist())
+            ],
+        }
+        for i in range(len(arrays["soil_moisture"]))
+    ]
+
+
+def main(n_fields: int, days: int):
+    arrays = synthesize(n_fields, days)
+
+    start = time.perf_counter()
+    plan = plan_irrigation(**arrays)
+    arrays_s = time.perf_counter() - start
+
+    records = _records(arrays)
+    start = time.perf_counter()
+    results = plan_fields(records)
+    records_s = time.perf_counter() - start
+
+    irrigate = plan["irrigate"]
+    print(f"{n_fields:,} fields x {days} days")
+    print(f"  fields irrigated at least once: {irrigate.any(axis=1).mean():.1%}, "
+          f"irrigation events: {int(irrigate.sum()):,}, "
+          f"water: {plan['irrigation_mm'].sum() / n_fields:.1f} mm/field")
+    print(f"  arrays   {arrays_s:8.3f} s  ({n_fields / arrays_s:12,.0f} fields/s)")
+    print(f"  records  {records_s:8.3f} s  ({n_fields / records_s:12,.0f} fields/s)")
+
+    assert [r["irrigation_days"] for r in results[:100]] == \
+        [[d + 1 for d in np.flatnonzero(row)] for row in irrigate[:100]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Irrigation planning throughput.")
+    parser.add_argument("--fields", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    main(args.fields, args.days)
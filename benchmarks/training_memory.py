@@ -0,0 +1,135 @@
+# benchmarks/training_memory.py
+# Peak memory and wall-clock of hyperparameter search for the yield and
+# fertilizer pipelines, per categorical encoding, with and without the
+# shared memory-mapped CV matrix (src/training/matrices.py).
+#
+# Every configuration trains in a fresh process on a reduced search space
+# (so a run takes minutes, not hours); a sampler sums the proportional set
+# size (PSS) of that process and all its CV workers every SAMPLE_SECONDS,
+# which counts pages shared through the memory map once. Models are written
+# to a temporary folder, never over models/.
+#
+#   python -m benchmarks.training_memory [--n-jobs 4] [--models yield fertilizer]
+
+import argparse
+import importlib
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CONFIGS = (
+    ("onehot", False),
+    ("onehot", True),
+    ("sparse", True),
+    ("ordinal", True),
+)
+YIELD_GRID = {"model__n_estimators": [20], "model__max_depth": [16, None]}
+FERTILIZER_DIST = {"clf__n_estimators": [20], "clf__max_depth": [None, 10]}
+SAMPLE_SECONDS = 0.25
+
+
+def _train(model, encoding, shared_cv, n_jobs, model_path, verbose, finished):
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+    import warnings
+    warnings.simplefilter("ignore")
+
+    if model == "yield":
+        from src.yield_pred.train import train_and_save
+        train_and_save(model_path=model_path, encoding=encoding, shared_cv=shared_cv,
+                       param_grid=YIELD_GRID, n_jobs=n_jobs)
+    else:
+        # train.py is a script importing its siblings by bare name
+        sys.path.insert(0, os.path.join(ROOT_DIR, "src", "fertilizer_recom"))
+        train = importlib.import_module("train")
+        train.train_and_save("Fertilizer Name", model_path=model_path, tune=True, encoding=encoding,
+                             shared_cv=shared_cv, n_iter=2, n_jobs=n_jobs, param_dist=FERTILIZER_DIST)
+    finished.put(time.perf_counter())
+
+    # idle loky workers would otherwise keep this process alive for minutes
+    from joblib.externals.loky import get_reusable_executor
+    get_reusable_executor().shutdown(wait=True)
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _pss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _tree_pss(pid):
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        total += _pss_bytes(p)
+        stack.extend(_children(p))
+    return total
+
+
+def measure(model, encoding, shared_cv, n_jobs, verbose=False):
+    """(wall-clock seconds, peak PSS of the training process tree in bytes)."""
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        finished = ctx.Queue()
+        proc = ctx.Process(target=_train, args=(model, encoding, shared_cv, n_jobs,
+                                                os.path.join(tmp, f"{model}.pkl"), verbose, finished))
+        peak = [0]
+        done = threading.Event()
+
+        def sample():
+            while not done.is_set():
+                peak[0] = max(peak[0], _tree_pss(proc.pid))
+                time.sleep(SAMPLE_SECONDS)
+
+        start = time.perf_counter()
+        proc.start()
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        proc.join()
+        done.set()
+        sampler.join()
+
+    if proc.exitcode != 0:
+        raise SystemExit(f"{model} training ({encoding}, shared_cv={shared_cv}) failed")
+    # perf_counter is system-wide on Linux, so the child's timestamp is comparable
+    return finished.get() - start, peak[0]
+
+
+def main(models, n_jobs, verbose):
+    print(f"search workers: {n_jobs}, cores: {os.cpu_count()}\n")
+    print(f"{'model':<11} {'encoding':<8} {'shared CV':>9} {'seconds':>8} {'peak MB':>8}")
+    for model in models:
+        baseline = None
+        for encoding, shared_cv in CONFIGS:
+            seconds, peak = measure(model, encoding, shared_cv, n_jobs, verbose)
+            baseline = baseline or (seconds, peak)
+            print(f"{model:<11} {encoding:<8} {str(shared_cv):>9} {seconds:8.1f} {peak / 2 ** 20:8.0f}"
+                  f"   ({seconds / baseline[0]:.2f}x time, {peak / baseline[1]:.2f}x memory)", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training memory / time per encoding and CV matrix sharing.")
+    parser.add_argument("--models", nargs="+", choices=["yield", "fertilizer"], default=["yield", "fertilizer"])
+    parser.add_argument("--n-jobs", type=int, default=4, help="Search worker processes.")
+    parser.add_argument("--verbose", action="store_true", help="Show the training scripts' output.")
+    args = parser.parse_args()
+
+    main(args.models, args.n_jobs, args.verbose)
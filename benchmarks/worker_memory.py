@@ -0,0 +1,75 @@
+# benchmarks/worker_memory.py
+# Per-worker memory with N concurrent processes holding every tree model,
+# pickled sklearn forests vs. memory-mapped compiled forests.
+#
+#   python -m src.serving.forest crop soil_health fertilizer yield   # export first
+#   python -m benchmarks.worker_memory [--workers 4]
+
+import argparse
+import multiprocessing as mp
+import os
+
+MODELS = ("crop", "soil_health", "fertilizer", "yield")
+
+
+def _worker(backend, ready, release, results):
+    # config is read at import time, so set the backend before importing
+    os.environ["ANNADATA_FOREST_BACKEND"] = backend
+    os.environ["ANNADATA_FOREST_MMAP"] = "1"
+
+    import src.recommendation.predict  # noqa: F401
+    import src.soil_health.prediction  # noqa: F401
+    import src.fertilizer_recom.predict  # noqa: F401
+    import src.yield_pred.predict  # noqa: F401
+    from benchmarks.fast_path import _sample_records
+    from src.serving import fast_path, registry
+
+    baseline = registry.process_memory()
+    report = registry.warm(MODELS)
+
+    # touch every tree once so mapped pages are actually resident
+    for name, (record, columns) in _sample_records().items():
+        if name not in MODELS or not report[name].get("loaded"):
+            continue
+        model = registry.get(name)
+        model = model["pipeline"] if isinstance(model, dict) else model
+        fast_path.for_model(model, columns).predict([record])
+
+    # hold the models until every worker has loaded, so shared pages overlap
+    ready.wait()
+    results.put((baseline, registry.process_memory()))
+    release.wait()
+
+
+def _measure(backend, workers):
+    ctx = mp.get_context("spawn")
+    ready, release = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(backend, ready, release, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    rows = [results.get() for _ in procs]
+    release.wait()
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main(workers):
+    print(f"{workers} workers, models: {', '.join(MODELS)}\n")
+    print(f"{'backend':10s} {'models RSS/worker':>18s} {'models PSS/worker':>18s} {'total PSS':>10s}")
+    for backend in ("sklearn", "auto"):
+        rows = _measure(backend, workers)
+        rss = sum(after["rss"] - before["rss"] for before, after in rows) / workers
+        pss = sum(after.get("pss", 0) - before.get("pss", 0) for before, after in rows) / workers
+        total = sum(after.get("pss", 0) for _, after in rows)
+        label = "compiled" if backend == "auto" else backend
+        print(f"{label:10s} {rss / 2**20:15.1f} MB {pss / 2**20:15.1f} MB {total / 2**20:7.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-worker memory of resident forests.")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.workers)
@@ -0,0 +1,85 @@
+# benchmarks/yield_predictor.py
+# Throughput of yield prediction over the rows of yield_df.csv:
+#
+#   sklearn     the trained Pipeline on a DataFrame (joblib artifact as saved)
+#   compiled    YieldPredictor: dicts -> NumPy feature matrix -> compiled forest
+#
+# Both start from the same list of dicts (what the API hands the predictor)
+# and are timed per row (one call per record, as the single endpoint does)
+# and as one batch; the feature matrices and predictions must be identical.
+#
+#   python -m benchmarks.yield_predictor [--per-row-sample 2000]
+
+import argparse
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.yield_pred import config
+from src.yield_pred.predict import MODEL_NAME, YieldPredictor
+from src.serving import registry
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(per_row_sample=2000):
+    pipeline = joblib.load(config.MODEL_PATH)
+    compiled = YieldPredictor(registry.get(MODEL_NAME))
+    if compiled.fast is None:
+        raise SystemExit("Fast path disabled or unsupported for this model")
+
+    frame = pd.read_csv(config.DATA_PATH).drop(columns="hg/ha_yield")
+    records = frame.to_dict("records")
+    n = len(records)
+    columns = compiled.expected_columns
+    print(f"{n:,} rows from {config.DATA_PATH}, {compiled.fast.n_output} transformed features\n")
+
+    def to_frame(rows):
+        return pd.DataFrame(rows, columns=columns)
+
+    # feature matrix
+    expected_X, sk_features_s = _timed(lambda: pipeline.steps[0][1].transform(to_frame(records)))
+    X, np_features_s = _timed(lambda: compiled.features(records))
+    same_X = np.array_equal(X, expected_X)
+
+    # batch prediction
+    expected, sk_batch_s = _timed(lambda: pipeline.predict(to_frame(records)))
+    preds, np_batch_s = _timed(lambda: compiled.predict(records))
+    same_pred = np.array_equal(preds, expected)
+
+    # one call per row, scaled to the whole file
+    sample = records[:per_row_sample]
+    _, sk_row_s = _timed(lambda: [pipeline.predict(to_frame([r])) for r in sample])
+    _, np_row_s = _timed(lambda: [compiled.predict([r]) for r in sample])
+
+    print(f"{'path':<20} {'seconds':>9} {'rows/s':>12}")
+    for label, seconds, rows in (
+        ("sklearn features", sk_features_s, n),
+        ("compiled features", np_features_s, n),
+        ("sklearn batch", sk_batch_s, n),
+        ("compiled batch", np_batch_s, n),
+        ("sklearn per-row", sk_row_s, len(sample)),
+        ("compiled per-row", np_row_s, len(sample)),
+    ):
+        print(f"{label:<20} {seconds:9.3f} {rows / seconds:12,.0f}")
+    print(f"\nfeatures identical: {same_X}, predictions identical: {same_pred}")
+
+    if not (same_X and same_pred):
+        raise SystemExit("Compiled predictor does not match the sklearn pipeline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiled yield predictor vs the sklearn pipeline.")
+    parser.add_argument("--per-row-sample", type=int, default=2000, help="Rows timed one call at a time.")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        run(per_row_sample=args.per_row_sample)
@@ -6,6 +6,20 @@ IMG_WIDTH = 224
 BATCH_SIZE = 32
 EPOCHS = 10
 
+# Prediction cache keyed by decoded pixels: memory budget, entry lifetime
+# and an optional SQLite file that keeps results across restarts
+RESULT_CACHE_MB = float(os.getenv("ANNADATA_DISEASE_CACHE_MB", "16"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("ANNADATA_DISEASE_CACHE_TTL", "3600"))
+RESULT_CACHE_DISK_PATH = os.getenv("ANNADATA_DISEASE_CACHE_DISK", "")
+
+# Training / evaluation input pipeline: "tfdata" (parallel decode, cached,
+# prefetched) or "generator" (ImageDataGenerator.flow_from_directory)
+INPUT_PIPELINE = os.getenv("ANNADATA_DISEASE_PIPELINE", "tfdata").lower()
+
+# Inference: images per model call and threads decoding a batch upload
+INFERENCE_BATCH_SIZE = int(os.getenv("ANNADATA_DISEASE_BATCH", "32"))
+DECODE_WORKERS = int(os.getenv("ANNADATA_DISEASE_DECODE_WORKERS", str(min(8, os.cpu_count() or 1))))
+
 # Project root
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 
@@ -36,6 +50,27 @@ TEST_DIR = os.path.join(
     "test"
 )
 
+# Decoded, resized images cached by the tf.data pipeline after the first epoch
+DATA_CACHE_DIR = os.getenv(
+    "ANNADATA_DISEASE_CACHE_DIR", os.path.join(BASE_DIR, "cache", "disease")
+)
+
+# Frozen MobileNetV2 embeddings per image, reused across head-training runs
+EMBEDDING_DIR = os.path.join(BASE_DIR, "cache", "disease_embeddings")
+# Modified images get a new row and orphan the old one; the store is
+# rewritten without orphans once they exceed this share of its rows
+EMBEDDING_COMPACT_FRACTION = float(os.getenv("ANNADATA_EMBEDDING_COMPACT_FRACTION", "0.25"))
+
 # ===== MODEL PATHS =====
 MODEL_PATH = os.path.join(BASE_DIR, "models", "disease_model.h5")
 CLASS_PATH = os.path.join(BASE_DIR, "models", "disease_classes.json")
+
+# ===== TFLITE EXPORTS (python -m src.disease_prediction.export_tflite) =====
+TFLITE_VARIANTS = ("float16", "dynamic", "int8")
+TFLITE_PATHS = {
+    variant: os.path.join(BASE_DIR, "models", f"disease_model.{variant}.tflite")
+    for variant in TFLITE_VARIANTS
+}
+
+# Inference backend: "keras" or one of TFLITE_VARIANTS
+DISEASE_BACKEND = os.getenv("ANNADATA_DISEASE_BACKEND", "keras").lower()
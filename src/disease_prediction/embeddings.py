@@ -0,0 +1,119 @@
+# src/disease_prediction/embeddings.py
+# On-disk cache of frozen MobileNetV2 features.
+#
+# The base network is frozen during head training, so its pooled 1280-d
+# output for an image never changes. EmbeddingStore computes it once per
+# image (keyed by path + mtime), keeps all vectors in one .npy that is
+# memory-mapped for reading, and only runs the base on images that are
+# new or modified since the last update.
+
+import json
+import os
+from typing import Dict, List, Sequence
+
+import numpy as np
+import tensorflow as tf
+
+from .config import BATCH_SIZE
+from .preprocess import load_image
+
+EMBEDDINGS_FILE = "embeddings.npy"
+INDEX_FILE = "index.json"
+
+
+class EmbeddingStore:
+    """
+    Rows of `embeddings.npy` plus `index.json` mapping
+    path -> [row, mtime_ns]. Changed images get a new row; rows no
+    longer referenced are dropped by compact().
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index: Dict[str, List[int]] = {}
+        self.matrix = None
+        os.makedirs(directory, exist_ok=True)
+
+        index_path = os.path.join(directory, INDEX_FILE)
+        matrix_path = os.path.join(directory, EMBEDDINGS_FILE)
+        if os.path.exists(index_path) and os.path.exists(matrix_path):
+            with open(index_path) as f:
+                self.index = json.load(f)
+            self.matrix = np.load(matrix_path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self.index)
+
+    def stale(self, paths: Sequence[str]) -> List[str]:
+        """Paths with no embedding yet, or whose file changed since it was computed."""
+        out = []
+        for path in paths:
+            entry = self.index.get(path)
+            if entry is None or entry[1] != os.stat(path).st_mtime_ns:
+                out.append(path)
+        return out
+
+    def update(self, paths: Sequence[str], extractor, batch_size: int = BATCH_SIZE) -> int:
+        """Embed the stale subset of `paths` with `extractor`; returns how many were computed."""
+        todo = self.stale(paths)
+        if not todo:
+            return 0
+
+        mtimes = [os.stat(p).st_mtime_ns for p in todo]
+        ds = (tf.data.Dataset.from_tensor_slices(todo)
+              .map(load_image, num_parallel_calls=tf.data.AUTOTUNE)
+              .batch(batch_size)
+              .prefetch(tf.data.AUTOTUNE))
+        new = np.concatenate([extractor(batch, training=False).numpy() for batch in ds]).astype(np.float32)
+
+        start = 0 if self.matrix is None else len(self.matrix)
+        self._write(new)
+        for i, (path, mtime) in enumerate(zip(todo, mtimes)):
+            self.index[path] = [start + i, mtime]
+        self._save_index()
+        return len(todo)
+
+    def get(self, paths: Sequence[str]) -> np.ndarray:
+        """(len(paths), dim) float32 array; every path must be up to date."""
+        rows = [self.index[p][0] for p in paths]
+        return np.asarray(self.matrix[rows])
+
+    def dead_fraction(self) -> float:
+        """Share of stored rows no path points to any more (left behind by re-embedded images)."""
+        if self.matrix is None or not len(self.matrix):
+            return 0.0
+        return 1.0 - len(self.index) / len(self.matrix)
+
+    def compact(self) -> None:
+        """Rewrite the store without rows that no path points to any more."""
+        if self.matrix is None:
+            return
+        paths = sorted(self.index, key=lambda p: self.index[p][0])
+        kept = self.get(paths)
+        self.matrix = None
+        self._write(kept, replace=True)
+        for row, path in enumerate(paths):
+            self.index[path][0] = row
+        self._save_index()
+
+    def _write(self, rows: np.ndarray, replace: bool = False) -> None:
+        matrix_path = os.path.join(self.directory, EMBEDDINGS_FILE)
+        old = None if replace else self.matrix
+        n_old = 0 if old is None else len(old)
+
+        tmp = matrix_path + ".tmp"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32,
+                                        shape=(n_old + len(rows), rows.shape[1]))
+        if n_old:
+            out[:n_old] = old
+        out[n_old:] = rows
+        out.flush()
+        del out
+        os.replace(tmp, matrix_path)
+        self.matrix = np.load(matrix_path, mmap_mode="r")
+
+    def _save_index(self) -> None:
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        with open(index_path + ".tmp", "w") as f:
+            json.dump(self.index, f)
+        os.replace(index_path + ".tmp", index_path)
@@ -1,7 +1,29 @@
+import json
+
 from tensorflow.keras.models import load_model
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.optimizers import Adam
-from .config import MODEL_PATH, VAL_DIR, IMG_HEIGHT, IMG_WIDTH, BATCH_SIZE
+from .config import MODEL_PATH, CLASS_PATH, VAL_DIR, IMG_HEIGHT, IMG_WIDTH, BATCH_SIZE, INPUT_PIPELINE
+from .preprocess import make_dataset
+
+
+def get_eval_data():
+    if INPUT_PIPELINE == "generator":
+        return ImageDataGenerator(rescale=1.0 / 255).flow_from_directory(
+            VAL_DIR,
+            target_size=(IMG_HEIGHT, IMG_WIDTH),
+            batch_size=BATCH_SIZE,
+            class_mode="categorical",
+            shuffle=False
+        )
+    if INPUT_PIPELINE != "tfdata":
+        raise ValueError(f"Unknown ANNADATA_DISEASE_PIPELINE '{INPUT_PIPELINE}'; use 'tfdata' or 'generator'")
+
+    # label indices must match the ones the model was trained with
+    with open(CLASS_PATH) as f:
+        class_indices = json.load(f)
+    val_ds, _ = make_dataset(VAL_DIR, class_indices=class_indices)
+    return val_ds
 
 
 def evaluate_model():
@@ -13,15 +35,7 @@ def evaluate_model():
         metrics=["accuracy"]
     )
 
-    val_gen = ImageDataGenerator(rescale=1.0 / 255).flow_from_directory(
-        VAL_DIR,
-        target_size=(IMG_HEIGHT, IMG_WIDTH),
-        batch_size=BATCH_SIZE,
-        class_mode="categorical",
-        shuffle=False
-    )
-
-    loss, acc = model.evaluate(val_gen)
+    loss, acc = model.evaluate(get_eval_data())
     print(f"✅ Validation Accuracy: {acc:.4f}")
 
 
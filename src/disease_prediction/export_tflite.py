@@ -0,0 +1,139 @@
+# src/disease_prediction/export_tflite.py
+# Convert disease_model.h5 to TFLite variants and compare them with Keras.
+#
+#   float16  weights stored as float16, compute in float32
+#   dynamic  int8 weights, activations quantized on the fly
+#   int8     full integer model calibrated on a sample of VAL_DIR
+#
+# Serve one with ANNADATA_DISEASE_BACKEND=<variant>.
+#
+#   python -m src.disease_prediction.export_tflite [--variants float16 dynamic int8]
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from .config import (
+    MODEL_PATH, CLASS_PATH, VAL_DIR, INFERENCE_BATCH_SIZE, TFLITE_VARIANTS, TFLITE_PATHS,
+)
+from .predict import DiseaseClassifier, TFLiteClassifier, decode_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def sample_validation_images(val_dir, n, seed=42):
+    """Up to `n` (path, class index) pairs drawn at random from val_dir/<class>/."""
+    with open(CLASS_PATH) as f:
+        class_map = json.load(f)
+
+    items = []
+    for name, idx in class_map.items():
+        class_dir = os.path.join(val_dir, name)
+        if not os.path.isdir(class_dir):
+            continue
+        items += [(os.path.join(class_dir, fn), idx) for fn in sorted(os.listdir(class_dir))
+                  if fn.lower().endswith(IMAGE_EXTENSIONS)]
+    if not items:
+        raise FileNotFoundError(f"No validation images found under {val_dir}")
+
+    random.Random(seed).shuffle(items)
+    return items[:n]
+
+
+def _saved_model(model, directory):
+    # Keras 3 exports an inference-only SavedModel; older tf.keras saves directly
+    if hasattr(model, "export"):
+        model.export(directory)
+    else:
+        tf.saved_model.save(model, directory)
+
+
+def convert(saved_model_dir, variant, calibration_images=None) -> bytes:
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if variant == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "int8":
+        def representative_dataset():
+            for img in calibration_images:
+                yield [img[np.newaxis]]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        # float32 in / out keeps the serving interface identical to Keras
+    elif variant != "dynamic":
+        raise ValueError(f"Unknown variant '{variant}'")
+
+    return converter.convert()
+
+
+def _predict_all(classifier, images):
+    return np.concatenate([
+        classifier.predict(images[i:i + INFERENCE_BATCH_SIZE])
+        for i in range(0, len(images), INFERENCE_BATCH_SIZE)
+    ])
+
+
+def _latency_ms(classifier, image, repeat):
+    batch = image[np.newaxis]
+    classifier.predict(batch)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        classifier.predict(batch)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(variants, val_dir, calibration_samples, eval_samples, repeat):
+    model = load_model(MODEL_PATH, compile=False)
+
+    calibration = [decode_image(p) for p, _ in sample_validation_images(val_dir, calibration_samples, seed=7)]
+    evaluation = sample_validation_images(val_dir, eval_samples)
+    images = np.stack([decode_image(p) for p, _ in evaluation])
+    labels = np.array([idx for _, idx in evaluation])
+
+    keras_model = DiseaseClassifier(model)
+    keras_pred = _predict_all(keras_model, images).argmax(axis=1)
+    keras_acc = float((keras_pred == labels).mean())
+
+    print(f"Validation sample: {len(labels)} images from {val_dir}\n")
+    print(f"{'variant':9s} {'size MB':>8s} {'accuracy':>9s} {'delta':>8s} {'agree':>7s} {'ms/img':>7s}")
+    print(f"{'keras':9s} {os.path.getsize(MODEL_PATH) / 2**20:8.1f} {keras_acc:9.4f} {'':>8s} {'':>7s} "
+          f"{_latency_ms(keras_model, images[0], repeat):7.1f}")
+
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        _saved_model(model, saved_model_dir)
+        for variant in variants:
+            content = convert(saved_model_dir, variant, calibration)
+            with open(TFLITE_PATHS[variant], "wb") as f:
+                f.write(content)
+
+            lite = TFLiteClassifier(content)
+            pred = _predict_all(lite, images).argmax(axis=1)
+            acc = float((pred == labels).mean())
+            print(f"{variant:9s} {len(content) / 2**20:8.1f} {acc:9.4f} {acc - keras_acc:+8.4f} "
+                  f"{float((pred == keras_pred).mean()):7.3f} {_latency_ms(lite, images[0], repeat):7.1f}")
+
+    print("\nSaved:", ", ".join(TFLITE_PATHS[v] for v in variants))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the disease model to TFLite.")
+    parser.add_argument("--variants", nargs="+", choices=TFLITE_VARIANTS, default=list(TFLITE_VARIANTS))
+    parser.add_argument("--val-dir", default=VAL_DIR, help="Class-per-folder images for calibration / accuracy.")
+    parser.add_argument("--calibration-samples", type=int, default=200)
+    parser.add_argument("--eval-samples", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50, help="Single-image timings per variant.")
+    args = parser.parse_args()
+
+    main(args.variants, args.val_dir, args.calibration_samples, args.eval_samples, args.repeat)
@@ -1,32 +1,221 @@
+import hashlib
+import io
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
 import numpy as np
+import tensorflow as tf
+from PIL import Image, UnidentifiedImageError
 from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.optimizers import Adam
-from .config import MODEL_PATH, CLASS_PATH, IMG_HEIGHT, IMG_WIDTH
+from src.serving import registry
+from src.serving.cache import ResultCache
+from .config import (
+    MODEL_PATH, CLASS_PATH, IMG_HEIGHT, IMG_WIDTH, INFERENCE_BATCH_SIZE, DECODE_WORKERS,
+    DISEASE_BACKEND, TFLITE_PATHS,
+    RESULT_CACHE_MB, RESULT_CACHE_TTL_SECONDS, RESULT_CACHE_DISK_PATH,
+)
 
+try:  # the standalone runtime is much lighter than full TensorFlow
+    from tflite_runtime.interpreter import Interpreter as _TFLiteInterpreter
+except ImportError:
+    _TFLiteInterpreter = tf.lite.Interpreter
 
-def predict_disease(image_path):
-    model = load_model(MODEL_PATH)
+MODEL_NAME = "disease"
+
+
+class DiseaseClassifier:
+    """
+    Inference-only wrapper around the Keras model: a single traced
+    tf.function with a fixed (None, H, W, 3) float32 signature, so every
+    batch size reuses the same graph instead of model.predict rebuilding
+    its execution function per call.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._infer = tf.function(
+            self._forward,
+            input_signature=[tf.TensorSpec((None, IMG_HEIGHT, IMG_WIDTH, 3), tf.float32)],
+        )
+
+    def _forward(self, images):
+        return self.model(images, training=False)
+
+    def predict(self, images) -> np.ndarray:
+        """Class probabilities for a (N, H, W, 3) batch scaled to [0, 1]."""
+        return self._infer(tf.convert_to_tensor(images, dtype=tf.float32)).numpy()
+
+
+class TFLiteClassifier:
+    """
+    Same predict() contract as DiseaseClassifier, backed by a TFLite
+    flatbuffer (see export_tflite). Interpreters are not thread-safe, so
+    each inference thread gets its own, resized on demand to the batch size.
+    """
+
+    def __init__(self, model_content: bytes):
+        self.model_content = model_content
+        self._local = threading.local()
+
+    def _interpreter(self, batch: int):
+        local = self._local
+        if getattr(local, "interpreter", None) is None:
+            local.interpreter = _TFLiteInterpreter(model_content=self.model_content)
+            local.batch = None
+        interpreter = local.interpreter
+        if local.batch != batch:
+            index = interpreter.get_input_details()[0]["index"]
+            interpreter.resize_tensor_input(index, [batch, IMG_HEIGHT, IMG_WIDTH, 3])
+            interpreter.allocate_tensors()
+            local.batch = batch
+        return interpreter
+
+    def predict(self, images) -> np.ndarray:
+        """Class probabilities for a (N, H, W, 3) batch scaled to [0, 1]."""
+        images = np.asarray(images, dtype=np.float32)
+        interpreter = self._interpreter(len(images))
+        interpreter.set_tensor(interpreter.get_input_details()[0]["index"], images)
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]["index"]).copy()
 
-    # compile required (optimizer not saved)
-    model.compile(
-        optimizer=Adam(learning_rate=0.001),
-        loss="categorical_crossentropy",
-        metrics=["accuracy"]
-    )
 
-    with open(CLASS_PATH, "r") as f:
+def _load_class_index(path):
+    with open(path, "r") as f:
         class_map = json.load(f)
 
-    idx_to_class = {v: k for k, v in class_map.items()}
+    return {v: k for k, v in class_map.items()}
+
+
+def _with_classes(classifier):
+    # the class index is part of the model entry (watched alongside the
+    # artifact), so a reload can never pair a model with another's classes
+    classifier.idx_to_class = _load_class_index(CLASS_PATH)
+    return classifier
+
+
+def _load_disease_model(path):
+    # compile=False: the optimizer / loss only matter for training
+    return _with_classes(DiseaseClassifier(load_model(path, compile=False)))
+
+
+def _load_tflite_model(path):
+    with open(path, "rb") as f:
+        return _with_classes(TFLiteClassifier(f.read()))
+
+
+def _validate_model(model):
+    """
+    Smoke-test a freshly loaded model before it replaces the serving one.
+    This also traces the inference graph, so the first request doesn't,
+    and checks the class index covers exactly the model's outputs.
+    """
+    probs = model.predict(np.zeros((1, IMG_HEIGHT, IMG_WIDTH, 3), dtype="float32"))
+    if not model.idx_to_class:
+        raise ValueError("Class index mapping is empty")
+    if sorted(model.idx_to_class) != list(range(probs.shape[-1])):
+        raise ValueError(
+            f"Model outputs {probs.shape[-1]} classes but {CLASS_PATH} maps indices "
+            f"{min(model.idx_to_class)}..{max(model.idx_to_class)} ({len(model.idx_to_class)} classes)"
+        )
+
+
+if DISEASE_BACKEND == "keras":
+    registry.register(MODEL_NAME, MODEL_PATH, loader=_load_disease_model, validate=_validate_model,
+                      watch=[CLASS_PATH])
+elif DISEASE_BACKEND in TFLITE_PATHS:
+    registry.register(MODEL_NAME, TFLITE_PATHS[DISEASE_BACKEND], loader=_load_tflite_model,
+                      validate=_validate_model, watch=[CLASS_PATH])
+else:
+    raise ValueError(
+        f"Unknown ANNADATA_DISEASE_BACKEND '{DISEASE_BACKEND}'; use 'keras' or one of {sorted(TFLITE_PATHS)}"
+    )
+
 
-    img = image.load_img(image_path, target_size=(IMG_HEIGHT, IMG_WIDTH))
-    img_array = image.img_to_array(img) / 255.0
-    img_array = np.expand_dims(img_array, axis=0)
+def decode_image(source) -> np.ndarray:
+    """
+    Model-ready (H, W, 3) float32 array scaled to [0, 1] from encoded image
+    bytes, a file path, or a uint8 RGB array. Decoding happens in memory
+    and resizes with nearest-neighbour, like keras' load_img did.
+    Raises ValueError if the input is not a readable image.
+    """
+    if isinstance(source, np.ndarray):
+        if source.dtype != np.uint8:
+            if source.shape != (IMG_HEIGHT, IMG_WIDTH, 3):
+                raise ValueError(
+                    f"Float image arrays must be preprocessed to {(IMG_HEIGHT, IMG_WIDTH, 3)}, got {source.shape}"
+                )
+            return source.astype(np.float32, copy=False)
+        img = Image.fromarray(source)
+    else:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        elif not isinstance(source, (str, os.PathLike)) and not hasattr(source, "read"):
+            raise TypeError(f"Unsupported image source: {type(source).__name__}")
+        try:
+            img = Image.open(source)
+            img.load()
+        except (UnidentifiedImageError, OSError) as e:
+            raise ValueError("Could not decode image: unsupported or corrupt file") from e
+        except Image.DecompressionBombError as e:
+            # an Exception, not an OSError: would escape the per-image error handling
+            raise ValueError(f"Could not decode image: {e}") from e
 
-    preds = model.predict(img_array)
-    idx = int(np.argmax(preds))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != (IMG_WIDTH, IMG_HEIGHT):
+        img = img.resize((IMG_WIDTH, IMG_HEIGHT), Image.NEAREST)
+    return np.asarray(img, dtype=np.float32) / 255.0
+
+
+# Class probabilities keyed by a hash of the decoded, resized pixels, so a
+# re-upload (or lossless re-encode) of the same photo skips the model
+_result_cache = ResultCache(
+    MODEL_NAME,
+    max_bytes=int(RESULT_CACHE_MB * 2**20),
+    ttl=RESULT_CACHE_TTL_SECONDS,
+    disk_path=RESULT_CACHE_DISK_PATH or None,
+    sizeof=lambda probs: probs.nbytes,
+)
+
+
+def _pixel_key(img_array: np.ndarray) -> str:
+    return hashlib.blake2b(img_array.tobytes(), digest_size=16).hexdigest()
+
+
+def _predict_probs(model, version: Optional[str], images: Sequence[np.ndarray],
+                   batch_size: int = INFERENCE_BATCH_SIZE) -> List[np.ndarray]:
+    """
+    Class probabilities per decoded image, from the cache where possible.
+    `version` must be the registry version `model` was loaded as.
+    """
+    _result_cache.ensure_version(version)
+
+    keys = [_pixel_key(img) for img in images]
+    probs = [_result_cache.get(key) for key in keys]
+    missing = [i for i, p in enumerate(probs) if p is None]
+
+    for start in range(0, len(missing), batch_size):
+        chunk = missing[start:start + batch_size]
+        preds = model.predict(np.stack([images[i] for i in chunk]))
+        for i, p in zip(chunk, preds):
+            probs[i] = p
+            _result_cache.put(keys[i], p, version=version)
+    return probs
+
+
+def predict_disease(source):
+    """
+    Classify one leaf image. `source` is a file path, the encoded image
+    bytes (e.g. an upload), or an RGB array (see decode_image).
+    """
+    model, version = registry.get_with_version(MODEL_NAME)
+    idx_to_class = model.idx_to_class
+
+    preds = _predict_probs(model, version, [decode_image(source)])
+    idx = int(np.argmax(preds[0]))
     confidence = float(preds[0][idx])
 
     return {
@@ -35,6 +224,69 @@ def predict_disease(image_path):
     }
 
 
+_DECODE_POOL = None
+_DECODE_POOL_LOCK = threading.Lock()
+
+
+def _decode_pool() -> ThreadPoolExecutor:
+    # PIL releases the GIL while decoding, so threads decode in parallel
+    global _DECODE_POOL
+    with _DECODE_POOL_LOCK:
+        if _DECODE_POOL is None:
+            _DECODE_POOL = ThreadPoolExecutor(max_workers=DECODE_WORKERS,
+                                              thread_name_prefix="disease-decode")
+    return _DECODE_POOL
+
+
+def _try_decode(source):
+    try:
+        return decode_image(source)
+    except (ValueError, TypeError) as e:
+        return e
+
+
+def _topk(probs, idx_to_class, k):
+    # stable on ties, so the first entry always agrees with np.argmax
+    order = np.argsort(-probs, kind="stable")[:k]
+    return [{"disease": idx_to_class[int(i)], "confidence": float(probs[i])} for i in order]
+
+
+def predict_disease_batch(sources: Sequence[Any], top_k: int = 3,
+                          batch_size: int = INFERENCE_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Classify many images: decode them concurrently, stack the valid ones
+    not already cached into (N, H, W, 3) and run the model once per
+    `batch_size` chunk.
+    Returns one result per source in input order, each with the top
+    prediction and its `top_k` classes; images that fail to decode get an
+    {"error": ...} entry instead.
+    """
+    if not sources:
+        return []
+
+    model, version = registry.get_with_version(MODEL_NAME)
+    idx_to_class = model.idx_to_class
+
+    decoded = list(_decode_pool().map(_try_decode, sources))
+    results: List[Dict[str, Any]] = [None] * len(sources)
+    valid = []
+    for i, item in enumerate(decoded):
+        if isinstance(item, Exception):
+            results[i] = {"error": str(item)}
+        else:
+            valid.append(i)
+
+    preds = _predict_probs(model, version, [decoded[i] for i in valid], batch_size)
+    for i, probs in zip(valid, preds):
+        topk = _topk(probs, idx_to_class, top_k)
+        results[i] = {
+            "disease": topk[0]["disease"],
+            "confidence": topk[0]["confidence"],
+            "top_k": topk,
+        }
+    return results
+
+
 if __name__ == "__main__":
     # ✅ USE A REAL IMAGE PATH
     image_path = "data/disease/test/test/AppleScab1.JPG"
@@ -1,5 +1,14 @@
+import hashlib
+import os
+
+import tensorflow as tf
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
-from .config import IMG_HEIGHT, IMG_WIDTH, BATCH_SIZE, TRAIN_DIR, VAL_DIR
+from .config import (
+    IMG_HEIGHT, IMG_WIDTH, BATCH_SIZE, TRAIN_DIR, VAL_DIR, DATA_CACHE_DIR, INPUT_PIPELINE
+)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+AUTOTUNE = tf.data.AUTOTUNE
 
 
 def get_data_generators():
@@ -27,3 +36,107 @@ def get_data_generators():
     )
 
     return train_generator, val_generator
+
+
+# -------------------------------------------------------
+# tf.data pipeline
+# -------------------------------------------------------
+
+def list_images(directory, class_indices=None):
+    """
+    (paths, labels, class_indices) for a class-per-folder directory, with
+    classes indexed alphabetically like flow_from_directory.
+    """
+    if class_indices is None:
+        classes = sorted(d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d)))
+        class_indices = {name: i for i, name in enumerate(classes)}
+
+    paths, labels = [], []
+    for name, idx in sorted(class_indices.items(), key=lambda kv: kv[1]):
+        class_dir = os.path.join(directory, name)
+        if not os.path.isdir(class_dir):
+            continue
+        for fn in sorted(os.listdir(class_dir)):
+            if fn.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(class_dir, fn))
+                labels.append(idx)
+    return paths, labels, class_indices
+
+
+def load_image(path):
+    """Model-ready (H, W, 3) float32 tensor in [0, 1] for an image file."""
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    # nearest-neighbour, as flow_from_directory / load_img resize
+    image = tf.image.resize(image, (IMG_HEIGHT, IMG_WIDTH), method="nearest")
+    return tf.cast(image, tf.float32) / 255.0
+
+
+def _decode(path, label, num_classes):
+    return load_image(path), tf.one_hot(label, num_classes)
+
+
+def _augmenter():
+    # same ranges as the ImageDataGenerator: rotation 20 deg, zoom 0.2, horizontal flip
+    return tf.keras.Sequential([
+        tf.keras.layers.RandomRotation(20 / 360, fill_mode="nearest"),
+        tf.keras.layers.RandomZoom(0.2, fill_mode="nearest"),
+        tf.keras.layers.RandomFlip("horizontal"),
+    ])
+
+
+def make_dataset(directory, class_indices=None, training=False, cache_dir=DATA_CACHE_DIR,
+                 batch_size=BATCH_SIZE, seed=42):
+    """
+    Batched (images, one-hot labels) tf.data.Dataset for `directory`.
+
+    Files are decoded and resized in parallel, cached to `cache_dir`
+    (decoded pixels, before augmentation; None disables) once the first
+    epoch has run, and prefetched. Training sets are shuffled every epoch
+    and augmented on the fly. Returns (dataset, class_indices).
+    """
+    paths, labels, class_indices = list_images(directory, class_indices)
+    if not paths:
+        raise FileNotFoundError(f"No images found under {directory}")
+    num_classes = len(class_indices)
+
+    ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+    if training:
+        # one fixed file-level shuffle so the cached order is not sorted by class
+        ds = ds.shuffle(len(paths), seed=seed, reshuffle_each_iteration=False)
+    ds = ds.map(lambda p, y: _decode(p, y, num_classes), num_parallel_calls=AUTOTUNE)
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        # keyed by the file list, so adding / removing images starts a fresh cache
+        listing = hashlib.sha1("\n".join(paths).encode()).hexdigest()[:12]
+        name = os.path.basename(os.path.normpath(directory))
+        ds = ds.cache(os.path.join(cache_dir, f"{name}_{IMG_HEIGHT}x{IMG_WIDTH}_{listing}"))
+
+    if training:
+        ds = ds.shuffle(min(len(paths), 2048), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    if training:
+        augment = _augmenter()
+        ds = ds.map(lambda x, y: (augment(x, training=True), y), num_parallel_calls=AUTOTUNE)
+
+    return ds.prefetch(AUTOTUNE), class_indices
+
+
+def get_datasets():
+    """tf.data counterpart of get_data_generators(): (train_ds, val_ds, class_indices)."""
+    train_ds, class_indices = make_dataset(TRAIN_DIR, training=True)
+    val_ds, _ = make_dataset(VAL_DIR, class_indices=class_indices)
+    return train_ds, val_ds, class_indices
+
+
+def get_training_data():
+    """
+    (train, val, class_indices) from the pipeline selected by
+    ANNADATA_DISEASE_PIPELINE; both kinds can be passed to model.fit.
+    """
+    if INPUT_PIPELINE == "generator":
+        train_gen, val_gen = get_data_generators()
+        return train_gen, val_gen, train_gen.class_indices
+    if INPUT_PIPELINE != "tfdata":
+        raise ValueError(f"Unknown ANNADATA_DISEASE_PIPELINE '{INPUT_PIPELINE}'; use 'tfdata' or 'generator'")
+    return get_datasets()
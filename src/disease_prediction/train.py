@@ -1,51 +1,134 @@
+import argparse
 import json
+import os
+import time
+
+import numpy as np
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, GlobalAveragePooling2D
+from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Input
 from tensorflow.keras.optimizers import Adam
 
-from .preprocess import get_data_generators
-from .config import MODEL_PATH, CLASS_PATH, EPOCHS
+from .preprocess import get_training_data, list_images
+from .config import (
+    MODEL_PATH, CLASS_PATH, EPOCHS, BATCH_SIZE, IMG_HEIGHT, IMG_WIDTH, TRAIN_DIR, VAL_DIR, EMBEDDING_DIR,
+    EMBEDDING_COMPACT_FRACTION
+)
 
+BASE_WEIGHTS = "imagenet"
 
-def train_model():
-    train_gen, val_gen = get_data_generators()
-    num_classes = train_gen.num_classes
 
+def build_base_model(weights=BASE_WEIGHTS):
     base_model = MobileNetV2(
-        weights="imagenet",
+        weights=weights,
         include_top=False,
-        input_shape=(224, 224, 3)
+        input_shape=(IMG_HEIGHT, IMG_WIDTH, 3)
     )
     base_model.trainable = False
+    return base_model
 
-    model = Sequential([
-        base_model,
-        GlobalAveragePooling2D(),
+
+def build_head(num_classes):
+    return [
         Dense(128, activation="relu"),
         Dense(num_classes, activation="softmax")
-    ])
+    ]
+
 
+def _compile(model):
     model.compile(
         optimizer=Adam(learning_rate=0.001),
         loss="categorical_crossentropy",
         metrics=["accuracy"]
     )
 
-    model.fit(
-        train_gen,
-        validation_data=val_gen,
-        epochs=EPOCHS
-    )
 
+def _save(model, class_indices):
     model.save(MODEL_PATH, include_optimizer=False)
 
     # Save class index mapping
     with open(CLASS_PATH, "w") as f:
-        json.dump(train_gen.class_indices, f)
+        json.dump(class_indices, f)
 
     print("✅ Disease model and class labels saved")
 
 
+def train_model():
+    train_data, val_data, class_indices = get_training_data()
+    num_classes = len(class_indices)
+
+    model = Sequential([
+        build_base_model(),
+        GlobalAveragePooling2D(),
+        *build_head(num_classes)
+    ])
+    _compile(model)
+
+    model.fit(
+        train_data,
+        validation_data=val_data,
+        epochs=EPOCHS
+    )
+
+    _save(model, class_indices)
+
+
+def train_head_on_embeddings(train_dir=TRAIN_DIR, val_dir=VAL_DIR, weights=BASE_WEIGHTS):
+    """
+    Same model as train_model(), but the frozen base runs once per image:
+    pooled MobileNetV2 features are cached in an EmbeddingStore (only new
+    or modified images are embedded on later runs) and the Dense head is
+    trained on those vectors. Images are not augmented in this mode.
+    """
+    from .embeddings import EmbeddingStore
+
+    train_paths, train_labels, class_indices = list_images(train_dir)
+    val_paths, val_labels, _ = list_images(val_dir, class_indices)
+    num_classes = len(class_indices)
+
+    base_model = build_base_model(weights)
+    extractor = Sequential([base_model, GlobalAveragePooling2D()])
+
+    store = EmbeddingStore(os.path.join(EMBEDDING_DIR, f"mobilenetv2_{weights}_{IMG_HEIGHT}x{IMG_WIDTH}"))
+    start = time.perf_counter()
+    computed = store.update(train_paths + val_paths, extractor)
+    print(f"Embeddings: {computed} computed, {len(train_paths) + len(val_paths) - computed} cached "
+          f"({time.perf_counter() - start:.1f}s)")
+
+    head = Sequential([Input(shape=(extractor.output_shape[-1],)), *build_head(num_classes)])
+    _compile(head)
+
+    eye = np.eye(num_classes, dtype=np.float32)
+    validation = (store.get(val_paths), eye[val_labels]) if val_paths else None
+    start = time.perf_counter()
+    head.fit(
+        store.get(train_paths), eye[train_labels],
+        validation_data=validation,
+        epochs=EPOCHS,
+        batch_size=BATCH_SIZE,
+        shuffle=True
+    )
+    print(f"Head trained in {time.perf_counter() - start:.1f}s")
+
+    # serve the usual end-to-end model: frozen base + pooling + trained head
+    model = Sequential([Input(shape=(IMG_HEIGHT, IMG_WIDTH, 3)), base_model, GlobalAveragePooling2D(),
+                        *head.layers])
+    _save(model, class_indices)
+
+    dead = store.dead_fraction()
+    if dead > EMBEDDING_COMPACT_FRACTION:
+        store.compact()
+        print(f"Embeddings compacted: dropped {dead:.0%} orphaned rows")
+    return model
+
+
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train disease classification model.")
+    parser.add_argument("--embeddings", action="store_true",
+                        help="Train only the head on cached MobileNetV2 embeddings (no augmentation).")
+    args = parser.parse_args()
+
+    if args.embeddings:
+        train_head_on_embeddings()
+    else:
+        train_model()
@@ -8,20 +8,50 @@ import numpy as np
 import pandas as pd
 import joblib
 
+from src.serving import fast_path, forest, registry
+from src.serving.cache import memoized, prediction_cache, quantizer
 from .config import MODEL_FILENAME
 
 ALLOWED_MISSING = 2  # up to 2 missing allowed
 
+MODEL_NAME = "fertilizer"
+
+
+def _validate_payload(data):
+    """Smoke-test a freshly loaded artifact before it replaces the serving one."""
+    pipeline = data["pipeline"]
+    feature_columns = data["feature_columns"]
+    pipeline.predict(pd.DataFrame([[np.nan] * len(feature_columns)], columns=feature_columns))
+
+
+registry.register(MODEL_NAME, MODEL_FILENAME, loader=forest.load_artifact, validate=_validate_payload,
+                  watch=[forest.compiled_meta_path(MODEL_FILENAME)])
+
+# Feature columns come from the artifact, so every numeric input is
+# rounded to the same precision for memoization (categoricals kept as-is)
+CACHE_DECIMALS = 1
+_cache, _precision = prediction_cache(MODEL_NAME, {})
+
 
 # -------------------------------------------------------
 # Load Model
 # -------------------------------------------------------
-def load_pipeline(model_path=MODEL_FILENAME):
+def _is_default(model_path):
+    return os.path.abspath(model_path) == os.path.abspath(MODEL_FILENAME)
+
+
+def _load_payload(model_path):
+    """(artifact, registry version); the version is None for explicit, unregistered paths."""
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"No model file found at: {model_path}. Train model first.")
 
-    data = joblib.load(model_path)
+    # The default artifact stays resident in the registry; explicit paths are loaded as-is
+    if _is_default(model_path):
+        return registry.get_with_version(MODEL_NAME)
+    return joblib.load(model_path), None
+
 
+def _unpack(data):
     pipeline = data.get("pipeline")
     feature_columns = data.get("feature_columns")
     label_encoder = data.get("label_encoder", None)
@@ -32,12 +62,16 @@ def load_pipeline(model_path=MODEL_FILENAME):
     return pipeline, feature_columns, label_encoder
 
 
+def load_pipeline(model_path=MODEL_FILENAME):
+    return _unpack(_load_payload(model_path)[0])
+
+
 # -------------------------------------------------------
 # Input Validation
 # -------------------------------------------------------
-def validate_input_dict(input_dict, feature_columns):
+def validate_input_row(input_dict, feature_columns):
     """
-    Build a single-row DataFrame from input_dict using feature_columns order.
+    Build one row (dict in feature_columns order) from input_dict.
     Allow up to ALLOWED_MISSING NaN values.
     """
     missing_keys = []
@@ -56,6 +90,15 @@ def validate_input_dict(input_dict, feature_columns):
             f"Maximum allowed is {ALLOWED_MISSING}. Missing features: {missing_keys}"
         )
 
+    return row
+
+
+def validate_input_dict(input_dict, feature_columns):
+    """
+    Build a single-row DataFrame from input_dict using feature_columns order.
+    Allow up to ALLOWED_MISSING NaN values.
+    """
+    row = validate_input_row(input_dict, feature_columns)
     df = pd.DataFrame([row], columns=feature_columns)
     return df
 
@@ -63,11 +106,31 @@ def validate_input_dict(input_dict, feature_columns):
 # -------------------------------------------------------
 # Prediction (FINAL CLEAN VERSION)
 # -------------------------------------------------------
+def _predict_encoded(pipeline, rows, feature_columns, version=None):
+    """
+    Run the pipeline on validated rows, skipping pandas when the fast path
+    applies. Given the registry `version` of the pipeline, repeated rows
+    are served from the prediction cache.
+    """
+    fast = fast_path.for_model(pipeline)
+
+    def compute(batch):
+        if fast is not None:
+            return fast.predict(batch)
+        return pipeline.predict(pd.DataFrame(batch, columns=feature_columns))
+
+    if version is None:
+        return compute(rows)
+    quantize = quantizer(feature_columns, _precision, default=CACHE_DECIMALS)
+    return memoized(_cache, version, rows, quantize, compute)
+
+
 def predict_from_dict(input_dict, model_path=MODEL_FILENAME):
-    pipeline, feature_columns, label_encoder = load_pipeline(model_path)
-    X_df = validate_input_dict(input_dict, feature_columns)
+    data, version = _load_payload(model_path)
+    pipeline, feature_columns, label_encoder = _unpack(data)
+    row = validate_input_row(input_dict, feature_columns)
 
-    pred_enc = pipeline.predict(X_df)
+    pred_enc = _predict_encoded(pipeline, [row], feature_columns, version)
 
     # Decode label if encoder is present
     if label_encoder is not None:
@@ -83,6 +146,41 @@ def predict_from_dict(input_dict, model_path=MODEL_FILENAME):
     return {"recommended_fertilizer": final}
 
 
+def predict_batch_from_dicts(input_dicts, model_path=MODEL_FILENAME):
+    """
+    Batch version of predict_from_dict: validate every row, then run the
+    pipeline once over all valid rows. Results keep input order; rows that
+    fail validation get {"error": ...}.
+    """
+    data, version = _load_payload(model_path)
+    pipeline, feature_columns, label_encoder = _unpack(data)
+
+    results = [None] * len(input_dicts)
+    rows, positions = [], []
+    for i, input_dict in enumerate(input_dicts):
+        try:
+            rows.append(validate_input_row(input_dict, feature_columns))
+            positions.append(i)
+        except ValueError as e:
+            results[i] = {"error": str(e)}
+
+    if rows:
+        pred_enc = _predict_encoded(pipeline, rows, feature_columns, version)
+
+        if label_encoder is not None:
+            try:
+                finals = label_encoder.inverse_transform(np.asarray(pred_enc, dtype=int))
+            except Exception:
+                finals = [str(p) for p in pred_enc]
+        else:
+            finals = [str(p) for p in pred_enc]
+
+        for i, final in zip(positions, finals):
+            results[i] = {"recommended_fertilizer": final}
+
+    return results
+
+
 # -------------------------------------------------------
 # CLI Input Parsing
 # -------------------------------------------------------
@@ -4,11 +4,13 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 
 from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
 from config import RAW_DATA_PATH, RANDOM_STATE, TEST_SIZE
+# the shared training helpers live at the repo root: run with PYTHONPATH=<repo root>
+from src.training.matrices import categorical_encoder, sparse_threshold
 
 def load_data(path=RAW_DATA_PATH):
     """Load CSV into DataFrame."""
@@ -54,11 +56,13 @@ def coerce_numeric_like_columns(df, exclude_cols=None):
                 df[col] = pd.to_numeric(df[col], errors="coerce")
     return df
 
-def build_preprocessing_pipeline(df, target_col):
+def build_preprocessing_pipeline(df, target_col, encoding="onehot"):
     """
     Build a ColumnTransformer that:
       - imputes numeric with median + scales
-      - imputes categorical with most frequent + one-hot (sparse_output=False)
+      - imputes categorical with most frequent + encodes: dense one-hot by
+        default, or encoding="sparse" (float32 sparse one-hot) / "ordinal"
+        (one float32 code per column)
     Returns: preprocessor, feature_columns, numeric_cols, categorical_cols
     """
     all_cols = df.columns.tolist()
@@ -76,10 +80,9 @@ def build_preprocessing_pipeline(df, target_col):
         ("scaler", StandardScaler())
     ])
 
-    # Use sparse_output=False for sklearn >=1.4/1.6 compatibility
     categorical_transformer = Pipeline(steps=[
         ("imputer", SimpleImputer(strategy="most_frequent")),
-        ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
+        ("onehot", categorical_encoder(encoding))
     ])
 
     preprocessor = ColumnTransformer(
@@ -87,12 +90,14 @@ def build_preprocessing_pipeline(df, target_col):
             ("num", numeric_transformer, numeric_cols),
             ("cat", categorical_transformer, categorical_cols)
         ],
-        remainder="drop"
+        remainder="drop",
+        sparse_threshold=sparse_threshold(encoding)
     )
 
     return preprocessor, feature_columns, numeric_cols, categorical_cols
 
-def prepare_train_test(df, target_col, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=True):
+def prepare_train_test(df, target_col, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=True,
+                       encoding="onehot"):
     """
     Minimal preprocessing + train/test split.
     Returns a dict with preprocessor, feature lists and splits.
@@ -104,7 +109,7 @@ def prepare_train_test(df, target_col, test_size=TEST_SIZE, random_state=RANDOM_
     # Coerce numeric-like columns globally except target
     df = coerce_numeric_like_columns(df, exclude_cols=[target_col])
 
-    preprocessor, feature_columns, numeric_cols, categorical_cols = build_preprocessing_pipeline(df, target_col)
+    preprocessor, feature_columns, numeric_cols, categorical_cols = build_preprocessing_pipeline(df, target_col, encoding)
     X = df[feature_columns]
     y = df[target_col]
 
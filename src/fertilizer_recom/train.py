@@ -1,5 +1,6 @@
 # src/fertilizer_recom/train.py
 import os
+import time
 import joblib
 import argparse
 
@@ -17,13 +18,61 @@ from preprocess import load_data, prepare_train_test
 # Optional imports for tuning (only used if --tune specified)
 from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold
 
-def train_and_save(target_col, model_path=MODEL_FILENAME, overwrite=True, debug=False, no_stratify=False, tune=False):
+# small randomized search for useful defaults (tune=True)
+PARAM_DIST = {
+    "clf__n_estimators": [100, 200, 400],
+    "clf__max_depth": [None, 10, 30],
+    "clf__min_samples_split": [2, 5, 10],
+    "clf__max_features": ["sqrt", "log2", 0.5]
+}
+
+def build_classifier(estimator="forest", encoding="onehot", numeric_cols=(), categorical_cols=()):
+    """
+    Unfitted classifier for `estimator`. Boosted models (PYTHONPATH=<repo root>)
+    get native categorical splits on the categorical columns when `encoding`
+    is ordinal.
+    """
+    if estimator == "forest":
+        return RandomForestClassifier(
+            n_estimators=RF_N_ESTIMATORS,
+            max_depth=RF_MAX_DEPTH,
+            random_state=RANDOM_STATE,
+            n_jobs=-1
+        )
+    from src.training.estimators import boosted_estimator, categorical_mask
+    categorical = categorical_mask(encoding, numeric_cols, categorical_cols)
+    return boosted_estimator(estimator, "classifier", categorical=categorical, random_state=RANDOM_STATE)
+
+def train_and_save(target_col, model_path=MODEL_FILENAME, overwrite=True, debug=False, no_stratify=False, tune=False,
+                   mmap=False, encoding=None, shared_cv=False, n_iter=12, n_jobs=-1, param_dist=None,
+                   search="random", resource="n_estimators", time_budget=None, estimator="forest"):
     """
     Train a pipeline and save it. Options:
+      - estimator: "forest" (RandomForestClassifier), "hist_gb" or "xgboost"
+        (gradient boosting, see src/training/estimators.py)
       - debug: print diagnostics and save test_predictions_debug.csv
       - no_stratify: disable stratified splitting
       - tune: run a small RandomizedSearchCV to tune RF hyperparameters
+        (n_iter candidates from param_dist, n_jobs worker processes)
+      - mmap: also export the forest as memory-mappable arrays next to the pickle
+      - encoding: "onehot" (dense), "sparse" or "ordinal" categorical encoding;
+        defaults to onehot for forests and ordinal (native categorical
+        splits) for boosted models
+      - shared_cv: with tune, encode the training split once into a float32
+        matrix memory-mapped by every CV worker instead of re-encoding per fit
+      - search: with tune, "random" (RandomizedSearchCV) or "halving"
+        (successive halving over n_iter sampled candidates, growing
+        `resource` between rounds, stopping after `time_budget` seconds and
+        resuming from <model>_search.json)
     """
+    if estimator == "forest":
+        encoding = encoding or "onehot"
+    else:
+        # the shared training helpers live at the repo root: run with PYTHONPATH=<repo root>
+        from src.training import estimators
+        encoding = encoding or estimators.default_encoding(estimator)
+        estimators.check_export(estimator, mmap)
+
     df = load_data()
     df.columns = df.columns.str.strip()
 
@@ -33,7 +82,8 @@ def train_and_save(target_col, model_path=MODEL_FILENAME, overwrite=True, debug=
         if target_col in df.columns:
             print("Target value counts:\n", df[target_col].value_counts(dropna=False).head(100))
 
-    prep = prepare_train_test(df, target_col=target_col, random_state=RANDOM_STATE, stratify=not no_stratify)
+    prep = prepare_train_test(df, target_col=target_col, random_state=RANDOM_STATE, stratify=not no_stratify,
+                              encoding=encoding)
     preprocessor = prep["preprocessor"]
     X_train = prep["X_train"]
     X_test = prep["X_test"]
@@ -45,12 +95,9 @@ def train_and_save(target_col, model_path=MODEL_FILENAME, overwrite=True, debug=
     y_train_enc = le.fit_transform(y_train.astype(str))
     y_test_enc = le.transform(y_test.astype(str))
 
-    clf = RandomForestClassifier(
-        n_estimators=RF_N_ESTIMATORS,
-        max_depth=RF_MAX_DEPTH,
-        random_state=RANDOM_STATE,
-        n_jobs=-1
-    )
+    clf = build_classifier(estimator, encoding, prep["numeric_cols"], prep["categorical_cols"])
+    if estimator != "forest":
+        param_dist = param_dist or estimators.search_space(estimator, "clf")
 
     pipeline = Pipeline(steps=[
         ("preprocessor", preprocessor),
@@ -58,19 +105,28 @@ def train_and_save(target_col, model_path=MODEL_FILENAME, overwrite=True, debug=
     ])
 
     if tune:
-        # small randomized search for useful defaults
         skf = StratifiedKFold(n_splits=4, shuffle=True, random_state=RANDOM_STATE)
-        param_dist = {
-            "clf__n_estimators": [100, 200, 400],
-            "clf__max_depth": [None, 10, 30],
-            "clf__min_samples_split": [2, 5, 10],
-            "clf__max_features": ["sqrt", "log2", 0.5]
-        }
-        rs = RandomizedSearchCV(pipeline, param_distributions=param_dist, n_iter=12, cv=skf,
-                                scoring="accuracy", n_jobs=-1, random_state=RANDOM_STATE, verbose=1)
-        print("Running RandomizedSearchCV (tune=True). This may take some time...")
-        rs.fit(X_train, y_train_enc)
-        pipeline = rs.best_estimator_
+        search_kwargs = dict(cv=skf, scoring="accuracy", n_jobs=n_jobs, random_state=RANDOM_STATE, verbose=1)
+        if search == "halving":
+            # the shared training helpers live at the repo root: run with PYTHONPATH=<repo root>
+            from src.training.search import SuccessiveHalving
+            search_cls = SuccessiveHalving
+            search_kwargs.update(resource=resource, n_candidates=n_iter, time_budget=time_budget,
+                                 state_path=os.path.splitext(model_path)[0] + "_search.json")
+        else:
+            search_cls = RandomizedSearchCV
+            search_kwargs.update(n_iter=n_iter)
+        print(f"Running {search_cls.__name__} (tune=True). This may take some time...")
+        start = time.perf_counter()
+        if shared_cv:
+            from src.training.matrices import fit_search_shared
+            pipeline, rs = fit_search_shared(search_cls, pipeline, param_dist or PARAM_DIST, X_train,
+                                             y_train_enc, **search_kwargs)
+        else:
+            rs = search_cls(pipeline, param_dist or PARAM_DIST, **search_kwargs)
+            rs.fit(X_train, y_train_enc)
+            pipeline = rs.best_estimator_
+        print(f"Search took {time.perf_counter() - start:.1f}s")
         print("Best params:", rs.best_params_)
         print("Best CV score:", rs.best_score_)
     else:
@@ -109,6 +165,12 @@ def train_and_save(target_col, model_path=MODEL_FILENAME, overwrite=True, debug=
     joblib.dump(payload, model_path)
     print(f"Saved pipeline + label mapping to {model_path}")
 
+    if mmap:
+        # the serving package lives at the repo root: run with PYTHONPATH=<repo root>
+        from src.serving.forest import compiled_dir, export_artifact
+        export_artifact(model_path, obj=payload)
+        print(f"Saved memory-mappable forest to {compiled_dir(model_path)}")
+
     return pipeline
 
 if __name__ == "__main__":
@@ -119,7 +181,26 @@ if __name__ == "__main__":
     parser.add_argument("--debug", action="store_true", help="Print debug info and save test_predictions_debug.csv.")
     parser.add_argument("--no-stratify", action="store_true", help="Do not stratify train/test split.")
     parser.add_argument("--tune", action="store_true", help="Run RandomizedSearchCV for light hyperparameter tuning.")
+    parser.add_argument("--mmap", action="store_true", help="Also export a memory-mappable compiled forest.")
+    parser.add_argument("--estimator", choices=["forest", "hist_gb", "xgboost"], default="forest",
+                        help="Random forest or gradient boosting (boosting needs PYTHONPATH=<repo root>; "
+                             "xgboost must be installed separately).")
+    parser.add_argument("--encoding", choices=["onehot", "sparse", "ordinal"], default=None,
+                        help="Categorical encoding (default: onehot for forests, ordinal for boosting).")
+    parser.add_argument("--shared-cv", action="store_true",
+                        help="With --tune, share one float32 memory-mapped training matrix across CV workers.")
+    parser.add_argument("--n-iter", type=int, default=12, help="Candidates sampled by --tune.")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Worker processes used by --tune.")
+    parser.add_argument("--search", choices=["random", "halving"], default="random",
+                        help="With --tune: randomized search or successive halving (needs PYTHONPATH=<repo root>).")
+    parser.add_argument("--resource", choices=["n_samples", "n_estimators"], default="n_estimators",
+                        help="What successive halving grows between rounds.")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Stop successive halving after this many seconds and keep the best so far.")
     args = parser.parse_args()
 
     train_and_save(target_col=args.target, model_path=args.model_path, overwrite=(not args.no_overwrite),
-                   debug=args.debug, no_stratify=args.no_stratify, tune=args.tune)
+                   debug=args.debug, no_stratify=args.no_stratify, tune=args.tune, mmap=args.mmap,
+                   encoding=args.encoding, shared_cv=args.shared_cv, n_iter=args.n_iter, n_jobs=args.n_jobs,
+                   search=args.search, resource=args.resource, time_budget=args.time_budget,
+                   estimator=args.estimator)
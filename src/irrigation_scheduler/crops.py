@@ -0,0 +1,38 @@
+# src/irrigation_scheduler/crops.py
+# Crop constants shared by data generation, the API and the planner.
+
+# Soil moisture (%) below which a crop needs water; the irrigation labels
+# in data_generation.py are drawn from these
+CROP_THRESHOLDS = {
+    "Barley": 30,
+    "Cotton": 25,
+    "Ground Nuts": 30,
+    "Maize": 30,
+    "Millets": 25,
+    "Oil seeds": 30,
+    "Paddy": 55,
+    "Pulses": 25,
+    "Sugarcane": 45,
+    "Tobacco": 35,
+    "Wheat": 30
+}
+
+# crop_type_encoded as produced by data_preprocessing.py (LabelEncoder,
+# i.e. alphabetical order)
+CROP_ENCODING_MAP = {crop: i for i, crop in enumerate(sorted(CROP_THRESHOLDS))}
+
+# Mid-season crop coefficients (FAO-56, table 12): crop water use
+# relative to the reference evapotranspiration
+CROP_COEFFICIENTS = {
+    "Barley": 1.15,
+    "Cotton": 1.15,
+    "Ground Nuts": 1.15,
+    "Maize": 1.20,
+    "Millets": 1.00,
+    "Oil seeds": 1.10,
+    "Paddy": 1.20,
+    "Pulses": 1.05,
+    "Sugarcane": 1.25,
+    "Tobacco": 1.10,
+    "Wheat": 1.15
+}
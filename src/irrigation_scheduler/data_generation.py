@@ -1,9 +1,37 @@
-import pandas as pd
-import numpy as np
+# src/irrigation_scheduler/data_generation.py
+# Synthetic irrigation readings.
+#
+# Every row draws a crop, soil moisture U(10, 80), temperature U(20, 45),
+# humidity U(20, 90) (all rounded to 2 decimals) and a rain forecast
+# (30 % yes); irrigation is needed when moisture is below the crop's
+# threshold and no rain is forecast. Rows are generated in vectorized
+# chunks from a seeded numpy Generator (one child seed per chunk) and
+# streamed to CSV (optionally .gz) or Parquet, so memory stays bounded by
+# the chunk size whatever the row count. Output is reproducible for a
+# given seed and chunk size.
+#
+#   python -m src.irrigation_scheduler.data_generation
+#   python -m src.irrigation_scheduler.data_generation --rows 200000000 \
+#       --output data/scheduler/raw/stress.parquet --crops Paddy=3 Wheat=1
+
+import argparse
+import importlib
 import os
+import time
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.irrigation_scheduler.crops import CROP_THRESHOLDS
 
-np.random.seed(42)
 NUM_SAMPLES = 2000
+SEED = 42
+CHUNK_ROWS = 1_000_000
+RAIN_PROBABILITY = 0.3
+# fast compression presets: stress data is written far more often than it is archived
+GZIP_LEVEL = 1
+XZ_PRESET = 1
 
 # -----------------------------
 # SAFE ABSOLUTE PATH HANDLING
@@ -19,58 +47,220 @@ OUTPUT_PATH = os.path.join(
     "irrigation_data.csv"
 )
 
-os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+COLUMNS = [
+    "soil_moisture",
+    "temperature",
+    "humidity",
+    "rain_forecast",
+    "crop_type",
+    "irrigation_needed"
+]
+
+_CROPS = list(CROP_THRESHOLDS)
+
 
 # -----------------------------
 # DATA GENERATION
 # -----------------------------
-crop_thresholds = {
-    "Barley": 30,
-    "Cotton": 25,
-    "Ground Nuts": 30,
-    "Maize": 30,
-    "Millets": 25,
-    "Oil seeds": 30,
-    "Paddy": 55,
-    "Pulses": 25,
-    "Sugarcane": 45,
-    "Tobacco": 35,
-    "Wheat": 30
-}
-
-records = []
-
-for _ in range(NUM_SAMPLES):
-    crop = np.random.choice(list(crop_thresholds.keys()))
-    soil_moisture = round(np.random.uniform(10, 80), 2)
-    temperature = round(np.random.uniform(20, 45), 2)
-    humidity = round(np.random.uniform(20, 90), 2)
-    rain_forecast = np.random.choice([0, 1], p=[0.7, 0.3])
-
-    irrigation_needed = 1 if soil_moisture < crop_thresholds[crop] and rain_forecast == 0 else 0
-
-    records.append([
-        soil_moisture,
-        temperature,
-        humidity,
-        rain_forecast,
-        crop,
-        irrigation_needed
-    ])
-
-df = pd.DataFrame(
-    records,
-    columns=[
-        "soil_moisture",
-        "temperature",
-        "humidity",
-        "rain_forecast",
-        "crop_type",
-        "irrigation_needed"
-    ]
-)
+def crop_probabilities(weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Probability of each crop in CROP_THRESHOLDS order (uniform by default)."""
+    if not weights:
+        return np.full(len(_CROPS), 1.0 / len(_CROPS))
+    unknown = set(weights) - set(_CROPS)
+    if unknown:
+        raise ValueError(f"Unknown crops {sorted(unknown)}; choose from {_CROPS}")
+    p = np.array([float(weights.get(c, 0.0)) for c in _CROPS])
+    if (p < 0).any() or p.sum() <= 0:
+        raise ValueError("Crop weights must be non-negative and not all zero")
+    return p / p.sum()
+
+
+def generate_chunk(rng: np.random.Generator, n: int, crop_p: np.ndarray) -> pd.DataFrame:
+    crop = rng.choice(len(_CROPS), size=n, p=crop_p)
+    soil_moisture = np.round(rng.uniform(10, 80, n), 2)
+    temperature = np.round(rng.uniform(20, 45, n), 2)
+    humidity = np.round(rng.uniform(20, 90, n), 2)
+    rain_forecast = (rng.random(n) < RAIN_PROBABILITY).astype(np.int64)
+
+    thresholds = np.array([CROP_THRESHOLDS[c] for c in _CROPS], dtype=np.float64)
+    irrigation_needed = ((soil_moisture < thresholds[crop]) & (rain_forecast == 0)).astype(np.int64)
+
+    return pd.DataFrame({
+        "soil_moisture": soil_moisture,
+        "temperature": temperature,
+        "humidity": humidity,
+        "rain_forecast": rain_forecast,
+        "crop_type": pd.Categorical.from_codes(crop, categories=_CROPS),
+        "irrigation_needed": irrigation_needed,
+    }, columns=COLUMNS)
+
+
+def generate_chunks(rows: int, seed: int = SEED, crop_weights: Optional[Dict[str, float]] = None,
+                    chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """`rows` synthetic records as DataFrames of at most `chunk_rows` rows."""
+    crop_p = crop_probabilities(crop_weights)
+    if rows <= 0:
+        # one empty chunk: writers still emit the CSV header / Parquet schema
+        yield generate_chunk(np.random.default_rng(seed), 0, crop_p)
+        return
+    n_chunks = -(-rows // chunk_rows)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        n = min(chunk_rows, rows - i * chunk_rows)
+        yield generate_chunk(np.random.default_rng(child), n, crop_p)
+
+
+def generate(rows: int = NUM_SAMPLES, seed: int = SEED, crop_weights: Optional[Dict[str, float]] = None,
+             chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """All rows in one DataFrame (small datasets)."""
+    return pd.concat(list(generate_chunks(rows, seed, crop_weights, chunk_rows)), ignore_index=True)
+
+
+# -----------------------------
+# STREAMING OUTPUT
+# -----------------------------
+_PAD = 0  # filler byte dropped before writing
+
+
+def _two_decimals(values: np.ndarray):
+    """
+    (n, 5) bytes "dd.dd" as pandas writes them ("45.5", not "45.50"), or
+    None when some value is outside [10, 100).
+    """
+    cents = np.rint(values * 100).astype(np.int64)
+    if len(cents) and (cents.min() < 1000 or cents.max() >= 10000):
+        return None
+    out = np.empty((len(cents), 5), dtype=np.uint8)
+    out[:, 0] = 48 + cents // 1000
+    out[:, 1] = 48 + cents // 100 % 10
+    out[:, 2] = ord(".")
+    out[:, 3] = 48 + cents // 10 % 10
+    last = cents % 10
+    out[:, 4] = np.where(last == 0, _PAD, 48 + last)
+    return out
+
+
+def csv_bytes(chunk: pd.DataFrame, header: bool = False) -> bytes:
+    """
+    CSV text of a generated chunk, byte-identical to chunk.to_csv(index=False)
+    but assembled as one (rows, width) byte matrix instead of row by row.
+    """
+    blocks = [_two_decimals(chunk[c].to_numpy()) for c in ("soil_moisture", "temperature", "humidity")]
+    if any(b is None for b in blocks):
+        return chunk.to_csv(index=False, header=header).encode()
+
+    n = len(chunk)
+    names = list(chunk["crop_type"].cat.categories)
+    width = max(len(name) for name in names)
+    table = np.zeros((len(names), width), dtype=np.uint8)
+    for k, name in enumerate(names):
+        table[k, :len(name)] = np.frombuffer(name.encode(), dtype=np.uint8)
+
+    def column(char):
+        return np.full((n, 1), ord(char), dtype=np.uint8)
+
+    def digit(values):
+        return (48 + values.astype(np.uint8)).reshape(n, 1)
+
+    rows = np.hstack([
+        blocks[0], column(","), blocks[1], column(","), blocks[2], column(","),
+        digit(chunk["rain_forecast"].to_numpy()), column(","),
+        table[chunk["crop_type"].cat.codes.to_numpy()], column(","),
+        digit(chunk["irrigation_needed"].to_numpy()), column("\n"),
+    ]).ravel()
+    text = rows[rows != _PAD].tobytes()
+    return (",".join(COLUMNS) + "\n").encode() + text if header else text
+
+
+def _open_csv(path: str):
+    ext = os.path.splitext(path)[1]
+    if ext == ".gz":
+        import gzip
+        return gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+    if ext == ".bz2":
+        import bz2
+        return bz2.open(path, "wb")
+    if ext == ".xz":
+        import lzma
+        return lzma.open(path, "wb", preset=XZ_PRESET)
+    if ext == ".zst":
+        import zstandard
+        return zstandard.open(path, "wb")
+    return open(path, "wb")
+
+
+def _require(module: str, fmt: str):
+    """Import an optional writer dependency, failing before any output is created."""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise RuntimeError(f"{fmt} output needs {module} (pip install {module}); use .csv.gz instead")
+
+
+def write(path: str, rows: int, seed: int = SEED, crop_weights: Optional[Dict[str, float]] = None,
+          chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Stream rows to `path`: .parquet (needs pyarrow), .csv or a compressed
+    CSV (.csv.gz / .csv.bz2 / .csv.xz / .csv.zst, the last needs zstandard).
+    Returns rows written; zero rows still write the header / schema.
+    """
+    parquet = path.endswith(".parquet")
+    if parquet:
+        pa = _require("pyarrow", "Parquet")
+        import pyarrow.parquet as pq
+    elif path.endswith(".zst"):
+        _require("zstandard", "Zstandard")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    chunks = generate_chunks(rows, seed, crop_weights, chunk_rows)
+    tmp = path + ".tmp" + os.path.splitext(path)[1]
+    written = 0
+
+    if parquet:
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema, compression="zstd")
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with _open_csv(tmp) as f:
+            for i, chunk in enumerate(chunks):
+                f.write(csv_bytes(chunk, header=i == 0))
+                written += len(chunk)
+
+    os.replace(tmp, path)
+    return written
+
+
+def _parse_weights(items):
+    weights = {}
+    for item in items or []:
+        crop, _, weight = item.rpartition("=")
+        if not crop:
+            raise argparse.ArgumentTypeError(f"Expected CROP=WEIGHT, got '{item}'")
+        weights[crop] = float(weight)
+    return weights
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic irrigation data.")
+    parser.add_argument("--rows", type=int, default=NUM_SAMPLES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--crops", nargs="+", metavar="CROP=WEIGHT",
+                        help="Relative crop frequencies (others get 0); uniform over all crops by default.")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows generated and written at a time.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help=".csv, .csv.gz (or .bz2/.xz/.zst) or .parquet")
+    args = parser.parse_args()
 
-df.to_csv(OUTPUT_PATH, index=False)
+    start = time.perf_counter()
+    n = write(args.output, args.rows, args.seed, _parse_weights(args.crops), args.chunk_rows)
+    elapsed = time.perf_counter() - start
 
-print("✅ Dataset saved at:")
-print(OUTPUT_PATH)
+    print("✅ Dataset saved at:")
+    print(args.output)
+    print(f"{n:,} rows in {elapsed:.1f}s ({n / elapsed:,.0f} rows/s)")
@@ -0,0 +1,321 @@
+# src/irrigation_scheduler/fleet.py
+# Streaming irrigation decisions for a whole fleet of fields.
+#
+# Probes report every few minutes; each reading row is
+#
+#   timestamp, field_id, soil_moisture, temperature, humidity, rain_forecast, crop_type_encoded
+#
+# where any feature may be blank (a moisture probe does not know the
+# forecast, the crop is set once per field). FleetScheduler merges every
+# reading into the field's last known features, evaluates the irrigation
+# model on whole batches of readings at once (the generated rules from
+# rules.py when available) and emits a row only when a field's decision
+# changes. Per-field state lives in preallocated NumPy arrays indexed by a
+# slot number, about 60 bytes per field plus its id.
+#
+#   python -m src.irrigation_scheduler.fleet --csv readings.csv [--output changes.csv]
+#   python -m src.irrigation_scheduler.fleet --socket host:port
+
+import argparse
+import io
+import socket
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.irrigation_scheduler import rules
+from src.irrigation_scheduler.scheduler import FEATURE_COLUMNS, MODEL_NAME
+from src.serving import registry
+
+READING_COLUMNS = ["timestamp", "field_id", *FEATURE_COLUMNS]
+CHANGE_COLUMNS = ["timestamp", "field_id", "decision"]
+
+DECISIONS = np.array(["Do Not Irrigate", "Irrigate"], dtype=object)
+NO_DECISION = -1
+
+BATCH_ROWS = 50000
+
+
+# -------------------------------------------------------
+# Sources: every source yields DataFrames of READING_COLUMNS
+# -------------------------------------------------------
+def _readings_frame(df: pd.DataFrame) -> pd.DataFrame:
+    for col in READING_COLUMNS:
+        if col not in df.columns:
+            df[col] = np.nan
+    return df
+
+
+def csv_source(path, batch_rows: int = BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """Chunks of a readings CSV (with a header row)."""
+    for chunk in pd.read_csv(path, chunksize=batch_rows):
+        yield _readings_frame(chunk)
+
+
+def record_source(records: Iterable[Any], batch_rows: int = BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """Batches of an iterable of reading dicts (or tuples in READING_COLUMNS order)."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= batch_rows:
+            yield _readings_frame(pd.DataFrame.from_records(chunk, columns=READING_COLUMNS))
+            chunk = []
+    if chunk:
+        yield _readings_frame(pd.DataFrame.from_records(chunk, columns=READING_COLUMNS))
+
+
+def socket_source(host: str, port: int, batch_rows: int = BATCH_ROWS,
+                  max_delay: float = 1.0) -> Iterator[pd.DataFrame]:
+    """
+    Headerless CSV lines in READING_COLUMNS order from a TCP stream. A batch
+    is emitted after `batch_rows` lines or `max_delay` seconds, whichever
+    comes first, so a quiet stream still gets timely decisions.
+    """
+    with socket.create_connection((host, port)) as conn:
+        conn.settimeout(max_delay)
+        pending = b""
+        lines = []
+        deadline = time.monotonic() + max_delay
+
+        def flush():
+            data = b"".join(lines)
+            lines.clear()
+            return pd.read_csv(io.BytesIO(data), names=READING_COLUMNS, header=None)
+
+        while True:
+            try:
+                data = conn.recv(1 << 16)
+            except socket.timeout:
+                data = None
+            if data == b"":
+                break
+            if data:
+                pending += data
+                *complete, pending = pending.split(b"\n")
+                lines.extend(line + b"\n" for line in complete if line.strip())
+            if lines and (len(lines) >= batch_rows or time.monotonic() >= deadline):
+                yield flush()
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + max_delay
+
+        if pending.strip():
+            lines.append(pending)
+        if lines:
+            yield flush()
+
+
+# -------------------------------------------------------
+# Per-field state
+# -------------------------------------------------------
+class FieldStore:
+    """
+    Last known features, decision and reading time of every field, in
+    arrays that grow by doubling. Features are stored column-major so each
+    feature is one contiguous array, the layout the generated rules take.
+    """
+
+    def __init__(self, n_features: int, capacity: int = 1024):
+        self.n_features = n_features
+        self.size = 0
+        self._slot: Dict[Any, int] = {}
+        self.ids = np.empty(capacity, dtype=object)
+        self.features = np.full((n_features, capacity), np.nan)
+        self.decision = np.full(capacity, NO_DECISION, dtype=np.int8)
+        self.last_seen = np.full(capacity, None, dtype=object)
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.decision)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        extra = capacity - len(self.decision)
+        self.ids = np.concatenate([self.ids, np.empty(extra, dtype=object)])
+        self.features = np.hstack([self.features, np.full((self.n_features, extra), np.nan)])
+        self.decision = np.concatenate([self.decision, np.full(extra, NO_DECISION, dtype=np.int8)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(extra, None, dtype=object)])
+
+    def slots(self, field_ids) -> np.ndarray:
+        """Slot of every id, allocating slots for fields seen for the first time."""
+        codes, uniques = pd.factorize(np.asarray(field_ids), use_na_sentinel=False)
+        slot = self._slot
+        mapped = np.empty(len(uniques), dtype=np.int64)
+        for k, field_id in enumerate(uniques.tolist()):
+            s = slot.get(field_id)
+            if s is None:
+                s = slot[field_id] = self.size
+                self.size += 1
+            mapped[k] = s
+        self._grow(self.size)
+        self.ids[mapped] = uniques
+        return mapped[codes]
+
+    def snapshot(self) -> pd.DataFrame:
+        """Current state of every field, decisions as labels."""
+        n = self.size
+        df = pd.DataFrame(self.features[:, :n].T, columns=FEATURE_COLUMNS[:self.n_features])
+        df.insert(0, "field_id", self.ids[:n])
+        df["last_seen"] = self.last_seen[:n]
+        decision = self.decision[:n]
+        df["decision"] = np.where(decision == NO_DECISION, None, DECISIONS.take(np.maximum(decision, 0)))
+        return df
+
+
+def _ffill_within(values: np.ndarray, present: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """
+    Forward-fill `values` over rows where `present` is False, never across
+    the group boundaries marked by `first` (rows are sorted by group).
+    """
+    idx = np.arange(len(values))
+    source = np.maximum.accumulate(np.where(present | first, idx, 0))
+    return values[source]
+
+
+# -------------------------------------------------------
+# Engine
+# -------------------------------------------------------
+class FleetScheduler:
+    """
+    Consumes batches of readings and returns the decision changes they
+    cause. Readings within a batch are applied in row order; decisions
+    need every feature of the field known (after merging with its state).
+    """
+
+    def __init__(self, model=None, capacity: int = 1024):
+        self._model = model
+        self.store = FieldStore(len(FEATURE_COLUMNS), capacity)
+        self.readings = 0
+        self.batches = 0
+        self.changes = 0
+        self.seconds = 0.0
+
+    def _decide(self, columns) -> np.ndarray:
+        model = self._model if self._model is not None else registry.get(MODEL_NAME)
+        compiled = rules.for_model(model)
+        if compiled is not None:
+            predictions = compiled.decide_columns(*columns)
+        else:
+            predictions = model.predict(pd.DataFrame(dict(zip(FEATURE_COLUMNS, columns))))
+        return (np.asarray(predictions) == 1).astype(np.int8)
+
+    def process(self, batch: pd.DataFrame) -> pd.DataFrame:
+        """Apply one batch of readings; returns its decision changes in stream order."""
+        start = time.perf_counter()
+        n = len(batch)
+        if n == 0:
+            return pd.DataFrame(columns=CHANGE_COLUMNS)
+        store = self.store
+
+        slots = store.slots(batch["field_id"].to_numpy())
+        order = np.argsort(slots, kind="stable")
+        s = slots[order]
+        first = np.ones(n, dtype=bool)
+        first[1:] = s[1:] != s[:-1]
+        last = np.ones(n, dtype=bool)
+        last[:-1] = first[1:]
+
+        # merge each reading with what is known about its field
+        columns = []
+        for j, name in enumerate(FEATURE_COLUMNS):
+            v = batch[name].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+            present = ~np.isnan(v)
+            seed = first & ~present
+            v[seed] = store.features[j, s[seed]]
+            v = _ffill_within(v, present, first)
+            store.features[j, s[last]] = v[last]
+            columns.append(v)
+
+        complete = np.ones(n, dtype=bool)
+        for v in columns:
+            complete &= ~np.isnan(v)
+
+        decision = np.full(n, NO_DECISION, dtype=np.int8)
+        if complete.all():
+            decision[:] = self._decide(columns)
+        elif complete.any():
+            decision[complete] = self._decide([v[complete] for v in columns])
+
+        # previous decision of the same field for every reading
+        decided = decision != NO_DECISION
+        current = decision.copy()
+        current[first & ~decided] = store.decision[s[first & ~decided]]
+        current = _ffill_within(current, decided, first)
+        previous = np.empty(n, dtype=np.int8)
+        previous[1:] = current[:-1]
+        previous[first] = store.decision[s[first]]
+        store.decision[s[last]] = current[last]
+
+        timestamps = batch["timestamp"].to_numpy()
+        store.last_seen[s[last]] = timestamps[order[last]]
+
+        changed = np.sort(order[decided & (decision != previous)])
+        decision_by_row = np.empty(n, dtype=np.int8)
+        decision_by_row[order] = decision
+        changes = pd.DataFrame({
+            "timestamp": timestamps[changed],
+            "field_id": batch["field_id"].to_numpy()[changed],
+            "decision": DECISIONS.take(decision_by_row[changed]),
+        })
+
+        self.readings += n
+        self.batches += 1
+        self.changes += len(changes)
+        self.seconds += time.perf_counter() - start
+        return changes
+
+    def run(self, source: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """process() every batch of `source`, yielding the non-empty change sets."""
+        for batch in source:
+            changes = self.process(batch)
+            if len(changes):
+                yield changes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fields": len(self.store),
+            "readings": self.readings,
+            "batches": self.batches,
+            "changes": self.changes,
+            "seconds": round(self.seconds, 3),
+            "readings_per_minute": round(self.readings / self.seconds * 60) if self.seconds else None,
+        }
+
+
+def main(source, output: Optional[str]):
+    engine = FleetScheduler()
+    out = open(output, "w", newline="") if output else sys.stdout
+    try:
+        header = True
+        for changes in engine.run(source):
+            changes.to_csv(out, header=header, index=False)
+            header = False
+            out.flush()
+    finally:
+        if output:
+            out.close()
+    print(engine.stats(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream irrigation decision changes for a fleet of fields.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--csv", help="Readings CSV with a header row ('-' for stdin).")
+    group.add_argument("--socket", help="host:port sending headerless CSV reading lines.")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--max-delay", type=float, default=1.0, help="Socket batch flush interval (s).")
+    parser.add_argument("--output", help="Write changes here instead of stdout.")
+    args = parser.parse_args()
+
+    if args.csv:
+        source = csv_source(sys.stdin if args.csv == "-" else args.csv, args.batch_rows)
+    else:
+        host, _, port = args.socket.rpartition(":")
+        source = socket_source(host or "localhost", int(port), args.batch_rows, args.max_delay)
+
+    main(source, args.output)
@@ -0,0 +1,163 @@
+# src/irrigation_scheduler/planner.py
+# Multi-day irrigation plans from a weather forecast and a soil water balance.
+#
+# The scheduler answers "irrigate now?" for one reading. plan_irrigation()
+# projects soil moisture forward day by day for many fields at once (one
+# vectorized step per day over all fields) and schedules irrigation on the
+# days the crop would otherwise end below its threshold:
+#
+#   et_mm     = Kc(crop) * ET0(temperature, humidity)
+#   rain_mm   = rain_probability * forecast rain (RAIN_EVENT_MM if not given)
+#   moisture += (rain_mm - et_mm) / ROOT_ZONE_MM * 100, capped at FIELD_CAPACITY
+#   if moisture < CROP_THRESHOLDS[crop]: irrigate back up to threshold + REFILL_POINTS
+#
+# ET0 is a vapour-pressure-deficit approximation (FAO-56 saturation vapour
+# pressure), good enough to rank days without radiation data. Soil moisture
+# is in volumetric %, as reported by the probes.
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.irrigation_scheduler.crops import CROP_COEFFICIENTS, CROP_ENCODING_MAP, CROP_THRESHOLDS
+
+# Depth of soil the roots draw from: 1 % moisture = ROOT_ZONE_MM / 100 mm of water
+ROOT_ZONE_MM = 300.0
+# Moisture above this drains away (wettest readings in the training data)
+FIELD_CAPACITY = 80.0
+# An irrigation brings moisture this many points above the crop threshold
+REFILL_POINTS = 15.0
+# Rain expected on a rainy day when the forecast gives no amount
+RAIN_EVENT_MM = 10.0
+# ET0 ~ ET0_BASE_MM + ET0_MM_PER_KPA * vapour pressure deficit
+ET0_BASE_MM = 1.0
+ET0_MM_PER_KPA = 1.5
+
+DEFAULT_HORIZON_DAYS = 7
+MAX_HORIZON_DAYS = 16
+
+# per-crop arrays indexed by crop_type_encoded
+_CROPS = sorted(CROP_ENCODING_MAP, key=CROP_ENCODING_MAP.get)
+THRESHOLD_BY_CODE = np.array([CROP_THRESHOLDS[c] for c in _CROPS], dtype=np.float64)
+KC_BY_CODE = np.array([CROP_COEFFICIENTS[c] for c in _CROPS], dtype=np.float64)
+
+
+def reference_et_mm(temperature, humidity) -> np.ndarray:
+    """Daily reference evapotranspiration (mm) from air temperature (C) and humidity (%)."""
+    temperature = np.asarray(temperature, dtype=np.float64)
+    saturation_kpa = 0.6108 * np.exp(17.27 * temperature / (temperature + 237.3))
+    deficit_kpa = saturation_kpa * (1.0 - np.clip(humidity, 0.0, 100.0) / 100.0)
+    return ET0_BASE_MM + ET0_MM_PER_KPA * deficit_kpa
+
+
+def plan_irrigation(soil_moisture, crop_type_encoded, temperature, humidity, rain_probability,
+                    rain_mm=None) -> Dict[str, np.ndarray]:
+    """
+    Irrigation plan for n fields over d days.
+
+    soil_moisture and crop_type_encoded have shape (n,); the forecast
+    arrays have shape (n, d). NaN forecast days lie beyond that field's
+    horizon and leave it untouched. Returns (n, d) arrays "irrigate",
+    "irrigation_mm" and "soil_moisture" (end of day, after irrigation).
+    """
+    moisture = np.array(soil_moisture, dtype=np.float64)
+    codes = np.asarray(crop_type_encoded)
+    if codes.size and (codes.min() < 0 or codes.max() >= len(_CROPS)):
+        raise ValueError(f"crop_type_encoded must be in 0..{len(_CROPS) - 1}")
+    codes = codes.astype(np.intp)
+
+    temperature = np.asarray(temperature, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    rain_probability = np.clip(np.asarray(rain_probability, dtype=np.float64), 0.0, 1.0)
+    rain_mm = np.full(temperature.shape, RAIN_EVENT_MM) if rain_mm is None else np.asarray(rain_mm, dtype=np.float64)
+    rain_mm = np.where(np.isnan(rain_mm), RAIN_EVENT_MM, rain_mm)
+
+    n, days = temperature.shape
+    if moisture.shape != (n,) or codes.shape != (n,):
+        raise ValueError(f"soil_moisture and crop_type_encoded must have shape ({n},)")
+    if days > MAX_HORIZON_DAYS:
+        raise ValueError(f"Forecast horizon is {days} days (max {MAX_HORIZON_DAYS})")
+
+    threshold = THRESHOLD_BY_CODE[codes]
+    target = np.minimum(threshold + REFILL_POINTS, FIELD_CAPACITY)
+    points_per_mm = 100.0 / ROOT_ZONE_MM
+    et_mm = KC_BY_CODE[codes][:, np.newaxis] * reference_et_mm(temperature, humidity)
+    balance = (rain_probability * rain_mm - et_mm) * points_per_mm
+
+    irrigate = np.zeros((n, days), dtype=bool)
+    irrigation_mm = np.zeros((n, days))
+    projected = np.empty((n, days))
+
+    for d in range(days):
+        in_horizon = ~np.isnan(balance[:, d])
+        after = np.clip(moisture + np.where(in_horizon, balance[:, d], 0.0), 0.0, FIELD_CAPACITY)
+        need = in_horizon & (after < threshold)
+        irrigate[:, d] = need
+        irrigation_mm[:, d] = np.where(need, (target - after) / points_per_mm, 0.0)
+        moisture = np.where(need, target, after)
+        projected[:, d] = np.where(in_horizon, moisture, np.nan)
+
+    return {"irrigate": irrigate, "irrigation_mm": irrigation_mm, "soil_moisture": projected}
+
+
+# -------------------------------------------------------
+# Record interface (API)
+# -------------------------------------------------------
+def _crop_code(crop) -> int:
+    if isinstance(crop, str):
+        name = crop.strip()
+        if name not in CROP_ENCODING_MAP:
+            raise ValueError(f"Unsupported crop type: {name}")
+        return CROP_ENCODING_MAP[name]
+    return int(crop)
+
+
+def plan_fields(fields: Sequence[Mapping[str, Any]], horizon: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    plan_irrigation() for records shaped like
+    {"crop_type": "Maize", "soil_moisture": 28.0,
+     "forecast": [{"temperature": .., "humidity": .., "rain_probability": .., "rain_mm": ..}, ...]}
+    (field_id optional). Only the first `horizon` forecast days are used.
+    """
+    if not fields:
+        return []
+    horizon = horizon or max(len(f["forecast"]) for f in fields)
+    if horizon > MAX_HORIZON_DAYS:
+        raise ValueError(f"Forecast horizon is {horizon} days (max {MAX_HORIZON_DAYS})")
+
+    n = len(fields)
+    forecast = np.full((4, n, horizon), np.nan)
+    keys = ("temperature", "humidity", "rain_probability", "rain_mm")
+    for i, field in enumerate(fields):
+        for d, day in enumerate(field["forecast"][:horizon]):
+            for k, key in enumerate(keys):
+                value = day.get(key)
+                if value is not None:
+                    forecast[k, i, d] = value
+
+    plan = plan_irrigation(
+        [f["soil_moisture"] for f in fields],
+        [_crop_code(f["crop_type"]) for f in fields],
+        *forecast,
+    )
+
+    # plain Python lists: per-element NumPy scalar access dominates otherwise
+    amount = plan["irrigation_mm"].round(1)
+    totals = np.nansum(amount, axis=1).round(1).tolist()
+    irrigate, amount = plan["irrigate"].tolist(), amount.tolist()
+    moisture = plan["soil_moisture"].round(2).tolist()
+
+    results = []
+    for i, field in enumerate(fields):
+        days = range(min(len(field["forecast"]), horizon))
+        results.append({
+            "field_id": field.get("field_id"),
+            "irrigation_days": [d + 1 for d in days if irrigate[i][d]],
+            "total_irrigation_mm": totals[i],
+            "schedule": [
+                {"day": d + 1, "irrigate": irrigate[i][d], "irrigation_mm": amount[i][d],
+                 "soil_moisture": moisture[i][d]}
+                for d in days
+            ],
+        })
+    return results
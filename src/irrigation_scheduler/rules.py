@@ -0,0 +1,359 @@
+# src/irrigation_scheduler/rules.py
+# The irrigation decision tree compiled to generated Python.
+#
+# generate_source() walks a fitted DecisionTreeClassifier once and emits a
+# small module with two functions over the same rules:
+#
+#   decide(soil_moisture, ..., crop_type_encoded)   nested if / else, one reading
+#   decide_columns(soil_moisture, ..., ...)         nested np.where over 1-D arrays
+#
+# sklearn casts inputs to float32 before comparing them with the float64
+# split thresholds. Each threshold is therefore rewritten as the float64
+# cutoff that float32 rounding maps onto it, so plain float comparisons give
+# model.predict's answer bit for bit without casting anything. Subtrees
+# whose leaves all predict the same class collapse to that class.
+#
+#   python -m src.irrigation_scheduler.rules [--output models/irrigation_rules.py]
+
+import argparse
+import keyword
+import os
+import threading
+import time
+import weakref
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.serving import config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))   # src/irrigation_scheduler
+PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, "..", ".."))
+
+DATA_PATH = os.path.join(PROJECT_ROOT, "data", "scheduler", "processed", "irrigation_clean.csv")
+MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "irrigation_model.pkl")
+RULES_PATH = os.path.join(PROJECT_ROOT, "models", "irrigation_rules.py")
+
+# below this many rows the scalar rules beat building column arrays
+VECTORIZE_FROM = 32
+
+
+def float32_cutoff(threshold: float):
+    """
+    (op, cutoff) such that `float(x) op cutoff` equals
+    `float32(x) <= threshold` for every float64 x (NaN aside).
+    """
+    f = np.float32(threshold)
+    if float(f) > threshold:
+        f = np.nextafter(f, np.float32(-np.inf))
+    g = np.nextafter(f, np.float32(np.inf))
+    # exact in float64: float32 values have 24-bit significands
+    midpoint = (float(f) + float(g)) / 2
+    # round-half-to-even decides which side the midpoint itself falls on
+    even = int(np.array(f).view(np.uint32)) & 1 == 0
+    return ("<=" if even else "<"), midpoint
+
+
+def _identifier(name: str, j: int) -> str:
+    name = str(name)
+    return name if name.isidentifier() and not keyword.iskeyword(name) else f"x{j}"
+
+
+class _Generator:
+    def __init__(self, model):
+        if not hasattr(model, "tree_") or not hasattr(model, "classes_"):
+            raise TypeError(f"Cannot compile {type(model).__name__}: not a DecisionTreeClassifier")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise TypeError("Multi-output trees are not supported")
+
+        t = model.tree_
+        self.left = t.children_left
+        self.right = t.children_right
+        self.feature = t.feature
+        self.threshold = t.threshold
+        mgl = getattr(t, "missing_go_to_left", None)
+        self.missing_left = np.zeros(t.node_count, dtype=bool) if mgl is None else mgl.astype(bool)
+        # predict() is classes_.take(argmax(proba)); proba is value normalized per node
+        self.leaf_class = np.argmax(t.value[:, 0, :], axis=1)
+
+        names = getattr(model, "feature_names_in_", None)
+        if names is None:
+            names = [f"x{j}" for j in range(model.n_features_in_)]
+        self.features = [str(n) for n in names]
+        self.args = [_identifier(n, j) for j, n in enumerate(self.features)]
+        self.classes = model.classes_
+
+        self.constant = {}
+        self._fold(0)
+
+    def _fold(self, node):
+        """Class index if every leaf under `node` predicts it, else None."""
+        if self.left[node] == -1:
+            value = int(self.leaf_class[node])
+        else:
+            lo, hi = self._fold(self.left[node]), self._fold(self.right[node])
+            value = lo if lo is not None and lo == hi else None
+        self.constant[node] = value
+        return value
+
+    def _condition(self, node, vectorized):
+        x = self.args[self.feature[node]]
+        op, cutoff = float32_cutoff(float(self.threshold[node]))
+        # splits learned on missing values use an infinite threshold; repr() would emit a bare `inf`
+        cutoff = repr(cutoff) if np.isfinite(cutoff) else f"float({str(cutoff)!r})"
+        if vectorized:
+            test = f"({x} {op} {cutoff})"
+            return f"{test} | np.isnan({x})" if self.missing_left[node] else test
+        test = f"{x} {op} {cutoff}"
+        return f"{test} or {x} != {x}" if self.missing_left[node] else test
+
+    def scalar(self, node, depth):
+        pad = "    " * depth
+        if self.constant[node] is not None:
+            return [f"{pad}return {self.constant[node]}"]
+        return ([f"{pad}if {self._condition(node, False)}:"]
+                + self.scalar(self.left[node], depth + 1)
+                + [f"{pad}else:"]
+                + self.scalar(self.right[node], depth + 1))
+
+    def _paths(self, node, path, out):
+        """(conjunction of (split node, went left), class index) per folded leaf."""
+        if self.constant[node] is not None:
+            out.append((path, self.constant[node]))
+        else:
+            self._paths(self.left[node], path + [(node, True)], out)
+            self._paths(self.right[node], path + [(node, False)], out)
+        return out
+
+    def vector(self):
+        """
+        Statements computing `index` over column arrays: each distinct split
+        is compared once, then every class but the most common one is the OR
+        of its leaves' paths.
+        """
+        leaves = self._paths(0, [], [])
+        counts = np.bincount([k for _, k in leaves], minlength=len(self.classes))
+        default = int(np.argmax(counts))
+
+        lines, names = [], {}
+
+        def literal(node, went_left):
+            test = self._condition(node, True)
+            if test not in names:
+                names[test] = f"c{len([n for n in names if not n.startswith('~')])}"
+                lines.append(f"{names[test]} = {test}")
+            if went_left:
+                return names[test]
+            if "~" + test not in names:
+                names["~" + test] = "n" + names[test][1:]
+                lines.append(f"{names['~' + test]} = ~{names[test]}")
+            return names["~" + test]
+
+        assignments = []
+        for k in range(len(self.classes)):
+            if k == default:
+                continue
+            terms = [" & ".join(literal(node, left) for node, left in path)
+                     for path, cls in leaves if cls == k]
+            if terms:
+                assignments.append(f"index[{' | '.join(f'({t})' for t in terms)}] = {k}")
+
+        return (lines
+                + [f"index = np.full(np.shape({self.args[0]}), {default}, dtype=np.intp)"]
+                + assignments)
+
+    def source(self) -> str:
+        args = ", ".join(self.args)
+        lines = [
+            "# Generated by src.irrigation_scheduler.rules from a fitted DecisionTreeClassifier.",
+            "# Do not edit; re-export after retraining.",
+            "",
+            "import numpy as np",
+            "",
+            f"FEATURES = {self.features!r}",
+            f"CLASSES = np.array({self.classes.tolist()!r}, dtype={self.classes.dtype.str!r})",
+            "",
+            "",
+            f"def decide_index({args}):",
+            '    """Index into CLASSES for one reading."""',
+            *self.scalar(0, 1),
+            "",
+            "",
+            f"def decide({args}):",
+            '    """model.predict for one reading."""',
+            f"    return CLASSES[decide_index({args})]",
+            "",
+            "",
+            f"def decide_columns({args}):",
+            '    """model.predict for float64 column arrays of equal length."""',
+            *(f"    {line}" for line in self.vector()),
+            "    return CLASSES.take(index)",
+            "",
+            "",
+            "def decide_batch(X):",
+            '    """model.predict for an (n_samples, len(FEATURES)) array."""',
+            "    X = np.asarray(X, dtype=np.float64)",
+            "    return decide_columns(*(X[:, j] for j in range(X.shape[1])))",
+            "",
+        ]
+        return "\n".join(lines)
+
+
+def generate_source(model) -> str:
+    """Source of a standalone module (NumPy only) reproducing model.predict."""
+    return _Generator(model).source()
+
+
+def load_source(source: str, name: str = "irrigation_rules") -> Dict[str, Any]:
+    namespace = {"__name__": name}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace
+
+
+class CompiledRules:
+    """
+    Generated rules for a fitted tree, with the predict() interface of the
+    fast_path wrappers: records are dicts or objects keyed by feature name.
+    """
+
+    def __init__(self, model):
+        self.source = generate_source(model)
+        namespace = load_source(self.source)
+        self.feature_order = tuple(namespace["FEATURES"])
+        self.classes_ = namespace["CLASSES"]
+        self.decide: Callable = namespace["decide"]
+        self.decide_columns: Callable = namespace["decide_columns"]
+        self.decide_batch: Callable = namespace["decide_batch"]
+        self._decide_index: Callable = namespace["decide_index"]
+        self._get_item = itemgetter(*self.feature_order)
+        self._get_attr = attrgetter(*self.feature_order)
+
+    def predict(self, records: Sequence[Any]) -> np.ndarray:
+        if not records:
+            return self.classes_[:0]
+        get = self._get_item if isinstance(records[0], Mapping) else self._get_attr
+        if len(records) < VECTORIZE_FROM:
+            return self.classes_.take([self._decide_index(*get(r)) for r in records])
+        return self.decide_batch([get(r) for r in records])
+
+
+_RULES = weakref.WeakKeyDictionary()
+_RULES_LOCK = threading.Lock()
+_UNSUPPORTED = object()
+
+
+def for_model(model):
+    """
+    CompiledRules for `model`, generated on first use and kept while the
+    model object lives. None if the fast path is off or the model is not a
+    single classification tree.
+    """
+    if not config.FAST_PATH_ENABLED:
+        return None
+
+    with _RULES_LOCK:
+        rules = _RULES.get(model)
+    if rules is None:
+        try:
+            rules = CompiledRules(model)
+        except (TypeError, AttributeError):
+            rules = _UNSUPPORTED
+        with _RULES_LOCK:
+            _RULES[model] = rules
+    return None if rules is _UNSUPPORTED else rules
+
+
+# -------------------------------------------------------
+# Export + equivalence check
+# -------------------------------------------------------
+def _boundary_cases(model, n_random, seed=0) -> np.ndarray:
+    """Training-range noise plus every threshold and its float neighbours."""
+    rng = np.random.default_rng(seed)
+    t = model.tree_
+    n_features = model.n_features_in_
+    X = rng.uniform(-10, 110, size=(n_random, n_features))
+
+    split_nodes = np.flatnonzero(t.children_left != -1)
+    probes = []
+    for node in split_nodes:
+        thr = float(t.threshold[node])
+        op, cutoff = float32_cutoff(thr)
+        if np.isfinite(thr):
+            values = [thr, cutoff, np.nextafter(cutoff, -np.inf), np.nextafter(cutoff, np.inf),
+                      float(np.nextafter(np.float32(thr), np.float32(np.inf))), np.nan]
+        else:
+            values = [np.nan]  # a split on missing values only; sklearn rejects infinite inputs
+        for v in values:
+            row = rng.uniform(-10, 110, size=n_features)
+            row[t.feature[node]] = v
+            probes.append(row)
+    return np.vstack([X, np.asarray(probes)])
+
+
+def check_equivalence(model, rules: CompiledRules, X: np.ndarray) -> List[str]:
+    """Mismatch descriptions (empty when rules == model.predict on X)."""
+    X = np.asarray(X, dtype=np.float64)
+    expected = model.predict(pd.DataFrame(X, columns=list(rules.feature_order)))
+    problems = []
+
+    vectorized = rules.decide_batch(X)
+    if vectorized.dtype != expected.dtype or not np.array_equal(vectorized, expected):
+        bad = int(np.sum(vectorized != expected))
+        problems.append(f"decide_batch: {bad} of {len(X)} rows differ")
+
+    scalar = np.array([rules.decide(*row) for row in X.tolist()], dtype=expected.dtype)
+    if not np.array_equal(scalar, expected):
+        problems.append(f"decide: {int(np.sum(scalar != expected))} of {len(X)} rows differ")
+    return problems
+
+
+def _rate(fn, n) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main(model_path, data_path, output, fleet_rows):
+    import joblib
+
+    model = joblib.load(model_path)
+    rules = CompiledRules(model)
+
+    with open(output + ".tmp", "w") as f:
+        f.write(rules.source)
+    os.replace(output + ".tmp", output)
+    print(f"Wrote {output} ({rules.source.count(chr(10))} lines)")
+
+    df = pd.read_csv(data_path)
+    X_train = df[list(rules.feature_order)].to_numpy(dtype=np.float64)
+    failed = False
+    for label, X in (("training CSV", X_train), ("threshold boundaries", _boundary_cases(model, 20000))):
+        problems = check_equivalence(model, rules, X)
+        failed |= bool(problems)
+        print(f"{label:22s} {len(X):7d} rows: " + ("; ".join(problems) or "identical to model.predict"))
+
+    X = np.resize(X_train, (fleet_rows, X_train.shape[1]))
+    frame = pd.DataFrame(X, columns=list(rules.feature_order))
+    columns = [np.ascontiguousarray(X[:, j]) for j in range(X.shape[1])]
+    single = X_train[:2000].tolist()
+    print(f"\nthroughput (readings/s, {fleet_rows:,} rows)")
+    print(f"  sklearn predict, DataFrame   {_rate(lambda: model.predict(frame), fleet_rows):14,.0f}")
+    print(f"  decide_batch, row matrix     {_rate(lambda: rules.decide_batch(X), fleet_rows):14,.0f}")
+    print(f"  decide_columns, columns      {_rate(lambda: rules.decide_columns(*columns), fleet_rows):14,.0f}")
+    print(f"  decide, one at a time        {_rate(lambda: [rules.decide(*r) for r in single], len(single)):14,.0f}")
+
+    if failed:
+        raise SystemExit("Generated rules do not match the model")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the irrigation tree to Python rules.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--data-path", default=DATA_PATH, help="CSV checked for equivalence.")
+    parser.add_argument("--output", default=RULES_PATH, help="Where to write the generated module.")
+    parser.add_argument("--fleet-rows", type=int, default=2_000_000, help="Rows for the throughput run.")
+    args = parser.parse_args()
+
+    main(args.model_path, args.data_path, args.output, args.fleet_rows)
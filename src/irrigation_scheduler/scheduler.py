@@ -1,7 +1,10 @@
 import os
-import joblib
 import pandas as pd
 
+from src.irrigation_scheduler import rules
+from src.serving import fast_path, registry
+from src.serving.cache import memoized, prediction_cache, quantizer
+
 # -----------------------------
 # SAFE PATH HANDLING
 # -----------------------------
@@ -15,10 +18,51 @@ MODEL_PATH = os.path.join(
 )
 
 # -----------------------------
-# LOAD TRAINED MODEL
+# REGISTER TRAINED MODEL
 # -----------------------------
-model = joblib.load(MODEL_PATH)
-print("✅ Irrigation model loaded successfully")
+MODEL_NAME = "irrigation"
+
+FEATURE_COLUMNS = [
+    "soil_moisture",
+    "temperature",
+    "humidity",
+    "rain_forecast",
+    "crop_type_encoded"
+]
+
+
+def _validate_model(model):
+    """Smoke-test a freshly loaded model before it replaces the serving one."""
+    model.predict(pd.DataFrame([[0.0] * len(FEATURE_COLUMNS)], columns=FEATURE_COLUMNS))
+
+
+registry.register(MODEL_NAME, MODEL_PATH, validate=_validate_model)
+
+# Decimals each input is rounded to for memoization (sensor precision)
+CACHE_PRECISION = {
+    "soil_moisture": 1,
+    "temperature": 1,
+    "humidity": 1,
+    "rain_forecast": 0,
+    "crop_type_encoded": 0
+}
+_cache, _precision = prediction_cache(MODEL_NAME, CACHE_PRECISION)
+_quantize = quantizer(FEATURE_COLUMNS, _precision)
+
+
+def _fast_model(model):
+    # generated rules for the decision tree, else the generic array wrapper
+    return rules.for_model(model) or fast_path.for_model(model, FEATURE_COLUMNS)
+
+
+def _predict_rows(model, fast, rows):
+    if fast is not None:
+        return fast.predict(rows)
+    input_df = pd.DataFrame(
+        [[r[c] for c in FEATURE_COLUMNS] for r in rows],
+        columns=FEATURE_COLUMNS
+    )
+    return model.predict(input_df)
 
 # -----------------------------
 # IRRIGATION SCHEDULER FUNCTION
@@ -33,26 +77,39 @@ def irrigation_scheduler(
     """
     Returns irrigation decision based on sensor & crop inputs.
     """
+    model, version = registry.get_with_version(MODEL_NAME)
+    fast = _fast_model(model)
 
-    input_df = pd.DataFrame([[
-        soil_moisture,
-        temperature,
-        humidity,
-        rain_forecast,
-        crop_type_encoded
-    ]], columns=[
-        "soil_moisture",
-        "temperature",
-        "humidity",
-        "rain_forecast",
-        "crop_type_encoded"
-    ])
-
-    prediction = model.predict(input_df)[0]
+    reading = {
+        "soil_moisture": soil_moisture,
+        "temperature": temperature,
+        "humidity": humidity,
+        "rain_forecast": rain_forecast,
+        "crop_type_encoded": crop_type_encoded
+    }
+    prediction = memoized(_cache, version, [reading], _quantize,
+                          lambda rows: _predict_rows(model, fast, rows))[0]
 
     return "Irrigate" if prediction == 1 else "Do Not Irrigate"
 
 
+def irrigation_scheduler_batch(readings: list) -> list:
+    """
+    Batch version of irrigation_scheduler. `readings` is a list of dicts
+    keyed by FEATURE_COLUMNS; one model.predict call covers all of them.
+    """
+    if not readings:
+        return []
+
+    model, version = registry.get_with_version(MODEL_NAME)
+    fast = _fast_model(model)
+
+    predictions = memoized(_cache, version, readings, _quantize,
+                           lambda rows: _predict_rows(model, fast, rows))
+
+    return ["Irrigate" if p == 1 else "Do Not Irrigate" for p in predictions]
+
+
 # -----------------------------
 # TEST RUN
 # -----------------------------
@@ -1,8 +1,26 @@
 # src/recommendation/predict.py
-import joblib
 import pandas as pd
 from typing import Dict, Any, List
 from src.recommendation.config import MODEL_PATH
+from src.serving import fast_path, forest, registry
+from src.serving.cache import memoized, prediction_cache, quantizer
+
+MODEL_NAME = "crop"
+
+
+def _validate_model(model):
+    """Smoke-test a freshly loaded model before it replaces the serving one."""
+    columns = list(model.feature_names_in_)
+    model.predict_proba(pd.DataFrame([[0.0] * len(columns)], columns=columns))
+
+
+registry.register(MODEL_NAME, MODEL_PATH, loader=forest.load_artifact, validate=_validate_model,
+                  watch=[forest.compiled_meta_path(MODEL_PATH)])
+
+# Decimals each input is rounded to for memoization (lab sheet / sensor precision)
+CACHE_PRECISION = {"N": 0, "P": 0, "K": 0, "temperature": 1, "humidity": 1, "ph": 2, "rainfall": 1}
+_cache, _precision = prediction_cache(MODEL_NAME, CACHE_PRECISION)
+_quantize = quantizer(list(CACHE_PRECISION), _precision)
 
 def format_topk(classes, probs, k=3):
     pairs = list(zip(list(classes), list(probs)))
@@ -21,37 +39,56 @@ def predict(input_data: Dict[str, Any], top_k: int = 3) -> Dict[str, Any]:
         "rationale": "Model probabilities from RandomForestClassifier"
       }
     """
-    # load model (should be a pipeline if you used preprocessing)
-    model = joblib.load(MODEL_PATH)
+    return predict_batch([input_data], top_k=top_k)[0]
 
-    # Build DataFrame same shape as training features
-    df = pd.DataFrame([input_data])
+
+def predict_batch(inputs: List[Dict[str, Any]], top_k: int = 3) -> List[Dict[str, Any]]:
+    """
+    Same output as predict() for each input, but scored with a single
+    predict_proba call over all rows.
+    """
+    if not inputs:
+        return []
+
+    # resident model (should be a pipeline if you used preprocessing)
+    model, version = registry.get_with_version(MODEL_NAME)
+
+    # Fast path copies inputs straight into a NumPy array in training column order;
+    # otherwise build DataFrame same shape as training features
+    fast = fast_path.for_model(model)
+    scorer = fast if fast is not None else model
+
+    def to_X(rows):
+        return list(rows) if fast is not None else pd.DataFrame(list(rows))
 
     # If model is a sklearn Pipeline that ends with classifier, it still supports predict_proba.
     # If the model does not support predict_proba, fall back to predict.
     try:
-        probs = None
-        if hasattr(model, "predict_proba"):
-            probs = model.predict_proba(df)[0]        # shape (n_classes,)
-            classes = model.classes_ if hasattr(model, "classes_") else model.named_steps[list(model.named_steps)[-1]].classes_
-        else:
+        if not hasattr(model, "predict_proba"):
             # fallback: model doesn't support predict_proba (unlikely for RandomForest)
-            pred = model.predict(df)[0]
-            return {
+            return [{
                 "recommended_crop": str(pred),
                 "top3": [{"crop": str(pred), "probability": 1.0}],
                 "rationale": "Model does not support probabilities; returned single prediction"
-            }
+            } for pred in scorer.predict(to_X(inputs))]
+
+        # shape (n_rows, n_classes); repeated inputs come from the memo cache
+        all_probs = memoized(_cache, version, inputs, _quantize,
+                             lambda rows: scorer.predict_proba(to_X(rows)))
+        classes = model.classes_ if hasattr(model, "classes_") else model.named_steps[list(model.named_steps)[-1]].classes_
 
-        # format top-k
-        topk = format_topk(classes, probs, k=top_k)
-        recommended = topk[0]["crop"] if len(topk) > 0 else None
+        results = []
+        for probs in all_probs:
+            # format top-k
+            topk = format_topk(classes, probs, k=top_k)
+            recommended = topk[0]["crop"] if len(topk) > 0 else None
 
-        return {
-            "recommended_crop": recommended,
-            "top3": topk,
-            "rationale": f"Top {top_k} crops by predicted probability"
-        }
+            results.append({
+                "recommended_crop": recommended,
+                "top3": topk,
+                "rationale": f"Top {top_k} crops by predicted probability"
+            })
+        return results
 
     except Exception as e:
         # bubble up or handle as you prefer
@@ -1,23 +1,45 @@
+import argparse
+
 import joblib
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import cross_val_score
 from src.recommendation.data_preprocessing import load_data, split_data
 from src.recommendation.config import DATA_PATH, MODEL_PATH
+from src.training.estimators import ESTIMATORS, boosted_estimator, check_export
+
+# XGBClassifier only takes integer labels; this model predicts crop names directly
+CROP_ESTIMATORS = [e for e in ESTIMATORS if e != "xgboost"]
+
+
+def build_model(estimator: str = "forest"):
+    """Unfitted classifier for `estimator`."""
+    if estimator not in CROP_ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{estimator}'; choose from {CROP_ESTIMATORS}")
+    if estimator == "forest":
+        return RandomForestClassifier(
+            n_estimators=200,
+            max_depth=None,
+            min_samples_split=2,
+            min_samples_leaf=1,
+            random_state=42
+        )
+    # every crop feature is numeric: no categorical columns to declare
+    return boosted_estimator(estimator, "classifier", random_state=42)
+
 
+def train_model(data_path: str, model_path: str, mmap: bool = False, estimator: str = "forest"):
+    """
+    Train a RandomForest (or gradient-boosted) model and save it.
+    mmap: also export the forest as memory-mappable arrays next to the pickle,
+    so API workers share one copy through the page cache.
+    estimator: "forest" or "hist_gb" (see src/training/estimators.py).
+    """
+    model = build_model(estimator)
+    check_export(estimator, mmap)
 
-def train_model(data_path: str, model_path: str):
-    """Train a RandomForest model and save it."""
     df = load_data(data_path)
     X_train, X_test, y_train, y_test = split_data(df)
 
-    model = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=None,
-        min_samples_split=2,
-        min_samples_leaf=1,
-        random_state=42
-    )
-
     # Cross-validation
     scores = cross_val_score(model, X_train, y_train, cv=5)
     print(f"Cross-validation scores: {scores}")
@@ -28,11 +50,24 @@ def train_model(data_path: str, model_path: str):
     joblib.dump(model, model_path)
     print(f"✅ Model saved to {model_path}")
 
+    if mmap:
+        from src.serving.forest import compiled_dir, export_artifact
+        export_artifact(model_path, obj=model)
+        print(f"✅ Memory-mappable forest saved to {compiled_dir(model_path)}")
+
     return model, X_test, y_test
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train crop recommendation model.")
+    parser.add_argument("--mmap", action="store_true", help="Also export a memory-mappable compiled forest.")
+    parser.add_argument("--estimator", choices=CROP_ESTIMATORS, default="forest",
+                        help="Random forest or histogram gradient boosting.")
+    args = parser.parse_args()
+
     model, X_test, y_test = train_model(
         data_path=DATA_PATH,
-        model_path=MODEL_PATH
+        model_path=MODEL_PATH,
+        mmap=args.mmap,
+        estimator=args.estimator
     )
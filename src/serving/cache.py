@@ -0,0 +1,325 @@
+# src/serving/cache.py
+# Bounded in-process result caches for model predictions.
+#
+# ResultCache is an LRU map with optional TTL, bounded by entry count
+# and/or approximate size in bytes, with an optional SQLite tier on disk
+# that survives restarts. Every cache is tied to the version of the model
+# that produced its values: when the version changes (hot reload), the
+# memory tier is dropped and disk rows from other versions are ignored.
+#
+# memoized() puts a ResultCache in front of a tabular model, keyed by the
+# input row rounded to a per-feature precision (quantizer). The model is
+# run on the rounded row, so a cached output is a function of its key and
+# not of whichever nearby input happened to arrive first.
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from . import config
+
+_CACHES: Dict[str, "ResultCache"] = {}
+
+# rough per-entry bookkeeping cost (OrderedDict node, tuple, key object)
+_ENTRY_OVERHEAD = 200
+_MISSING = object()
+
+
+def _pickled_size(value) -> int:
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class _DiskTier:
+    """key -> pickled value rows in SQLite, pruned by TTL and total size."""
+
+    def __init__(self, path: str, max_bytes: int, ttl: Optional[float]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " version TEXT, key TEXT, value BLOB, size INTEGER, created REAL,"
+            " PRIMARY KEY (version, key))"
+        )
+        self._puts = 0
+        self.prune()
+
+    def get(self, version: str, key: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM results WHERE version = ? AND key = ?", (version, key)
+            ).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return _MISSING
+        return pickle.loads(row[0])
+
+    def put(self, version: str, key: str, value) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (version, key, blob, len(blob), time.time()),
+            )
+            self._puts += 1
+            due = self._puts % 256 == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> None:
+        with self._lock:
+            if self.ttl is not None:
+                self._db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                # drop the oldest rows until we are back under the cap
+                self._db.execute(
+                    "DELETE FROM results WHERE rowid IN ("
+                    " SELECT rowid FROM (SELECT rowid,"
+                    "  SUM(size) OVER (ORDER BY created, rowid) - size AS freed_before FROM results)"
+                    " WHERE freed_before < ?)",
+                    (total - self.max_bytes,),
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache for prediction results.
+
+    `max_entries` and/or `max_bytes` bound the memory tier (sizes are
+    estimated with `sizeof`, default: pickled length). `ttl` expires
+    entries by age. With `disk_path`, misses fall through to SQLite and
+    every stored value is written there as well.
+    """
+
+    def __init__(self, name: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, disk_path: Optional[str] = None,
+                 disk_max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = _pickled_size, enabled: bool = True):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.sizeof = sizeof
+        self.enabled = enabled and (max_entries is None or max_entries > 0) and (max_bytes is None or max_bytes > 0)
+        self.disk = None
+        if self.enabled and disk_path:
+            self.disk = _DiskTier(disk_path, disk_max_bytes or 10 * (max_bytes or 2**26), self.ttl)
+
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        _CACHES[name] = self
+
+    # ---------------------------------------------------------------- versioning
+    def ensure_version(self, version: Optional[str]) -> None:
+        """Drop the memory tier if the model behind the cache has changed."""
+        if version == self.version:
+            return
+        with self._lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self.version = version
+
+    # ---------------------------------------------------------------- lookups
+    def get(self, key: Hashable, default=None):
+        if not self.enabled:
+            return default
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires = entry
+                if expires is not None and expires < time.monotonic():
+                    del self._entries[key]
+                    self._bytes -= size
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+        if self.disk is not None:
+            value = self.disk.get(str(self.version), repr(key))
+            if value is not _MISSING:
+                self._store(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value, version: Optional[str] = None) -> None:
+        """
+        Store `value`. Pass the model `version` that computed it to skip
+        the write if the model was swapped while the prediction ran.
+        """
+        if not self.enabled or (version is not None and version != self.version):
+            return
+        self._store(key, value)
+        if self.disk is not None:
+            self.disk.put(str(self.version), repr(key), value)
+
+    def _store(self, key, value) -> None:
+        size = self.sizeof(value) + _ENTRY_OVERHEAD
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "model_version": self.version,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "disk": self.disk is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: c.stats() for name, c in sorted(_CACHES.items())}
+
+
+# ---------------------------------------------------------------------------
+# Memoized tabular predictions
+# ---------------------------------------------------------------------------
+
+def _round(value, decimals):
+    if value is None or isinstance(value, str):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    if number != number:  # NaN: same key as a missing value
+        return None
+    return round(number, decimals) + 0.0  # + 0.0 folds -0.0 into 0.0
+
+
+def quantizer(features: Sequence[str], precision: Mapping[str, int], default: int = 2):
+    """
+    record -> (key, rounded record) for `features`: each numeric value
+    rounded to precision[feature] decimals (`default` otherwise), strings
+    kept as-is. Inputs that agree at that precision share one key, and the
+    rounded record (a dict, other fields copied) is what the model sees.
+    Missing / NaN values key as None and are passed through unchanged.
+    """
+    decimals = [precision.get(f, default) for f in features]
+
+    def quantize(record) -> Tuple[tuple, Dict[str, Any]]:
+        if isinstance(record, Mapping):
+            get, rounded = record.get, dict(record)
+        else:
+            get, rounded = (lambda f: getattr(record, f, None)), {}
+        key = []
+        for f, d in zip(features, decimals):
+            value = get(f)
+            q = _round(value, d)
+            key.append(q)
+            rounded[f] = value if q is None else q
+        return tuple(key), rounded
+
+    return quantize
+
+
+def prediction_cache(model_name: str, precision: Mapping[str, int]):
+    """
+    (ResultCache, precision) for a tabular model: entry-count bounded, with
+    per-feature precision from `precision` updated by
+    ANNADATA_PREDICTION_CACHE_PRECISION.
+    """
+    merged = dict(precision)
+    merged.update(config.PREDICTION_CACHE_PRECISION.get(model_name, {}))
+    entries = config.PREDICTION_CACHE_ENTRIES
+    cache = ResultCache(model_name, max_entries=entries, enabled=entries > 0,
+                        sizeof=lambda value: getattr(value, "nbytes", 64))
+    return cache, merged
+
+
+def memoized(cache: "ResultCache", version: Optional[str], rows: Sequence[Any],
+             quantize: Callable[[Any], Tuple[Hashable, Any]],
+             compute: Callable[[List[Any]], Sequence[Any]]) -> List[Any]:
+    """
+    Per-row model outputs for `rows`: cached ones are reused, the rest are
+    computed from their quantized form (see quantizer) with a single
+    `compute(missing_rows)` call and stored under `version` (so a reload
+    invalidates them). `version` must be the one the model behind `compute`
+    was loaded as: take both from registry.get_with_version().
+    With the cache disabled, `compute` sees the exact rows.
+    """
+    if not cache.enabled:
+        return list(compute(list(rows)))
+
+    cache.ensure_version(version)
+
+    keys, quantized = zip(*(quantize(r) for r in rows)) if rows else ((), ())
+    out = [cache.get(k, _MISSING) for k in keys]
+    # rows sharing a key within the batch are computed once
+    missing: Dict[Hashable, List[int]] = {}
+    for i, v in enumerate(out):
+        if v is _MISSING:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        computed = compute([quantized[positions[0]] for positions in missing.values()])
+        for (k, positions), value in zip(missing.items(), computed):
+            for i in positions:
+                out[i] = value
+            # a row of a batch result would pin the whole batch array in memory
+            if getattr(value, "base", None) is not None:
+                value = value.copy()
+            cache.put(k, value, version=version)
+    return out
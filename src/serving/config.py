@@ -0,0 +1,41 @@
+# src/serving/config.py
+# Runtime knobs for model serving, overridable through environment variables
+
+import os
+
+# Seconds between artifact change checks; 0 disables hot reload
+RELOAD_INTERVAL_SECONDS = float(os.getenv("ANNADATA_RELOAD_INTERVAL", "5"))
+
+# Serve tabular models from NumPy arrays instead of one-row DataFrames
+FAST_PATH_ENABLED = os.getenv("ANNADATA_FAST_PATH", "1") != "0"
+
+# Tree models: "auto" serves a compiled forest export when one is fresh,
+# "sklearn" always unpickles the original estimator
+FOREST_BACKEND = os.getenv("ANNADATA_FOREST_BACKEND", "auto").lower()
+
+# Memory-map compiled forest arrays read-only so every worker process
+# shares the same physical pages through the OS page cache
+FOREST_MMAP = os.getenv("ANNADATA_FOREST_MMAP", "1") != "0"
+
+# Batches of at least this many rows go to the original sklearn estimator,
+# unpickled on first use: its Cython tree walk overtakes the compiled forest
+# at a few hundred rows (0 keeps every batch on the compiled forest)
+FOREST_SKLEARN_BATCH_ROWS = int(os.getenv("ANNADATA_FOREST_SKLEARN_BATCH_ROWS", "256"))
+
+# Memoized tabular predictions: entries kept per model (0 disables)
+PREDICTION_CACHE_ENTRIES = int(os.getenv("ANNADATA_PREDICTION_CACHE_ENTRIES", "10000"))
+
+
+def _parse_precision(spec: str):
+    """'crop.rainfall=0,soil_health.ph=1' -> {"crop": {"rainfall": 0}, "soil_health": {"ph": 1}}"""
+    out = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        target, _, decimals = item.partition("=")
+        model, _, feature = target.partition(".")
+        out.setdefault(model.strip(), {})[feature.strip()] = int(decimals)
+    return out
+
+
+# Per-feature decimals used to round inputs into cache keys, overriding
+# the defaults declared next to each predictor
+PREDICTION_CACHE_PRECISION = _parse_precision(os.getenv("ANNADATA_PREDICTION_CACHE_PRECISION", ""))
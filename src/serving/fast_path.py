@@ -0,0 +1,273 @@
+# src/serving/fast_path.py
+# DataFrame-free inference for the tabular models.
+#
+# Building a one-row pandas DataFrame costs more than a shallow tree
+# prediction. The wrappers here are built once per loaded model: feature
+# names and order are checked at construction, then inputs (dicts or
+# pydantic objects) are copied straight into float64 NumPy arrays in the
+# order the estimator was fitted with.
+
+import copy
+import threading
+import weakref
+from itertools import repeat
+from operator import attrgetter, itemgetter
+from typing import Any, Iterable, List, Mapping, Sequence
+
+import numpy as np
+
+from . import config
+
+
+def _getter(names: Sequence[str], sample) -> Any:
+    get = itemgetter(*names) if isinstance(sample, Mapping) else attrgetter(*names)
+    if len(names) == 1:
+        return lambda record: (get(record),)
+    return get
+
+
+def _without_feature_names(estimator):
+    """
+    Shallow copy of `estimator` that no longer remembers its training column
+    names, so predicting on a bare ndarray skips sklearn's per-call name check
+    (and its warning). Fitted arrays such as trees are shared, not copied.
+    """
+    if not hasattr(estimator, "feature_names_in_"):
+        return estimator
+    stripped = copy.copy(estimator)
+    del stripped.feature_names_in_
+    return stripped
+
+
+def _check_feature_order(estimator, feature_order: Sequence[str]) -> None:
+    names = getattr(estimator, "feature_names_in_", None)
+    if names is not None and list(names) != list(feature_order):
+        raise ValueError(
+            f"Model was fitted on columns {list(names)}, expected {list(feature_order)}"
+        )
+
+
+class ArrayModel:
+    """
+    Wraps a fitted estimator whose inputs are all numeric.
+    `predict`/`predict_proba` take dicts or objects with the feature names as
+    keys/attributes, so callers never build a DataFrame.
+    """
+
+    def __init__(self, estimator, feature_order: Sequence[str] = None):
+        if hasattr(estimator, "named_steps") or hasattr(estimator, "transformers"):
+            raise TypeError("ArrayModel expects a bare estimator; use PipelineArrays for pipelines")
+
+        if feature_order is None:
+            feature_order = list(estimator.feature_names_in_)
+        _check_feature_order(estimator, feature_order)
+
+        self.feature_order = tuple(feature_order)
+        self.estimator = _without_feature_names(estimator)
+        self.classes_ = getattr(estimator, "classes_", None)
+        self._local = threading.local()
+
+    def _row_buffer(self) -> np.ndarray:
+        # one preallocated (1, n_features) row per thread
+        buf = getattr(self._local, "row", None)
+        if buf is None:
+            buf = self._local.row = np.empty((1, len(self.feature_order)), dtype=np.float64)
+        return buf
+
+    def to_array(self, records: Sequence[Any]) -> np.ndarray:
+        """Feature matrix for `records` in the model's column order."""
+        if not records:
+            return np.empty((0, len(self.feature_order)), dtype=np.float64)
+
+        get = _getter(self.feature_order, records[0])
+        if len(records) == 1:
+            X = self._row_buffer()
+            X[0] = get(records[0])
+            return X
+        return np.array([get(r) for r in records], dtype=np.float64)
+
+    def predict(self, records: Sequence[Any]) -> np.ndarray:
+        return self.estimator.predict(self.to_array(records))
+
+    def predict_proba(self, records: Sequence[Any]) -> np.ndarray:
+        return self.estimator.predict_proba(self.to_array(records))
+
+
+# ---------------------------------------------------------------------------
+# ColumnTransformer pipelines (fertilizer, yield)
+# ---------------------------------------------------------------------------
+
+def _compile_steps(transformer) -> List[tuple]:
+    """
+    Turn an imputer / scaler / one-hot (or ordinal) chain into plain NumPy
+    operations.
+    Raises TypeError for anything we cannot reproduce exactly, so callers
+    can fall back to the sklearn path.
+    """
+    steps = transformer.steps if hasattr(transformer, "steps") else [("step", transformer)]
+    ops = []
+    for _, step in steps:
+        kind = type(step).__name__
+        if kind == "SimpleImputer":
+            if getattr(step, "add_indicator", False):
+                raise TypeError("SimpleImputer(add_indicator=True) is not supported")
+            ops.append(("impute", step.statistics_))
+        elif kind == "StandardScaler":
+            mean = step.mean_ if step.with_mean else None
+            scale = step.scale_ if step.with_std else None
+            ops.append(("scale", (mean, scale)))
+        elif kind == "OneHotEncoder":
+            if step.drop is not None or step.handle_unknown != "ignore":
+                raise TypeError("Only OneHotEncoder(drop=None, handle_unknown='ignore') is supported")
+            if getattr(step, "_infrequent_enabled", False):
+                raise TypeError("OneHotEncoder infrequent categories are not supported")
+            index_maps = [{c: i for i, c in enumerate(cats)} for cats in step.categories_]
+            ops.append(("onehot", index_maps))
+        elif kind == "OrdinalEncoder":
+            if step.handle_unknown != "use_encoded_value" or getattr(step, "_infrequent_enabled", False):
+                raise TypeError("Only OrdinalEncoder(handle_unknown='use_encoded_value') is supported")
+            if not any(op[0] == "impute" for op in ops):
+                # missing values would need encoded_missing_value handling
+                raise TypeError("OrdinalEncoder must follow a SimpleImputer")
+            index_maps = [{c: float(i) for i, c in enumerate(cats)} for cats in step.categories_]
+            ops.append(("ordinal", (index_maps, float(step.unknown_value))))
+        else:
+            raise TypeError(f"Unsupported transformer step: {kind}")
+    return ops
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class PipelineArrays:
+    """
+    NumPy re-implementation of a fitted Pipeline(ColumnTransformer, estimator)
+    whose column branches are imputer / scaler / one-hot or ordinal chains.
+    Produces the same feature matrix as the ColumnTransformer, then calls the
+    final estimator on it directly.
+    """
+
+    def __init__(self, pipeline):
+        if len(pipeline.steps) != 2:
+            raise TypeError("Expected Pipeline([preprocessor, estimator])")
+        preprocessor = pipeline.steps[0][1]
+        if not hasattr(preprocessor, "transformers_"):
+            raise TypeError("First pipeline step must be a fitted ColumnTransformer")
+
+        self.branches = []
+        for name, transformer, cols in preprocessor.transformers_:
+            if name == "remainder" and transformer != "drop" and len(cols) > 0:
+                raise TypeError("ColumnTransformer remainder columns are not supported")
+            if name == "remainder" or transformer == "drop" or len(cols) == 0:
+                continue
+            if transformer == "passthrough":
+                self.branches.append((list(cols), []))
+            else:
+                self.branches.append((list(cols), _compile_steps(transformer)))
+
+        self.input_columns = [c for cols, _ in self.branches for c in cols]
+        self.estimator = pipeline.steps[-1][1]
+        self.classes_ = getattr(self.estimator, "classes_", None)
+
+        # width of the transformed matrix, fixed at load time
+        self.n_output = 0
+        for cols, ops in self.branches:
+            onehot = [op for op in ops if op[0] == "onehot"]
+            self.n_output += sum(len(m) for m in onehot[0][1]) if onehot else len(cols)
+
+    def transform(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        n = len(records)
+        out = np.zeros((n, self.n_output), dtype=np.float64)
+        offset = 0
+
+        for cols, ops in self.branches:
+            # column-major: one list (or array row) per input column
+            values = [[r.get(c) for r in records] for c in cols]
+            block = None
+
+            for kind, params in ops:
+                if kind == "impute":
+                    if params.dtype.kind == "f":
+                        # numeric: None becomes NaN in the float conversion
+                        values = np.array(values, dtype=np.float64).reshape(len(cols), n)
+                        values = np.where(np.isnan(values), params[:, np.newaxis], values)
+                    else:
+                        values = [
+                            [fill if _is_missing(v) else v for v in column]
+                            for fill, column in zip(params, values)
+                        ]
+                elif kind == "scale":
+                    mean, scale = params
+                    values = np.array(values, dtype=np.float64).reshape(len(cols), n)
+                    if mean is not None:
+                        values -= mean[:, np.newaxis]
+                    if scale is not None:
+                        values /= scale[:, np.newaxis]
+                elif kind == "onehot":
+                    width = sum(len(m) for m in params)
+                    block = np.zeros((n, width), dtype=np.float64)
+                    base = 0
+                    for index_map, column in zip(params, values):
+                        codes = np.fromiter(map(index_map.get, column, repeat(-1, n)), dtype=np.int64, count=n)
+                        # unknown categories (handle_unknown="ignore") stay all-zero
+                        hit = codes >= 0
+                        block[np.flatnonzero(hit), base + codes[hit]] = 1.0
+                        base += len(index_map)
+                elif kind == "ordinal":
+                    index_maps, unknown = params
+                    values = np.array([
+                        np.fromiter(map(index_map.get, column, repeat(unknown, n)), dtype=np.float64, count=n)
+                        for index_map, column in zip(index_maps, values)
+                    ]).reshape(len(cols), n)
+
+            if block is None:
+                block = np.array(values, dtype=np.float64).reshape(len(cols), n).T
+
+            out[:, offset:offset + block.shape[1]] = block
+            offset += block.shape[1]
+
+        return out
+
+    def predict(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        return self.estimator.predict(self.transform(records))
+
+    def predict_proba(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        return self.estimator.predict_proba(self.transform(records))
+
+
+def fast_model(model, feature_order: Iterable[str] = None):
+    """
+    Best available DataFrame-free wrapper for `model`, or None if it has a
+    shape we don't reproduce (the caller then keeps the pandas path, which
+    also lines up columns fitted in a different order by name).
+    """
+    try:
+        if hasattr(model, "named_steps"):
+            return PipelineArrays(model)
+        return ArrayModel(model, None if feature_order is None else list(feature_order))
+    except (TypeError, AttributeError, ValueError):
+        return None
+
+
+_FAST_MODELS = weakref.WeakKeyDictionary()
+_FAST_MODELS_LOCK = threading.Lock()
+_UNSUPPORTED = object()
+
+
+def for_model(model, feature_order: Iterable[str] = None):
+    """
+    Fast-path wrapper for `model`, built on first use and kept for as long
+    as the model object lives (a hot reload brings a new object, hence a
+    new wrapper). Returns None when disabled or unsupported.
+    """
+    if not config.FAST_PATH_ENABLED:
+        return None
+
+    with _FAST_MODELS_LOCK:
+        fast = _FAST_MODELS.get(model)
+    if fast is None:
+        fast = fast_model(model, feature_order)
+        with _FAST_MODELS_LOCK:
+            _FAST_MODELS[model] = _UNSUPPORTED if fast is None else fast
+    return None if fast is _UNSUPPORTED else fast
@@ -0,0 +1,569 @@
+# src/serving/forest.py
+# Flat struct-of-arrays form of fitted tree ensembles.
+#
+# compile_forest() copies every tree of a fitted RandomForest / DecisionTree
+# (classifier or regressor) into a handful of concatenated NumPy arrays:
+# split feature, threshold, left/right child and per-node output. The
+# CompiledForest evaluator walks all trees for a block of rows at once with
+# vectorized indexing and reproduces sklearn's predict_proba / predict
+# bit for bit. Loading a compiled forest needs only NumPy, not sklearn.
+#
+#   python -m src.serving.forest crop soil_health fertilizer yield [--batch-rows 50000]
+
+import argparse
+import copy
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from . import config
+
+_ARRAYS = ("feature", "threshold", "left", "right", "missing_left", "value", "roots")
+_META_FILE = "meta.json"
+
+
+class CompiledForest:
+    """
+    Vectorized evaluator over concatenated tree arrays.
+
+    Node ids are global across trees. Leaves point to themselves on both
+    sides. Rows are evaluated in blocks of BLOCK_ROWS, so memory stays
+    bounded for large batches; within a block all (tree, row) walkers
+    advance together and leave the working set once they reach a leaf.
+    """
+
+    BLOCK_ROWS = 1024
+    GATHER_BYTES = 4 * 2**20
+
+    # set by load_artifact(): batches of at least batch_rows rows are handed
+    # to the estimator sklearn_loader() returns (loaded once, then kept; a
+    # None result keeps every batch here)
+    sklearn_loader: Optional[Callable[[], Any]] = None
+    batch_rows = 0
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        for name in _ARRAYS:
+            setattr(self, name, arrays[name])
+        self.kind = meta["kind"]
+        self.max_depth = int(meta["max_depth"])
+        self.n_features_in_ = int(meta["n_features"])
+        self.n_trees = len(self.roots)
+        # set by src.serving.prune on lossy exports: {"n_trees", "max_depth", "score", ...}
+        self.pruned = meta.get("pruned")
+        if meta.get("feature_names") is not None:
+            self.feature_names_in_ = np.asarray(meta["feature_names"], dtype=object)
+        if self.kind == "classifier":
+            self.classes_ = np.asarray(meta["classes"])
+            self.n_classes_ = len(self.classes_)
+        # derived per process (17 bytes a node): one gather per step instead of three; intp
+        # because NumPy casts any other index dtype on every gather
+        self._children = np.stack([self.right, self.left], axis=1).astype(np.intp)  # [:, 1] = go left
+        self._is_leaf = self.left == np.arange(len(self.left))
+        self._sklearn = None  # False once sklearn_loader() came back empty
+        self._sklearn_lock = threading.Lock()
+
+    # ---------------------------------------------------------------- evaluate
+    def _as_array(self, X) -> np.ndarray:
+        names = getattr(self, "feature_names_in_", None)
+        if hasattr(X, "columns") and names is not None:
+            X = X[list(names)]
+        if hasattr(X, "toarray"):
+            # sparse one-hot output of the sklearn preprocessing fallback
+            X = X.toarray()
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has shape {X.shape}, expected (n_samples, {self.n_features_in_})"
+            )
+        return X.astype(np.float64)
+
+    def _apply_block(self, X: np.ndarray) -> np.ndarray:
+        """Leaf ids for an already converted block of rows: shape (n_trees, n_rows)."""
+        n, n_features = X.shape
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+        leaves = np.empty(self.n_trees * n, dtype=np.intp)
+
+        # one walker per (tree, row), tree-major; finished walkers are dropped
+        nodes = np.repeat(self.roots, n).astype(np.intp)
+        slot = np.arange(self.n_trees * n)
+        offset = np.tile(np.arange(n) * n_features, self.n_trees)
+        while True:
+            done = self._is_leaf[nodes]
+            if done.any():
+                leaves[slot[done]] = nodes[done]
+                walking = ~done
+                nodes, slot, offset = nodes[walking], slot[walking], offset[walking]
+                if not nodes.size:
+                    break
+            x = flat[offset + self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            if has_nan:
+                missing = np.isnan(x)
+                go_left[missing] = self.missing_left[nodes[missing]]
+            nodes = self._children[nodes, go_left.view(np.int8)]
+        return leaves.reshape(self.n_trees, n)
+
+    def _blocks(self, X):
+        X = np.ascontiguousarray(self._as_array(X))
+        for start in range(0, X.shape[0], self.BLOCK_ROWS):
+            yield X[start:start + self.BLOCK_ROWS]
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node id reached in every tree: shape (n_trees, n_samples)."""
+        blocks = [self._apply_block(block) for block in self._blocks(X)]
+        if not blocks:
+            return np.empty((self.n_trees, 0), dtype=np.intp)
+        return np.concatenate(blocks, axis=1)
+
+    def _mean_of_trees(self, X) -> np.ndarray:
+        out = []
+        for block in self._blocks(X):
+            leaves = self._apply_block(block)
+            total = np.zeros((block.shape[0], self.value.shape[1]), dtype=np.float64)
+            # leaf outputs are gathered a few MB of trees at a time, then added
+            # in sklearn's order (sequential accumulation over estimators_)
+            step = max(1, self.GATHER_BYTES // total.nbytes)
+            for first in range(0, self.n_trees, step):
+                for per_tree in self.value[leaves[first:first + step]]:
+                    total += per_tree
+            total /= self.n_trees
+            out.append(total)
+        if not out:
+            return np.empty((0, self.value.shape[1]), dtype=np.float64)
+        return np.concatenate(out)
+
+    def _batch_estimator(self, X):
+        """The sklearn estimator when X is a batch large enough to hand over, else None."""
+        n_rows = X.shape[0] if hasattr(X, "shape") else len(X)
+        if self.sklearn_loader is None or not self.batch_rows or n_rows < self.batch_rows:
+            return None
+        if self._sklearn is None:
+            with self._sklearn_lock:
+                if self._sklearn is None:
+                    self._sklearn = self.sklearn_loader() or False
+        return self._sklearn or None
+
+    def _proba(self, X) -> np.ndarray:
+        estimator = self._batch_estimator(X)
+        return self._mean_of_trees(X) if estimator is None else estimator.predict_proba(X)
+
+    @property
+    def predict_proba(self):
+        # a property so hasattr(regressor, "predict_proba") is False, as in sklearn
+        if self.kind != "classifier":
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._proba
+
+    def predict(self, X) -> np.ndarray:
+        estimator = self._batch_estimator(X)
+        if estimator is not None:
+            return estimator.predict(X)
+        if self.kind == "classifier":
+            return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+        return self._mean_of_trees(X)[:, 0]
+
+    # ---------------------------------------------------------------- storage
+    def nbytes(self) -> int:
+        return int(sum(getattr(self, name).nbytes for name in _ARRAYS))
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_depth": self.max_depth,
+            "n_features": self.n_features_in_,
+            "n_trees": self.n_trees,
+            "feature_names": None if getattr(self, "feature_names_in_", None) is None
+            else [str(c) for c in self.feature_names_in_],
+            "classes": None if self.kind != "classifier" else self.classes_.tolist(),
+        }
+
+    def save(self, directory: str, extra_meta: Optional[Dict[str, Any]] = None) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            # write + rename: workers that memory-mapped the previous export
+            # keep reading the old inode instead of a truncated file
+            path = os.path.join(directory, f"{name}.npy")
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(path + ".tmp", path)
+
+        meta = self.meta()
+        meta.update(extra_meta or {})
+        # meta.json is written last: its presence marks a complete export
+        meta_path = os.path.join(directory, _META_FILE)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = None) -> "CompiledForest":
+        with open(os.path.join(directory, _META_FILE)) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in _ARRAYS
+        }
+        return cls(arrays, meta)
+
+
+class CompiledPipeline:
+    """
+    Stand-in for a fitted Pipeline(preprocessing..., forest) whose final
+    step is a CompiledForest. Preprocessing steps are the original sklearn
+    transformers; only the forest is replaced. Exposes the Pipeline
+    attributes the predictors use (steps, named_steps, feature_names_in_).
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.named_steps = dict(self.steps)
+        first = self.steps[0][1]
+        if hasattr(first, "feature_names_in_"):
+            self.feature_names_in_ = first.feature_names_in_
+        final = self.steps[-1][1]
+        if hasattr(final, "classes_"):
+            self.classes_ = final.classes_
+        self.pruned = getattr(final, "pruned", None)
+
+    def _transform(self, X):
+        for _, step in self.steps[:-1]:
+            X = step.transform(X)
+        return X
+
+    def predict(self, X) -> np.ndarray:
+        return self.steps[-1][1].predict(self._transform(X))
+
+    @property
+    def predict_proba(self):
+        final_proba = self.steps[-1][1].predict_proba
+        return lambda X: final_proba(self._transform(X))
+
+
+def _tree_estimators(estimator) -> List[Any]:
+    if hasattr(estimator, "estimators_"):
+        return list(estimator.estimators_)
+    if hasattr(estimator, "tree_"):
+        return [estimator]
+    raise TypeError(f"Cannot compile {type(estimator).__name__}: not a tree or forest")
+
+
+def compile_forest(estimator) -> CompiledForest:
+    """Flatten a fitted tree / forest (single output) into a CompiledForest."""
+    trees = _tree_estimators(estimator)
+    if getattr(estimator, "n_outputs_", 1) != 1:
+        raise TypeError("Multi-output forests are not supported")
+
+    is_classifier = hasattr(estimator, "classes_")
+    n_classes = len(estimator.classes_) if is_classifier else 1
+
+    feature, threshold, left, right, missing_left, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for tree_estimator in trees:
+        t = tree_estimator.tree_
+        n = t.node_count
+        ids = np.arange(offset, offset + n, dtype=np.int64)
+        is_leaf = t.children_left == -1
+
+        feature.append(np.where(is_leaf, 0, t.feature).astype(np.int64))
+        threshold.append(np.where(is_leaf, np.inf, t.threshold).astype(np.float64))
+        left.append(np.where(is_leaf, ids, t.children_left + offset))
+        right.append(np.where(is_leaf, ids, t.children_right + offset))
+        mgl = getattr(t, "missing_go_to_left", None)
+        missing_left.append(
+            np.zeros(n, dtype=bool) if mgl is None else np.where(is_leaf, True, mgl.astype(bool))
+        )
+
+        if is_classifier:
+            v = np.array(t.value[:, 0, :n_classes], dtype=np.float64)
+            # sklearn < 1.4 stored class counts and normalized at predict time
+            sums = v.sum(axis=1)
+            if not np.allclose(sums[sums > 0], 1.0):
+                normalizer = sums[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                v /= normalizer
+        else:
+            v = np.array(t.value[:, 0, :1], dtype=np.float64)
+        value.append(v)
+
+        roots.append(offset)
+        max_depth = max(max_depth, int(t.max_depth))
+        offset += n
+
+    arrays = {
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "missing_left": np.concatenate(missing_left),
+        "value": np.concatenate(value),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+    # int32 indices halve memory; every forest we ship has far fewer than 2**31 nodes
+    for name in ("feature", "left", "right", "roots"):
+        arrays[name] = arrays[name].astype(np.int32)
+
+    names = getattr(estimator, "feature_names_in_", None)
+    meta = {
+        "kind": "classifier" if is_classifier else "regressor",
+        "max_depth": max_depth,
+        "n_features": int(estimator.n_features_in_),
+        "feature_names": None if names is None else [str(c) for c in names],
+        "classes": estimator.classes_.tolist() if is_classifier else None,
+    }
+    return CompiledForest(arrays, meta)
+
+
+# ---------------------------------------------------------------------------
+# Artifacts: the compiled forest lives next to the pickle it was exported from
+# ---------------------------------------------------------------------------
+
+def compiled_dir(artifact_path) -> str:
+    return os.path.splitext(str(artifact_path))[0] + ".forest"
+
+
+def compiled_meta_path(artifact_path) -> str:
+    return os.path.join(compiled_dir(artifact_path), _META_FILE)
+
+
+def _split_artifact(obj):
+    """
+    Find the forest inside a saved artifact. Returns (forest, shell) where
+    shell is the artifact with the forest taken out (None for a bare model).
+    Supported: a bare estimator, a Pipeline, or a dict holding "pipeline".
+    """
+    if isinstance(obj, dict):
+        pipeline, pipeline_shell = _split_artifact(obj["pipeline"])
+        shell = dict(obj)
+        shell["pipeline"] = pipeline_shell
+        return pipeline, shell
+
+    if hasattr(obj, "steps"):
+        shell = copy.copy(obj)
+        shell.steps = list(obj.steps[:-1]) + [(obj.steps[-1][0], None)]
+        return obj.steps[-1][1], shell
+
+    return obj, None
+
+
+def _fill_shell(shell, forest):
+    if shell is None:
+        return forest
+    if isinstance(shell, dict):
+        filled = dict(shell)
+        filled["pipeline"] = _fill_shell(shell["pipeline"], forest)
+        return filled
+    return CompiledPipeline(list(shell.steps[:-1]) + [(shell.steps[-1][0], forest)])
+
+
+def export_artifact(artifact_path, obj=None, forest: Optional[CompiledForest] = None,
+                    directory: Optional[str] = None, extra_meta: Optional[Dict[str, Any]] = None) -> CompiledForest:
+    """
+    Compile the forest inside the pickle at `artifact_path` into
+    compiled_dir(artifact_path). Preprocessing steps and metadata around
+    the forest are kept in shell.joblib (that part still needs sklearn).
+    `forest` replaces the compiled estimator (e.g. a pruned copy of it) and
+    `directory` the export location.
+    """
+    import joblib
+
+    artifact_path = str(artifact_path)
+    obj = joblib.load(artifact_path) if obj is None else obj
+    estimator, shell = _split_artifact(obj)
+    forest = compile_forest(estimator) if forest is None else forest
+
+    directory = directory or compiled_dir(artifact_path)
+    meta_path = os.path.join(directory, _META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)  # mark incomplete while rewriting
+
+    shell_path = os.path.join(directory, "shell.joblib")
+    os.makedirs(directory, exist_ok=True)
+    if shell is not None:
+        joblib.dump(shell, shell_path)
+    elif os.path.exists(shell_path):
+        os.remove(shell_path)
+
+    forest.save(directory, extra_meta={
+        "source": os.path.basename(artifact_path),
+        "source_mtime_ns": os.stat(artifact_path).st_mtime_ns,
+        "has_shell": shell is not None,
+        **(extra_meta or {}),
+    })
+    return forest
+
+
+def _fresh_compiled(artifact_path) -> Optional[str]:
+    """compiled_dir(artifact_path) if it was exported from the current pickle."""
+    directory = compiled_dir(artifact_path)
+    try:
+        with open(os.path.join(directory, _META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("source_mtime_ns") != os.stat(artifact_path).st_mtime_ns:
+            return None
+    except (OSError, ValueError):
+        return None
+    return directory
+
+
+def load_compiled(artifact_path, mmap_mode: Optional[str] = None):
+    directory = compiled_dir(artifact_path)
+    forest = CompiledForest.load(directory, mmap_mode=mmap_mode)
+    shell_path = os.path.join(directory, "shell.joblib")
+    if not os.path.exists(shell_path):
+        return forest
+
+    import joblib
+    return _fill_shell(joblib.load(shell_path), forest)
+
+
+def _load_source_estimator(artifact_path, mtime_ns):
+    """The forest inside the pickle, or None if the pickle changed since mtime_ns."""
+    import joblib
+
+    estimator = _split_artifact(joblib.load(artifact_path))[0]
+    # replaced after the export was loaded: the registry reloads both shortly
+    return estimator if os.stat(artifact_path).st_mtime_ns == mtime_ns else None
+
+
+def load_artifact(artifact_path):
+    """
+    Registry loader: serve the compiled forest when one was exported from
+    the current pickle (and the backend allows it), else unpickle as usual.
+    Compiled arrays are memory-mapped read-only unless ANNADATA_FOREST_MMAP=0.
+    Batches of config.FOREST_SKLEARN_BATCH_ROWS rows or more still go to the
+    pickled estimator, which is unpickled the first time one arrives.
+    """
+    import joblib
+
+    if config.FOREST_BACKEND != "sklearn" and _fresh_compiled(artifact_path):
+        mtime_ns = os.stat(artifact_path).st_mtime_ns
+        compiled = load_compiled(artifact_path, mmap_mode="r" if config.FOREST_MMAP else None)
+        forest = _split_artifact(compiled)[0]
+        # a pruned export answers differently from the full pickle; keep
+        # single rows and batches on the same trees
+        if forest.pruned is None:
+            forest.sklearn_loader = lambda: _load_source_estimator(artifact_path, mtime_ns)
+            forest.batch_rows = config.FOREST_SKLEARN_BATCH_ROWS
+        return compiled
+
+    return joblib.load(artifact_path)
+
+
+# ---------------------------------------------------------------------------
+# CLI: export + exactness / size / latency report
+# ---------------------------------------------------------------------------
+
+def _targets():
+    """Named artifacts and a sample of the inputs each one is served with."""
+    import pandas as pd
+
+    def crop():
+        from src.recommendation.config import DATA_PATH, MODEL_PATH
+        return MODEL_PATH, pd.read_csv(DATA_PATH).drop(columns="label")
+
+    def soil_health():
+        from src.soil_health.config import PROCESSED_DATA_PATH, MODEL_PATH
+        from src.soil_health.prediction import FEATURE_ORDER
+        return MODEL_PATH, pd.read_csv(PROCESSED_DATA_PATH)[FEATURE_ORDER]
+
+    def fertilizer():
+        from src.fertilizer_recom.config import RAW_DATA_PATH, MODEL_FILENAME
+        df = pd.read_csv(RAW_DATA_PATH)
+        df.columns = df.columns.str.strip()
+        return MODEL_FILENAME, df.head(20000)
+
+    def yield_():
+        from src.yield_pred.config import DATA_PATH, MODEL_PATH
+        return MODEL_PATH, pd.read_csv(DATA_PATH)
+
+    return {"crop": crop, "soil_health": soil_health, "fertilizer": fertilizer, "yield": yield_}
+
+
+def _predictor(obj):
+    return obj["pipeline"] if isinstance(obj, dict) else obj
+
+
+def _scores(model, X):
+    return model.predict_proba(X) if hasattr(model, "predict_proba") else model.predict(X)
+
+
+def _latency_us(model, X, repeat=200):
+    row = X.iloc[:1]
+    model.predict(row)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(row)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def _batch_cost(model, X):
+    """(seconds, peak MB of Python/NumPy allocations) of one predict over X."""
+    import tracemalloc
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.predict(X)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def _dir_bytes(directory):
+    return sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+
+
+def main(names, batch_rows=50000):
+    import joblib
+    import pandas as pd
+
+    targets = _targets()
+    for name in names:
+        artifact_path, X = targets[name]()
+        artifact_path = str(artifact_path)
+
+        start = time.perf_counter()
+        original = joblib.load(artifact_path)
+        pickle_load_s = time.perf_counter() - start
+
+        export_artifact(artifact_path, obj=original)
+
+        start = time.perf_counter()
+        compiled = load_compiled(artifact_path)
+        compiled_load_s = time.perf_counter() - start
+
+        reference, candidate = _predictor(original), _predictor(compiled)
+        columns = getattr(reference, "feature_names_in_", None)
+        X = X[list(columns)] if columns is not None else X
+        identical = np.array_equal(_scores(reference, X), _scores(candidate, X))
+
+        print(f"\n[{name}] -> {compiled_dir(artifact_path)}")
+        print(f"  identical on {len(X)} rows: {identical}")
+        print(f"  size        pickle {os.path.getsize(artifact_path) / 2**20:8.1f} MB | "
+              f"compiled {_dir_bytes(compiled_dir(artifact_path)) / 2**20:8.1f} MB")
+        print(f"  load        pickle {pickle_load_s * 1000:8.1f} ms | compiled {compiled_load_s * 1000:8.1f} ms")
+        print(f"  1-row pred  pickle {_latency_us(reference, X):8.0f} us | "
+              f"compiled {_latency_us(candidate, X):8.0f} us")
+        if batch_rows:
+            # the /batch routes accept up to api.core.config.MAX_BATCH_ROWS rows
+            batch = pd.concat([X] * -(-batch_rows // len(X)), ignore_index=True).iloc[:batch_rows]
+            (ref_s, ref_mb), (cand_s, cand_mb) = _batch_cost(reference, batch), _batch_cost(candidate, batch)
+            print(f"  {batch_rows}-row    pickle {ref_s:8.2f} s  | compiled {cand_s:8.2f} s   "
+                  f"(peak MB: pickle {ref_mb:.0f}, compiled {cand_mb:.0f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export trained forests to the compiled array format.")
+    parser.add_argument("models", nargs="+", choices=["crop", "soil_health", "fertilizer", "yield"])
+    parser.add_argument("--batch-rows", type=int, default=50000,
+                        help="Also time one batch of this many rows (0 to skip).")
+    args = parser.parse_args()
+    main(args.models, args.batch_rows)
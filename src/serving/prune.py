@@ -0,0 +1,260 @@
+# src/serving/prune.py
+# Post-hoc pruning of compiled forests: fewer trees, shallower trees.
+#
+# A random forest averages its trees, so its first k trees are themselves a
+# forest. And every internal node already stores the output of the training
+# samples that reached it (class fractions, or the mean target), so cutting
+# a tree at depth d just turns the nodes at depth d into leaves that predict
+# what those nodes store. truncate_forest() does both on a CompiledForest,
+# without retraining and without sklearn.
+#
+# The CLI sweeps n_trees x max_depth on the held-out split of each training
+# script. For every point it reports the score (accuracy, or R2 for yield),
+# the compiled size, load time and one-row latency. It then exports the
+# smallest forest whose score is within --max-loss of the full forest to
+# <artifact>.pruned.forest (or under --output), where nothing serves it.
+# Pruning is lossy, so only --install writes it to compiled_dir(<artifact>),
+# the export load_artifact() serves; the registry stats then show its
+# "pruned" metadata. Re-running `python -m src.serving.forest` restores the
+# full export.
+#
+#   python -m src.serving.prune crop soil_health fertilizer yield [--max-loss 0.005] [--dry-run | --install]
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .forest import CompiledForest, _dir_bytes, _predictor, _split_artifact, compile_forest, compiled_dir, \
+    export_artifact
+
+DEFAULT_TREES = (10, 25, 50, 100, 200, 400)
+DEFAULT_DEPTHS = (4, 6, 8, 10, 12, 16, 20, 24, 32)
+
+
+def pruned_dir(artifact_path) -> str:
+    """Default location of a pruned export: next to compiled_dir(), never served."""
+    return os.path.splitext(str(artifact_path))[0] + ".pruned.forest"
+
+
+def node_depths(forest: CompiledForest, n_trees: Optional[int] = None) -> np.ndarray:
+    """Depth of every node reachable from the first n_trees roots; -1 for all other nodes."""
+    depth = np.full(len(forest.feature), -1, dtype=np.int64)
+    frontier = np.asarray(forest.roots[:n_trees], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        depth[frontier] = level
+        internal = frontier[forest.left[frontier] != frontier]
+        frontier = np.concatenate([forest.left[internal], forest.right[internal]]).astype(np.int64)
+        level += 1
+    return depth
+
+
+def truncate_forest(forest: CompiledForest, n_trees: Optional[int] = None,
+                    max_depth: Optional[int] = None) -> CompiledForest:
+    """
+    A new CompiledForest keeping the first `n_trees` trees, each cut at
+    `max_depth` (root at depth 0). Without limits it predicts exactly like
+    `forest`. The nodes that are dropped are removed from the arrays.
+    """
+    depth = node_depths(forest, n_trees)
+    keep = depth >= 0
+    is_leaf = forest.left == np.arange(len(forest.left))
+    if max_depth is not None:
+        keep &= depth <= max_depth
+        is_leaf = is_leaf | (depth == max_depth)
+
+    old = np.flatnonzero(keep)
+    new_id = np.cumsum(keep) - 1
+    leaf = is_leaf[old]
+    own = np.arange(len(old))
+    arrays = {
+        "feature": np.where(leaf, 0, forest.feature[old]).astype(np.int32),
+        "threshold": np.where(leaf, np.inf, forest.threshold[old]),
+        "left": np.where(leaf, own, new_id[forest.left[old]]).astype(np.int32),
+        "right": np.where(leaf, own, new_id[forest.right[old]]).astype(np.int32),
+        "missing_left": np.where(leaf, True, forest.missing_left[old]),
+        "value": np.array(forest.value[old]),
+        "roots": new_id[forest.roots[:n_trees]].astype(np.int32),
+    }
+    meta = forest.meta()
+    meta["max_depth"] = int(depth[keep].max())
+    return CompiledForest(arrays, meta)
+
+
+def _scorer(forest: CompiledForest):
+    from sklearn.metrics import accuracy_score, r2_score
+    return ("accuracy", accuracy_score) if forest.kind == "classifier" else ("R2", r2_score)
+
+
+def score_curve(forest: CompiledForest, X, y, tree_counts: Sequence[int], depths: Sequence[Optional[int]]):
+    """
+    {(n_trees, max_depth): score} for every combination. Each depth needs a
+    single walk of its largest forest: smaller tree counts are prefix sums of
+    the same per-tree outputs, added in the order CompiledForest uses.
+    """
+    _, score = _scorer(forest)
+    counts = sorted(tree_counts)
+    scores = {}
+    for max_depth in depths:
+        pruned = truncate_forest(forest, counts[-1], max_depth)
+        leaves = pruned.apply(X)
+        total = np.zeros((leaves.shape[1], pruned.value.shape[1]), dtype=np.float64)
+        for t in range(counts[-1]):
+            total += pruned.value[leaves[t]]
+            if t + 1 in counts:
+                mean = total / (t + 1)
+                pred = forest.classes_.take(np.argmax(mean, axis=1)) if forest.kind == "classifier" else mean[:, 0]
+                scores[(t + 1, max_depth)] = float(score(y, pred))
+    return scores
+
+
+def _median_seconds(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure(forest: CompiledForest, row, repeat: int = 200):
+    """(bytes on disk, load seconds, one-row predict seconds) of a compiled forest."""
+    with tempfile.TemporaryDirectory(prefix="annadata-prune-") as tmp:
+        forest.save(tmp)
+        size = _dir_bytes(tmp)
+        load_s = _median_seconds(lambda: CompiledForest.load(tmp), 3)
+    return size, load_s, _median_seconds(lambda: forest.predict(row), repeat)
+
+
+# ---------------------------------------------------------------------------
+# CLI: trade-off curve + pruned export
+# ---------------------------------------------------------------------------
+
+def _held_out():
+    """Named artifacts and the labelled held-out split each training script evaluates on."""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    def crop():
+        from src.recommendation.config import DATA_PATH, MODEL_PATH
+        from src.recommendation.data_preprocessing import load_data, split_data
+        _, X_test, _, y_test = split_data(load_data(DATA_PATH))
+        return MODEL_PATH, X_test, y_test
+
+    def soil_health():
+        from src.soil_health.config import MODEL_PATH
+        from src.soil_health.training import load_processed_data, prepare_data
+        X, y = prepare_data(load_processed_data())
+        _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        return MODEL_PATH, X_test, y_test
+
+    def fertilizer():
+        import sys
+        from src.fertilizer_recom.config import MODEL_FILENAME, PROJECT_ROOT, RANDOM_STATE, RAW_DATA_PATH
+        # preprocess.py imports its siblings by bare name
+        sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "fertilizer_recom"))
+        from preprocess import prepare_train_test
+        df = pd.read_csv(RAW_DATA_PATH)
+        df.columns = df.columns.str.strip()
+        prep = prepare_train_test(df, target_col="Fertilizer Name", random_state=RANDOM_STATE)
+        return MODEL_FILENAME, prep["X_test"], prep["y_test"]
+
+    def yield_():
+        from src.yield_pred.config import MODEL_PATH
+        from src.yield_pred.preprocess import load_data, train_test_split_df
+        _, X_test, _, y_test = train_test_split_df(load_data())
+        return MODEL_PATH, X_test, y_test
+
+    return {"crop": crop, "soil_health": soil_health, "fertilizer": fertilizer, "yield": yield_}
+
+
+def _forest_inputs(obj, X, y):
+    """Held-out rows and labels as the forest inside `obj` sees them."""
+    model = _predictor(obj)
+    for _, step in getattr(model, "steps", [])[:-1]:
+        X = step.transform(X)
+    if isinstance(obj, dict) and "label_encoder" in obj:
+        # the fertilizer forest predicts encoded labels
+        y = obj["label_encoder"].transform(np.asarray(y).astype(str))
+    return X, np.asarray(y)
+
+
+def _grid(values: Optional[List[int]], defaults: Sequence[int], full: int) -> List[int]:
+    return sorted({v for v in (values or defaults) if v < full} | {full})
+
+
+def main(names, max_loss, trees=None, depths=None, output=None, dry_run=False, install=False, repeat=200):
+    import joblib
+
+    targets = _held_out()
+    for name in names:
+        artifact_path, X, y = targets[name]()
+        artifact_path = str(artifact_path)
+        obj = joblib.load(artifact_path)
+        estimator, _ = _split_artifact(obj)
+        forest = compile_forest(estimator)
+        X, y = _forest_inputs(obj, X, y)
+        X = forest._as_array(X)
+
+        tree_counts = _grid(trees, DEFAULT_TREES, forest.n_trees)
+        depth_grid = _grid(depths, DEFAULT_DEPTHS, forest.max_depth)
+        scores = score_curve(forest, X, y, tree_counts, depth_grid)
+        metric, _ = _scorer(forest)
+        full_score = scores[(forest.n_trees, forest.max_depth)]
+
+        print(f"\n[{name}] {artifact_path}: {forest.n_trees} trees, depth {forest.max_depth}, "
+              f"{metric} {full_score:.4f} on {len(y)} held-out rows")
+        print(f"  {'trees':>5} {'depth':>5} {metric:>9} {'loss':>8} {'size MB':>8} {'load ms':>8} {'1-row us':>9}")
+        points = []
+        for (k, d), s in sorted(scores.items()):
+            pruned = truncate_forest(forest, k, d)
+            size, load_s, row_s = measure(pruned, X[:1], repeat)
+            loss = full_score - s
+            points.append((size, row_s, k, d, s, loss, pruned))
+            print(f"  {k:5d} {pruned.max_depth:5d} {s:9.4f} {loss:8.4f} {size / 2 ** 20:8.2f} "
+                  f"{load_s * 1e3:8.1f} {row_s * 1e6:9.0f}{'' if loss <= max_loss else '   (over budget)'}",
+                  flush=True)
+
+        size, row_s, k, d, s, loss, pruned = min((p for p in points if p[5] <= max_loss), key=lambda p: p[:2])
+        full_size = next(p[0] for p in points if p[2] == forest.n_trees and p[3] == forest.max_depth)
+        print(f"  smallest within {max_loss} {metric} loss: {k} trees, depth {pruned.max_depth} "
+              f"({size / 2 ** 20:.2f} MB, {size / full_size:.3g}x the full forest, {metric} {s:.4f})")
+        if dry_run:
+            continue
+        if install:
+            directory = compiled_dir(artifact_path)
+        elif output:
+            directory = os.path.join(output, os.path.basename(pruned_dir(artifact_path)))
+        else:
+            directory = pruned_dir(artifact_path)
+        export_artifact(artifact_path, obj=obj, forest=pruned, directory=directory, extra_meta={"pruned": {
+            "n_trees": k, "max_depth": pruned.max_depth, "score": s, "full_score": full_score,
+            "metric": metric, "max_loss": max_loss,
+        }})
+        print(f"  -> {directory}" + (" (installed: served on the next load)" if install else
+                                     " (not served; re-run with --install to serve it)"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy vs. size of pruned forests; exports the smallest "
+                                                 "one within a score loss budget.")
+    parser.add_argument("models", nargs="+", choices=["crop", "soil_health", "fertilizer", "yield"])
+    parser.add_argument("--max-loss", type=float, default=0.005,
+                        help="Largest drop in accuracy (R2 for yield) accepted against the full forest.")
+    parser.add_argument("--trees", type=int, nargs="+", default=None, help="Tree counts to evaluate.")
+    parser.add_argument("--depths", type=int, nargs="+", default=None, help="Maximum depths to evaluate.")
+    parser.add_argument("--output", default=None,
+                        help="Write <model>.pruned.forest under this folder instead of next to the artifact.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--dry-run", action="store_true", help="Only print the trade-off curve.")
+    mode.add_argument("--install", action="store_true",
+                      help="Replace the served export (<model>.forest) with the pruned forest.")
+    parser.add_argument("--repeat", type=int, default=200, help="One-row predictions timed per point.")
+    args = parser.parse_args()
+    main(args.models, args.max_loss, args.trees, args.depths, args.output, args.dry_run, args.install,
+         args.repeat)
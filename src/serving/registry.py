@@ -0,0 +1,346 @@
+# src/serving/registry.py
+# Process-wide registry of trained model artifacts.
+#
+# Every predictor registers its artifact once (name -> path + loader) and
+# fetches it with get(name). The artifact is deserialized on first use (or
+# by warm() at API startup) and then stays resident for the life of the
+# process, so requests never pay joblib.load / load_model again.
+#
+# start_watcher() polls the artifacts for changes. A retrained artifact is
+# loaded and validated on the watcher thread while requests keep getting
+# the old model; only then is the resident reference swapped.
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import joblib
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process (0 if unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except Exception:
+        return 0
+
+
+def process_memory() -> Dict[str, int]:
+    """
+    Memory of this worker in bytes. `pss` splits pages shared with other
+    processes (e.g. memory-mapped artifacts) evenly between them, so summing
+    pss over all workers gives their real combined footprint.
+    """
+    report = {"pid": os.getpid(), "rss": _rss_bytes()}
+    fields = {"Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "private", "Private_Dirty": "private"}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    name = fields[key]
+                    report[name] = report.get(name, 0) + int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return report
+
+
+def _fingerprint(path: str):
+    """Cheap change detector: (mtime_ns, size), or None if the file is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _content_hash(*paths: str) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class _Entry:
+    def __init__(self, name: str, path: str, loader: Callable[[str], Any],
+                 validate: Optional[Callable[[Any], Any]] = None,
+                 watch: Iterable[str] = ()):
+        self.name = name
+        self.path = path
+        self.watch = tuple(watch)
+        self.loader = loader
+        self.validate = validate
+        self.model = None
+        self.version = None
+        self.fingerprint = None
+        self.rejected_fingerprint = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self.rss_delta_bytes = None
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        model = self.model
+        if isinstance(model, dict):  # artifacts bundling a pipeline with its encoders
+            model = model.get("pipeline")
+        return {
+            "path": self.path,
+            "loaded": self.model is not None,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "artifact_bytes": os.path.getsize(self.path) if os.path.isfile(self.path) else None,
+            "reloads": self.reloads,
+            "reload_failures": self.reload_failures,
+            "last_error": self.last_error,
+            # pruning metadata of a compiled forest export (src/serving/prune.py), None if unpruned
+            "pruned": getattr(model, "pruned", None),
+        }
+
+    def fingerprint_now(self):
+        """Fingerprint of the artifact plus any side files the loader reads."""
+        main = _fingerprint(self.path)
+        if main is None or not self.watch:
+            return main
+        return (main,) + tuple(_fingerprint(p) for p in self.watch)
+
+    def content_version(self) -> Optional[str]:
+        if not os.path.isfile(self.path):
+            return None
+        return _content_hash(self.path, *self.watch)[:12]
+
+
+_ENTRIES: Dict[str, _Entry] = {}
+_ENTRIES_LOCK = threading.Lock()
+
+
+def register(name: str, path, loader: Callable[[str], Any] = joblib.load,
+             validate: Optional[Callable[[Any], Any]] = None,
+             watch: Iterable = ()) -> None:
+    """
+    Declare where the artifact for `name` lives and how to load it.
+    `validate` receives a freshly loaded model and should raise if it is
+    unusable; a hot-reloaded artifact is only swapped in once it passes.
+    `watch` lists extra files the loader depends on (e.g. a compiled
+    export next to the pickle); changing any of them triggers a reload.
+    Re-registering the same name and path is a no-op, so modules can
+    register at import time.
+    """
+    path = str(path)
+    watch = tuple(str(p) for p in watch)
+    with _ENTRIES_LOCK:
+        entry = _ENTRIES.get(name)
+        if (entry is not None and entry.path == path and entry.loader is loader
+                and entry.watch == watch):
+            return
+        _ENTRIES[name] = _Entry(name, path, loader, validate, watch)
+
+
+def _load_candidate(entry: _Entry) -> Dict[str, Any]:
+    """Load and validate the artifact on disk without touching the resident model."""
+    if not os.path.exists(entry.path):
+        raise FileNotFoundError(
+            f"No artifact for model '{entry.name}' at: {entry.path}. Train the model first."
+        )
+
+    fingerprint = entry.fingerprint_now()
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    model = entry.loader(entry.path)
+    load_seconds = round(time.perf_counter() - start, 4)
+    rss_delta = max(_rss_bytes() - rss_before, 0)
+
+    if entry.validate is not None:
+        entry.validate(model)
+
+    return {
+        "model": model,
+        "fingerprint": fingerprint,
+        "version": entry.content_version(),
+        "load_seconds": load_seconds,
+        "rss_delta_bytes": rss_delta,
+    }
+
+
+def _install(entry: _Entry, candidate: Dict[str, Any]) -> None:
+    entry.fingerprint = candidate["fingerprint"]
+    entry.version = candidate["version"]
+    entry.load_seconds = candidate["load_seconds"]
+    entry.rss_delta_bytes = candidate["rss_delta_bytes"]
+    entry.loaded_at = time.time()
+    entry.last_error = None
+    # single reference assignment: readers see either the old or the new model
+    entry.model = candidate["model"]
+
+
+def _load(entry: _Entry) -> None:
+    _install(entry, _load_candidate(entry))
+
+
+def get(name: str) -> Any:
+    """Return the resident model for `name`, loading it on first use."""
+    entry = _ENTRIES.get(name)
+    if entry is None:
+        raise KeyError(f"Unknown model '{name}'. Registered: {sorted(_ENTRIES)}")
+
+    model = entry.model
+    if model is None:
+        with entry.lock:
+            if entry.model is None:
+                _load(entry)
+            model = entry.model
+    return model
+
+
+def get_with_version(name: str) -> Tuple[Any, Optional[str]]:
+    """
+    (model, version) for `name`, read together under the entry lock so a
+    concurrent reload can't pair one artifact's model with the other's
+    version. Use it when results are cached under the version.
+    """
+    entry = _ENTRIES.get(name)
+    if entry is None:
+        raise KeyError(f"Unknown model '{name}'. Registered: {sorted(_ENTRIES)}")
+
+    with entry.lock:
+        if entry.model is None:
+            _load(entry)
+        return entry.model, entry.version
+
+
+def warm(names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load every registered model (or just `names`) up front.
+    A model that fails to load is reported with an "error" key instead of
+    aborting the others, so one missing artifact doesn't block startup.
+    """
+    report = {}
+    for name in (list(names) if names is not None else sorted(_ENTRIES)):
+        try:
+            get(name)
+            report[name] = _ENTRIES[name].stats()
+        except Exception as e:
+            report[name] = {"loaded": False, "error": f"{type(e).__name__}: {e}"}
+    return report
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """Load time and resident memory for every registered model."""
+    return {name: entry.stats() for name, entry in sorted(_ENTRIES.items())}
+
+
+def version(name: str) -> Optional[str]:
+    """Content hash prefix of the resident artifact (None until loaded)."""
+    entry = _ENTRIES.get(name)
+    return entry.version if entry is not None else None
+
+
+def reload_if_changed(name: str) -> bool:
+    """
+    Swap in a new artifact for `name` if the file changed since it was loaded.
+    The old model keeps serving until the new one has loaded and validated;
+    a broken artifact is logged and skipped until the file changes again.
+    Returns True if a new model was installed.
+    """
+    entry = _ENTRIES.get(name)
+    if entry is None or entry.model is None:
+        return False
+
+    fingerprint = entry.fingerprint_now()
+    if fingerprint is None or fingerprint in (entry.fingerprint, entry.rejected_fingerprint):
+        return False
+
+    # mtime moved but bytes are identical (touch, re-copy): nothing to swap
+    if os.path.isfile(entry.path) and entry.content_version() == entry.version:
+        entry.fingerprint = fingerprint
+        return False
+
+    try:
+        candidate = _load_candidate(entry)
+    except Exception as e:
+        entry.rejected_fingerprint = fingerprint
+        entry.reload_failures += 1
+        entry.last_error = f"{type(e).__name__}: {e}"
+        logger.warning("Reload of model %s rejected, keeping version %s: %s",
+                       name, entry.version, entry.last_error)
+        return False
+
+    with entry.lock:
+        previous = entry.version
+        _install(entry, candidate)
+        entry.reloads += 1
+    logger.info("Model %s reloaded: %s -> %s", name, previous, entry.version)
+    return True
+
+
+class _Watcher(threading.Thread):
+    def __init__(self, interval: float):
+        super().__init__(name="model-registry-watcher", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            for name in list(_ENTRIES):
+                try:
+                    reload_if_changed(name)
+                except Exception:
+                    logger.exception("Reload check failed for model %s", name)
+
+
+_WATCHER: Optional[_Watcher] = None
+
+
+def start_watcher(interval: Optional[float] = None) -> bool:
+    """Start polling registered artifacts for changes (idempotent)."""
+    global _WATCHER
+    interval = config.RELOAD_INTERVAL_SECONDS if interval is None else interval
+    if interval <= 0 or (_WATCHER is not None and _WATCHER.is_alive()):
+        return False
+    _WATCHER = _Watcher(interval)
+    _WATCHER.start()
+    return True
+
+
+def stop_watcher() -> None:
+    global _WATCHER
+    if _WATCHER is not None:
+        _WATCHER.stopped.set()
+        _WATCHER.join(timeout=_WATCHER.interval + 1)
+        _WATCHER = None
+
+
+def unload(name: Optional[str] = None) -> None:
+    """Drop resident models (all of them if no name is given)."""
+    targets = [name] if name is not None else list(_ENTRIES)
+    for n in targets:
+        entry = _ENTRIES.get(n)
+        if entry is not None:
+            with entry.lock:
+                entry.model = None
@@ -1,16 +1,44 @@
-import joblib
 import pandas as pd
 
+from src.serving import fast_path, forest, registry
+from src.serving.cache import memoized, prediction_cache, quantizer
 from src.soil_health.config import MODEL_PATH
 
 
 FEATURE_ORDER = ["N", "P", "K", "ph"]
 
+MODEL_NAME = "soil_health"
 
-def load_model():
+
+def _validate_model(model):
+    """Smoke-test a freshly loaded model before it replaces the serving one."""
+    model.predict_proba(pd.DataFrame([[0.0] * len(FEATURE_ORDER)], columns=FEATURE_ORDER))
+
+
+registry.register(MODEL_NAME, MODEL_PATH, loader=forest.load_artifact, validate=_validate_model,
+                  watch=[forest.compiled_meta_path(MODEL_PATH)])
+
+# Decimals each input is rounded to for memoization (soil lab precision)
+CACHE_PRECISION = {"N": 1, "P": 1, "K": 1, "ph": 2}
+_cache, _precision = prediction_cache(MODEL_NAME, CACHE_PRECISION)
+_quantize = quantizer(FEATURE_ORDER, _precision)
+
+
+def _predict_proba_rows(model, fast, rows):
+    if fast is not None:
+        return fast.predict_proba(rows)
+    X = pd.DataFrame([[r[f] for f in FEATURE_ORDER] for r in rows], columns=FEATURE_ORDER)
+    return model.predict_proba(X)
+
+
+def _load_with_version():
     if not MODEL_PATH.exists():
         raise FileNotFoundError("❌ Trained soil health model not found")
-    return joblib.load(MODEL_PATH)
+    return registry.get_with_version(MODEL_NAME)
+
+
+def load_model():
+    return _load_with_version()[0]
 
 
 def validate_input(soil_input: dict):
@@ -42,11 +70,14 @@ def predict_soil_health(soil_input: dict):
     """
     Main prediction function
     """
-    model = load_model()
-    X = prepare_input(soil_input)
+    model, version = _load_with_version()
+    fast = fast_path.for_model(model, FEATURE_ORDER)
 
-    prediction = model.predict(X)[0]
-    probabilities = model.predict_proba(X)[0]
+    validate_input(soil_input)
+    probabilities = memoized(_cache, version, [soil_input], _quantize,
+                             lambda rows: _predict_proba_rows(model, fast, rows))[0]
+    # argmax over predict_proba is exactly what RandomForest.predict does
+    prediction = model.classes_[probabilities.argmax()]
 
     class_probs = dict(zip(model.classes_, probabilities))
 
@@ -57,6 +88,41 @@ def predict_soil_health(soil_input: dict):
     }
 
 
+def predict_soil_health_batch(soil_inputs: list):
+    """
+    Batch version of predict_soil_health: one predict_proba call for all
+    valid rows. Results keep input order; invalid rows get {"error": ...}.
+    """
+    model, version = _load_with_version()
+    fast = fast_path.for_model(model, FEATURE_ORDER)
+
+    results = [None] * len(soil_inputs)
+    rows, positions = [], []
+    for i, soil_input in enumerate(soil_inputs):
+        try:
+            validate_input(soil_input)
+        except ValueError as e:
+            results[i] = {"error": str(e)}
+            continue
+        rows.append(soil_input)
+        positions.append(i)
+
+    if rows:
+        all_probs = memoized(_cache, version, rows, _quantize,
+                             lambda missing: _predict_proba_rows(model, fast, missing))
+        # argmax over predict_proba is exactly what RandomForest.predict does
+        predictions = [model.classes_[p.argmax()] for p in all_probs]
+
+        for i, prediction, probabilities in zip(positions, predictions, all_probs):
+            results[i] = {
+                "soil_health_class": prediction,
+                "confidence": round(max(probabilities), 3),
+                "class_probabilities": dict(zip(model.classes_, probabilities))
+            }
+
+    return results
+
+
 # ----------------- TEST LOCALLY ----------------- #
 if __name__ == "__main__":
     sample_input = {
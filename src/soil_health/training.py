@@ -1,3 +1,5 @@
+import argparse
+
 import pandas as pd
 import joblib
 
@@ -6,6 +8,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 
 from src.soil_health.config import PROCESSED_DATA_PATH, MODEL_PATH
+from src.training.estimators import ESTIMATORS, boosted_estimator, check_export
+
+# XGBClassifier only takes integer labels; this model predicts class names directly
+SOIL_ESTIMATORS = [e for e in ESTIMATORS if e != "xgboost"]
 
 
 def load_processed_data():
@@ -18,13 +24,19 @@ def prepare_data(df):
     return X, y
 
 
-def train_model(X_train, y_train):
-    model = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=10,
-        random_state=42,
-        class_weight="balanced"
-    )
+def build_model(estimator="forest"):
+    if estimator == "forest":
+        return RandomForestClassifier(
+            n_estimators=200,
+            max_depth=10,
+            random_state=42,
+            class_weight="balanced"
+        )
+    return boosted_estimator(estimator, "classifier", random_state=42, class_weight="balanced")
+
+
+def train_model(X_train, y_train, estimator="forest"):
+    model = build_model(estimator)
     model.fit(X_train, y_train)
     return model
 
@@ -39,13 +51,23 @@ def evaluate_model(model, X_test, y_test):
     print(confusion_matrix(y_test, y_pred))
 
 
-def save_model(model):
+def save_model(model, mmap=False):
     MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
     joblib.dump(model, MODEL_PATH)
     print(f"✅ Model saved at: {MODEL_PATH}")
 
+    if mmap:
+        # memory-mappable arrays next to the pickle, shared by all API workers
+        from src.serving.forest import compiled_dir, export_artifact
+        export_artifact(MODEL_PATH, obj=model)
+        print(f"✅ Memory-mappable forest saved at: {compiled_dir(MODEL_PATH)}")
+
+
+def training_pipeline(mmap=False, estimator="forest"):
+    if estimator not in SOIL_ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{estimator}'; choose from {SOIL_ESTIMATORS}")
+    check_export(estimator, mmap)
 
-def training_pipeline():
     df = load_processed_data()
     X, y = prepare_data(df)
 
@@ -57,10 +79,16 @@ def training_pipeline():
         stratify=y
     )
 
-    model = train_model(X_train, y_train)
+    model = train_model(X_train, y_train, estimator=estimator)
     evaluate_model(model, X_test, y_test)
-    save_model(model)
+    save_model(model, mmap=mmap)
 
 
 if __name__ == "__main__":
-    training_pipeline()
+    parser = argparse.ArgumentParser(description="Train soil health model.")
+    parser.add_argument("--mmap", action="store_true", help="Also export a memory-mappable compiled forest.")
+    parser.add_argument("--estimator", choices=SOIL_ESTIMATORS, default="forest",
+                        help="Random forest or histogram gradient boosting.")
+    args = parser.parse_args()
+
+    training_pipeline(mmap=args.mmap, estimator=args.estimator)
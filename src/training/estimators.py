@@ -0,0 +1,99 @@
+# src/training/estimators.py
+# Estimator backends for the tabular training scripts.
+#
+#   forest    RandomForest*, the historical default; the only backend
+#             src/serving/forest.py can compile to memory-mappable arrays
+#   hist_gb   sklearn's HistGradientBoosting*: shallow trees boosted on
+#             binned features, with native categorical splits
+#   xgboost   XGBoost's hist booster (optional dependency, imported on use),
+#             with the same categorical handling
+#
+# Native categorical splits work on the "ordinal" encoding (one code per
+# categorical column, see matrices.py), so boosted backends default to it:
+# a split can then send any subset of categories left instead of peeling off
+# one one-hot column at a time.
+
+from typing import Any, Dict, Optional, Sequence
+
+ESTIMATORS = ("forest", "hist_gb", "xgboost")
+TASKS = ("classifier", "regressor")
+
+# searched instead of the forest grids; step prefixes are added by search_space()
+_SEARCH_SPACES = {
+    "hist_gb": {
+        "max_iter": [100, 300],
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_leaf_nodes": [15, 31, 63],
+    },
+    "xgboost": {
+        "n_estimators": [100, 300],
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_depth": [4, 6, 8],
+    },
+}
+
+
+def _check_kind(kind: str) -> None:
+    if kind not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{kind}'; choose from {list(ESTIMATORS)}")
+
+
+def default_encoding(kind: str) -> str:
+    """Categorical encoding a backend trains best on."""
+    _check_kind(kind)
+    return "onehot" if kind == "forest" else "ordinal"
+
+
+def categorical_mask(encoding: str, numeric_cols: Sequence[str], categorical_cols: Sequence[str]):
+    """
+    Boolean mask of the categorical columns in a ColumnTransformer's output
+    (numeric block first, then categorical), or None when the encoding does
+    not keep one column per category.
+    """
+    if encoding != "ordinal" or not categorical_cols:
+        return None
+    return [False] * len(numeric_cols) + [True] * len(categorical_cols)
+
+
+def boosted_estimator(kind: str, task: str, categorical: Optional[Sequence[bool]] = None,
+                      random_state: Optional[int] = None, **params):
+    """
+    Unfitted gradient-boosting `task` ("classifier" / "regressor") of the
+    `kind` backend. categorical marks the columns holding ordinal codes
+    (see categorical_mask); extra params go to the estimator unchanged.
+    """
+    _check_kind(kind)
+    if task not in TASKS:
+        raise ValueError(f"Unknown task '{task}'; choose from {list(TASKS)}")
+    if kind == "forest":
+        raise ValueError("boosted_estimator() builds hist_gb / xgboost models; forests stay in the training scripts")
+
+    if kind == "hist_gb":
+        from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+        cls = HistGradientBoostingClassifier if task == "classifier" else HistGradientBoostingRegressor
+        # unknown categories are encoded as -1, which these models treat as missing
+        return cls(categorical_features=None if categorical is None else list(categorical),
+                   random_state=random_state, **params)
+
+    try:
+        import xgboost
+    except ImportError as exc:
+        raise ImportError("The xgboost backend needs the xgboost package: pip install xgboost") from exc
+    cls = xgboost.XGBClassifier if task == "classifier" else xgboost.XGBRegressor
+    if categorical is not None:
+        params.update(enable_categorical=True, feature_types=["c" if c else "q" for c in categorical])
+    return cls(tree_method="hist", random_state=random_state, **params)
+
+
+def search_space(kind: str, step: str) -> Dict[str, Any]:
+    """Hyperparameter grid for a boosted `kind`, prefixed for Pipeline step `step`."""
+    _check_kind(kind)
+    if kind == "forest":
+        raise ValueError("Forest search spaces are defined by the training scripts")
+    return {f"{step}__{name}": values for name, values in _SEARCH_SPACES[kind].items()}
+
+
+def check_export(kind: str, mmap: bool) -> None:
+    """Reject --mmap for boosted models before any training time is spent."""
+    if mmap and kind != "forest":
+        raise ValueError(f"mmap export compiles random forests only, not '{kind}' models")
@@ -0,0 +1,90 @@
+# src/training/matrices.py
+# Memory-lean training inputs for the tabular pipelines.
+#
+# GridSearchCV over Pipeline(preprocessor, forest) pickles the raw DataFrame
+# to every worker, and every fit re-encodes it into a private dense float64
+# matrix (one column per country, crop, soil type...). fit_search_shared()
+# encodes the training split once instead, casts it to float32 (the dtype
+# sklearn trees split on, so the fitted trees do not change) and dumps it to
+# a scratch folder that every CV worker memory-maps: the matrix is resident
+# once per machine rather than once per worker.
+#
+# categorical_encoder() chooses how categoricals are encoded:
+#   onehot    dense one-hot, the historical default
+#   sparse    sparse one-hot in float32 (ColumnTransformer keeps it sparse)
+#   ordinal   one float32 code per column; trees split on the codes
+
+import os
+import tempfile
+from typing import Any, Dict, Tuple
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+
+ENCODINGS = ("onehot", "sparse", "ordinal")
+
+
+def categorical_encoder(encoding: str = "onehot"):
+    if encoding == "onehot":
+        return OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    if encoding == "sparse":
+        return OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32)
+    if encoding == "ordinal":
+        # categories unseen in training get their own code, below all fitted ones
+        return OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1, dtype=np.float32)
+    raise ValueError(f"Unknown encoding '{encoding}'; choose from {list(ENCODINGS)}")
+
+
+def sparse_threshold(encoding: str) -> float:
+    """ColumnTransformer(sparse_threshold=...) that keeps `encoding`'s output layout."""
+    return 1.0 if encoding == "sparse" else 0.0
+
+
+def shared_matrix(X, folder: str):
+    """
+    X as float32 (CSC if sparse: the layout tree fitting converts to), dumped
+    under `folder` and memory-mapped back read-only. joblib hands memmaps to
+    worker processes by file name, so all of them share the same pages.
+    """
+    if sparse.issparse(X):
+        X = sparse.csc_matrix(X, dtype=np.float32)
+        X.sort_indices()
+    else:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+    path = os.path.join(folder, "X_train.joblib")
+    joblib.dump(X, path)
+    del X
+    return joblib.load(path, mmap_mode="r")
+
+
+def fit_search_shared(search_cls, pipeline: Pipeline, params: Dict[str, Any], X, y,
+                      **search_kwargs) -> Tuple[Pipeline, Any]:
+    """
+    Run `search_cls` (GridSearchCV, RandomizedSearchCV...) over the final
+    step of a Pipeline(preprocessor, estimator) on a shared float32 matrix.
+    `params` keep their pipeline prefixes ("model__max_depth").
+
+    The preprocessor is fitted once on X, so within CV its imputer fills and
+    category lists have also seen the validation folds (the test split is
+    never touched). Returns the pipeline with the fitted preprocessor and
+    the refitted best estimator, and the fitted search.
+    """
+    (pre_name, preprocessor), (name, estimator) = pipeline.steps
+    prefix = name + "__"
+    unknown = [k for k in params if not k.startswith(prefix)]
+    if unknown:
+        raise ValueError(f"Search parameters {unknown} do not target the '{name}' step")
+    params = {k[len(prefix):]: v for k, v in params.items()}
+
+    preprocessor.fit(X)
+    with tempfile.TemporaryDirectory(prefix="annadata-cv-") as folder:
+        X_shared = shared_matrix(preprocessor.transform(X), folder)
+        search = search_cls(estimator, params, **search_kwargs)
+        search.fit(X_shared, y)
+        del X_shared
+
+    return Pipeline([(pre_name, preprocessor), (name, search.best_estimator_)]), search
+
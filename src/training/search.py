@@ -0,0 +1,285 @@
+# src/training/search.py
+# Successive-halving hyperparameter search with a time budget and resumable
+# state.
+#
+# Every candidate is cross-validated on a small resource (a subsample of the
+# training rows, or a small n_estimators); only the best 1/factor move on to
+# the next round, which gets factor times more resource. The last round
+# uses the full resource, so the winner is compared on the same footing as
+# in an exhaustive search, at a fraction of the cost:
+#
+#   81 candidates -> 27 -> 9 -> 3 -> 1       rows: n/81, n/27, n/9, n/3, n
+#
+# Fold scores are written to a JSON state file as they complete. Running
+# the same search again (same candidates, data and settings) skips
+# everything already scored, so an interrupted or budget-limited run picks
+# up where it stopped. With a time budget, the search stops dispatching
+# work once the budget is spent and keeps the best candidate of the highest
+# resource level reached.
+
+import hashlib
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from joblib import effective_n_jobs
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+from sklearn.utils.parallel import Parallel, delayed
+
+RESOURCES = ("n_samples", "n_estimators")
+STATE_VERSION = 1
+
+
+def _take(data, indices):
+    return data.iloc[indices] if hasattr(data, "iloc") else data[indices]
+
+
+def _fit_and_score(estimator, params, X, y, train, test, scoring):
+    estimator = clone(estimator).set_params(**params)
+    estimator.fit(_take(X, train), _take(y, train))
+    return float(check_scoring(estimator, scoring)(estimator, _take(X, test), _take(y, test)))
+
+
+def _plain(value):
+    """JSON stand-in for values json cannot encode: NumPy scalars (grids written
+    as np.arange / np.linspace hand out np.int64, np.float64...) and arrays as
+    their Python values."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    return repr(value)
+
+
+def _key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=_plain)
+
+
+def _hash_data(digest, data) -> None:
+    """Feed the contents of a DataFrame / Series, sparse matrix or array into `digest`."""
+    if hasattr(data, "columns") or hasattr(data, "dtypes"):
+        import pandas as pd
+        digest.update(repr(list(getattr(data, "columns", [getattr(data, "name", None)]))).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        return
+    if hasattr(data, "tocsr"):
+        data = data.tocsr()
+        digest.update(repr((data.shape, data.dtype.str)).encode())
+        for part in (data.data, data.indices, data.indptr):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        return
+    data = np.asarray(data)
+    digest.update(repr((data.shape, data.dtype.str)).encode())
+    digest.update(np.ascontiguousarray(data.astype(str) if data.dtype == object else data).tobytes())
+
+
+class SuccessiveHalving:
+    """
+    Drop-in for GridSearchCV / RandomizedSearchCV in the training scripts:
+    same constructor shape (estimator, params, cv=, scoring=, n_jobs=,
+    verbose=) and the same best_params_ / best_score_ / best_estimator_
+    once fitted. cv_results_ lists every (round, resource, params, score).
+
+    resource: "n_samples" (nested random subsamples of the training rows) or
+    "n_estimators" (the final estimator's tree count, max_iter for
+    HistGradientBoosting*; any such values in the grid are dropped and their
+    maximum becomes max_resources).
+    n_candidates samples that many candidates from `params` instead of
+    taking the full grid. time_budget is in seconds; state_path enables
+    resuming.
+    """
+
+    def __init__(self, estimator, params: Dict[str, List[Any]], resource: str = "n_samples", factor: int = 3,
+                 min_resources: Optional[int] = None, max_resources: Optional[int] = None,
+                 n_candidates: Optional[int] = None, cv=5, scoring=None, n_jobs=None,
+                 time_budget: Optional[float] = None, state_path: Optional[str] = None,
+                 random_state: int = 0, verbose: int = 0):
+        if resource not in RESOURCES:
+            raise ValueError(f"Unknown resource '{resource}'; choose from {list(RESOURCES)}")
+        if factor < 2:
+            raise ValueError("factor must be at least 2")
+        self.estimator = estimator
+        self.params = params
+        self.resource = resource
+        self.factor = factor
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.n_candidates = n_candidates
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.time_budget = time_budget
+        self.state_path = state_path
+        self.random_state = random_state
+        self.verbose = verbose
+
+    # ---------------------------------------------------------------- setup
+    def _resource_param(self) -> str:
+        """Full parameter name of the tree count, e.g. "model__n_estimators" in a Pipeline."""
+        if hasattr(self.estimator, "steps"):
+            name, final = self.estimator.steps[-1]
+            prefix = name + "__"
+        else:
+            final, prefix = self.estimator, ""
+        # boosting iterations of HistGradientBoosting* (one tree per class each)
+        trees = "n_estimators" if "n_estimators" in final.get_params() else "max_iter"
+        return prefix + trees
+
+    def _candidates(self):
+        """Candidate parameter dicts and the full resource."""
+        params = dict(self.params)
+        if self.resource == "n_estimators":
+            name = self._resource_param()
+            tree_counts = params.pop(name, None)
+            max_resources = self.max_resources or (max(tree_counts) if tree_counts
+                                                   else self.estimator.get_params()[name])
+        else:
+            max_resources = self.max_resources
+        if self.n_candidates is None:
+            return list(ParameterGrid(params)), max_resources
+        return list(ParameterSampler(params, self.n_candidates, random_state=self.random_state)), max_resources
+
+    def _schedule(self, n_candidates: int, max_resources: int, n_splits: int) -> List[int]:
+        """Increasing resource of every round; the last one always gets max_resources."""
+        n_rounds, alive = 1, n_candidates
+        while alive > 1:
+            alive = math.ceil(alive / self.factor)
+            n_rounds += 1
+        # every fold should still see a usable number of rows / trees
+        floor = 20 * n_splits if self.resource == "n_samples" else 10
+        min_resources = self.min_resources or max(floor, max_resources // self.factor ** (n_rounds - 1))
+        resources = [min(max_resources, min_resources * self.factor ** i) for i in range(n_rounds - 1)]
+        # once the resource is capped, the remaining candidates meet in one final round
+        return sorted(set(resources) | {max_resources})
+
+    def _fingerprint(self, candidates, X, y, resources) -> str:
+        digest = hashlib.sha1()
+        for part in (type(self.estimator).__name__, repr(self.estimator), repr(self.cv), repr(self.scoring),
+                     self.resource, self.factor, self.random_state, resources, _key({"c": candidates})):
+            digest.update(repr(part).encode())
+        # the training data itself, not just its shape: a refreshed dataset of
+        # the same size must not resume from scores measured on the old one
+        _hash_data(digest, X)
+        _hash_data(digest, np.asarray(y))
+        return digest.hexdigest()
+
+    # ---------------------------------------------------------------- state
+    def _load_state(self, fingerprint: str) -> Dict[str, Any]:
+        fresh = {"version": STATE_VERSION, "fingerprint": fingerprint, "scores": {}}
+        if not self.state_path or not os.path.exists(self.state_path):
+            return fresh
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION or state.get("fingerprint") != fingerprint:
+            if self.verbose:
+                print(f"Ignoring search state {self.state_path}: it belongs to a different search")
+            return fresh
+        if self.verbose:
+            print(f"Resuming from {self.state_path} ({sum(len(v) for v in state['scores'].values())} "
+                  f"candidate/resource scores)")
+        return state
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        with open(self.state_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    # ---------------------------------------------------------------- search
+    def _round_tasks(self, candidates, resource, X, y, order, n_samples):
+        """(candidate, params, train, test) fold tasks for one round."""
+        if self.resource == "n_samples":
+            rows = np.sort(order[:resource])
+            extra = {}
+        else:
+            rows = np.arange(n_samples)
+            extra = {self._resource_param(): resource}
+        cv = check_cv(self.cv, _take(y, rows), classifier=is_classifier(self.estimator))
+        splits = [(rows[train], rows[test]) for train, test in cv.split(_take(X, rows), _take(y, rows))]
+        return [(c, {**params, **extra}, train, test)
+                for c, params in candidates for train, test in splits], len(splits)
+
+    def fit(self, X, y):
+        start = time.perf_counter()
+        candidates, max_resources = self._candidates()
+        n_samples = len(y)
+        n_splits = check_cv(self.cv, y, classifier=is_classifier(self.estimator)).get_n_splits()
+        resources = self._schedule(len(candidates), max_resources or n_samples, n_splits)
+        order = np.random.RandomState(self.random_state).permutation(n_samples)
+
+        state = self._load_state(self._fingerprint(candidates, X, y, resources))
+        scores = state["scores"]  # {resource: {candidate key: mean fold score}}
+        chunk = max(1, effective_n_jobs(self.n_jobs))
+        parallel = Parallel(n_jobs=self.n_jobs, verbose=max(0, self.verbose - 1))
+
+        alive = list(enumerate(candidates))
+        self.cv_results_ = []
+        self.n_resources_, self.n_candidates_ = [], []
+        self.stopped_early_ = False
+        reached = None
+
+        for i, resource in enumerate(resources):
+            round_scores = scores.setdefault(str(resource), {})
+            todo = [(c, p) for c, p in alive if _key(p) not in round_scores]
+            tasks, folds = self._round_tasks(todo, resource, X, y, order, n_samples)
+
+            for s in range(0, len(tasks), chunk * folds):
+                if self.time_budget is not None and time.perf_counter() - start > self.time_budget:
+                    self.stopped_early_ = True
+                    break
+                batch = tasks[s:s + chunk * folds]
+                fold_scores = parallel(
+                    delayed(_fit_and_score)(self.estimator, params, X, y, train, test, self.scoring)
+                    for _, params, train, test in batch
+                )
+                for k in range(0, len(batch), folds):
+                    c = batch[k][0]
+                    round_scores[_key(candidates[c])] = float(np.mean(fold_scores[k:k + folds]))
+                self._save_state(state)
+
+            scored = [(round_scores[_key(p)], c) for c, p in alive if _key(p) in round_scores]
+            if not scored or (self.stopped_early_ and len(scored) < len(alive) and reached is not None):
+                # an unfinished round may not have scored the strongest candidates yet
+                if self.verbose:
+                    print(f"Time budget of {self.time_budget:.0f}s spent; keeping the best of round {i - 1}")
+                break
+            reached = (resource, scored)
+            self.n_resources_.append(resource)
+            self.n_candidates_.append(len(alive))
+            for score, c in scored:
+                self.cv_results_.append({"round": i, "resource": resource, "params": candidates[c],
+                                         "mean_test_score": score})
+            if self.verbose:
+                best_score = max(scored)[0]
+                print(f"round {i}: {len(alive)} candidates, {self.resource}={resource}, "
+                      f"best score {best_score:.4f} ({time.perf_counter() - start:.0f}s)")
+            if self.stopped_early_:
+                if self.verbose:
+                    print(f"Time budget of {self.time_budget:.0f}s spent; keeping the best of round {i}")
+                break
+
+            # survivors in rank order, so a budget-limited round scores the strongest first
+            keep = max(1, math.ceil(len(alive) / self.factor))
+            ranked = sorted(scored, key=lambda t: (-t[0], t[1]))
+            alive = [(c, candidates[c]) for _, c in ranked[:keep]]
+
+        if reached is None:
+            raise RuntimeError("Time budget spent before any candidate was scored")
+
+        best_score, best = min(reached[1], key=lambda t: (-t[0], t[1]))
+        self.best_index_ = best
+        self.best_params_ = candidates[best]
+        self.best_score_ = best_score
+        self.best_resource_ = reached[0]
+
+        final = dict(self.best_params_)
+        if self.resource == "n_estimators":
+            final[self._resource_param()] = resources[-1]
+        self.best_estimator_ = clone(self.estimator).set_params(**final).fit(X, y)
+        self.elapsed_ = time.perf_counter() - start
+        return self
@@ -2,22 +2,38 @@
 # Predict yield from user input with missing-value control
 
 import os
+import threading
+import weakref
 import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, List
+from src.serving import fast_path, forest, registry
 from .import config
 
+MODEL_NAME = "yield"
+
+
+def _validate_model(model):
+    """Smoke-test a freshly loaded model before it replaces the serving one."""
+    columns = list(model.feature_names_in_)
+    model.predict(pd.DataFrame([[np.nan] * len(columns)], columns=columns))
+
+
+registry.register(MODEL_NAME, config.MODEL_PATH, loader=forest.load_artifact, validate=_validate_model,
+                  watch=[forest.compiled_meta_path(config.MODEL_PATH)])
+
 
 def load_model(path=None):
     path = path or config.MODEL_PATH
     if not os.path.exists(path):
         raise FileNotFoundError("Model not found. Train the model first.")
+    if os.path.abspath(path) == os.path.abspath(config.MODEL_PATH):
+        return registry.get(MODEL_NAME)
     return joblib.load(path)
 
 
-def predict_single(input_dict: Dict[str, Any], model=None):
-    model = model or load_model()
+def _expected_columns(model):
     preprocessor = model.named_steps["preprocessor"]
 
     num_cols = []
@@ -30,25 +46,97 @@ def predict_single(input_dict: Dict[str, Any], model=None):
         elif name == "cat":
             cat_cols = list(cols)
 
-    expected_cols = num_cols + cat_cols
+    return num_cols + cat_cols
+
+
+def _is_missing(value) -> bool:
+    if value is None or (isinstance(value, float) and value != value):
+        return True
+    return not isinstance(value, (str, int, float)) and bool(pd.isna(value))
+
+
+class YieldPredictor:
+    """
+    Built once per loaded model: the expected input columns are read from the
+    preprocessor here, and the fast path's precomputed imputer fills and
+    one-hot category maps turn input dicts straight into the feature matrix.
+    Falls back to a DataFrame through the sklearn pipeline when the fast path
+    is disabled or the pipeline has steps it cannot reproduce.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.expected_columns = _expected_columns(model)
+        self.fast = fast_path.for_model(model)
+
+    def check(self, input_dict: Dict[str, Any]) -> None:
+        """Raise ValueError when too many expected inputs are absent or NaN."""
+        missing = sum(1 for c in self.expected_columns if _is_missing(input_dict.get(c)))
+        if missing > config.MAX_MISSING_ALLOWED:
+            raise ValueError(
+                f"Too many missing inputs ({missing}). "
+                f"Maximum allowed: {config.MAX_MISSING_ALLOWED}"
+            )
+
+    def features(self, input_dicts: List[Dict[str, Any]]) -> np.ndarray:
+        """Transformed feature matrix, identical to the pipeline's preprocessor output."""
+        if self.fast is not None:
+            return self.fast.transform(input_dicts)
+        return self.model.steps[0][1].transform(self._frame(input_dicts))
+
+    def predict(self, input_dicts: List[Dict[str, Any]]) -> np.ndarray:
+        if self.fast is not None:
+            return self.fast.predict(input_dicts)
+        return self.model.predict(self._frame(input_dicts))
+
+    def _frame(self, input_dicts):
+        cols = self.expected_columns
+        return pd.DataFrame([[d.get(c, np.nan) for c in cols] for d in input_dicts], columns=cols)
+
+
+_PREDICTORS = weakref.WeakKeyDictionary()
+_PREDICTORS_LOCK = threading.Lock()
+
+
+def predictor(model) -> YieldPredictor:
+    """YieldPredictor for `model`, kept for as long as the model object lives."""
+    with _PREDICTORS_LOCK:
+        compiled = _PREDICTORS.get(model)
+    if compiled is None:
+        compiled = YieldPredictor(model)
+        with _PREDICTORS_LOCK:
+            _PREDICTORS[model] = compiled
+    return compiled
+
+
+def predict_single(input_dict: Dict[str, Any], model=None):
+    compiled = predictor(model or load_model())
+    compiled.check(input_dict)
+    return float(compiled.predict([input_dict])[0])
+
 
-    # Missing input check
-    missing = [
-        c for c in expected_cols 
-        if c not in input_dict or pd.isna(input_dict.get(c))
-    ]
+def predict_batch(input_dicts: List[Dict[str, Any]], model=None):
+    """
+    Batch version of predict_single: one model.predict over all valid rows.
+    Results keep input order; rows that fail validation get {"error": ...}.
+    """
+    compiled = predictor(model or load_model())
 
-    if len(missing) > config.MAX_MISSING_ALLOWED:
-        raise ValueError(
-            f"Too many missing inputs ({len(missing)}). "
-            f"Maximum allowed: {config.MAX_MISSING_ALLOWED}"
-        )
+    results = [None] * len(input_dicts)
+    rows, positions = [], []
+    for i, input_dict in enumerate(input_dicts):
+        try:
+            compiled.check(input_dict)
+            rows.append(input_dict)
+            positions.append(i)
+        except ValueError as e:
+            results[i] = {"error": str(e)}
 
-    row = {c: input_dict.get(c, np.nan) for c in expected_cols}
-    X = pd.DataFrame([row])
+    if rows:
+        for i, pred in zip(positions, compiled.predict(rows)):
+            results[i] = {"predicted_yield": float(pred)}
 
-    pred = model.predict(X)
-    return float(pred[0])
+    return results
 
 
 if __name__ == "__main__":
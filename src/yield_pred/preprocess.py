@@ -4,11 +4,11 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 import joblib
+from src.training.matrices import categorical_encoder, sparse_threshold
 from .import config
 
 
@@ -18,7 +18,11 @@ def load_data(path: str = None):
     return df
 
 
-def build_preprocessing_pipeline(df: pd.DataFrame):
+def build_preprocessing_pipeline(df: pd.DataFrame, encoding: str = "onehot"):
+    """
+    encoding: "onehot" (dense), "sparse" (sparse float32 one-hot) or
+    "ordinal" (one float32 code per categorical column).
+    """
     # Identify numeric and categorical columns
     numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
 
@@ -42,7 +46,7 @@ def build_preprocessing_pipeline(df: pd.DataFrame):
     # categorical transformer
     categorical_transformer = Pipeline(steps=[
         ("imputer", SimpleImputer(strategy="most_frequent")),
-        ("ohe", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
+        ("ohe", categorical_encoder(encoding))
     ])
 
     preprocessor = ColumnTransformer(
@@ -50,7 +54,8 @@ def build_preprocessing_pipeline(df: pd.DataFrame):
             ("num", numeric_transformer, numeric_cols),
             ("cat", categorical_transformer, categorical_cols),
         ],
-        remainder="drop"
+        remainder="drop",
+        sparse_threshold=sparse_threshold(encoding)
     )
 
     feature_info = {
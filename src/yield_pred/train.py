@@ -1,50 +1,91 @@
 # train.py
-# Train Random Forest model with preprocessing pipeline
+# Train Random Forest (or gradient-boosted) model with preprocessing pipeline
 
+import functools
 import joblib
 import os
+import time
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import GridSearchCV
 from sklearn.metrics import mean_squared_error, r2_score
+from src.training.estimators import ESTIMATORS, boosted_estimator, categorical_mask, check_export, \
+    default_encoding, search_space
+from src.training.matrices import ENCODINGS, fit_search_shared
+from src.training.search import RESOURCES, SuccessiveHalving
 from .import config
 from .preprocess import load_data, build_preprocessing_pipeline, train_test_split_df
 
 
-def train_and_save(model_path=None):
+PARAM_GRID = {
+    "model__n_estimators": [100, 200],
+    "model__max_depth": [8, 16, None],
+    "model__min_samples_leaf": [1, 2, 4],
+}
+
+
+def build_model(estimator="forest", encoding="onehot", feature_info=None):
+    """
+    Unfitted regressor for `estimator`. Boosted models get native categorical
+    splits when `encoding` is ordinal (feature_info from
+    build_preprocessing_pipeline says which columns are categorical).
+    """
+    if estimator == "forest":
+        return RandomForestRegressor(random_state=config.RANDOM_STATE)
+    categorical = categorical_mask(encoding, feature_info["numeric_cols"], feature_info["categorical_cols"])
+    return boosted_estimator(estimator, "regressor", categorical=categorical, random_state=config.RANDOM_STATE)
+
+
+def train_and_save(model_path=None, mmap=False, encoding=None, shared_cv=False, param_grid=None, n_jobs=-1,
+                   search="grid", resource="n_estimators", time_budget=None, estimator="forest"):
+    """
+    estimator: "forest" (RandomForestRegressor), "hist_gb" or "xgboost"
+    (gradient boosting, see src/training/estimators.py).
+    encoding: categorical encoding, see build_preprocessing_pipeline;
+    defaults to onehot for forests and ordinal (native categorical splits)
+    for boosted models.
+    shared_cv: encode the training split once into a float32 matrix that
+    all GridSearchCV workers memory-map, instead of re-encoding per fit.
+    search: "grid" (exhaustive GridSearchCV) or "halving" (successive halving
+    over `resource`, stopping after `time_budget` seconds).
+    """
     model_path = model_path or config.MODEL_PATH
+    encoding = encoding or default_encoding(estimator)
+    check_export(estimator, mmap)
 
     df = load_data()
-    preprocessor, feature_info = build_preprocessing_pipeline(df)
+    preprocessor, feature_info = build_preprocessing_pipeline(df, encoding=encoding)
 
     X_train, X_test, y_train, y_test = train_test_split_df(df)
 
-    model = RandomForestRegressor(random_state=config.RANDOM_STATE)
+    model = build_model(estimator, encoding, feature_info)
 
     pipeline = Pipeline([
         ("preprocessor", preprocessor),
         ("model", model),
     ])
 
-    param_grid = {
-        "model__n_estimators": [100, 200],
-        "model__max_depth": [8, 16, None],
-        "model__min_samples_leaf": [1, 2, 4],
-    }
-
-    print("Running GridSearch...")
-    grid = GridSearchCV(
-        pipeline, param_grid,
-        cv=config.CV_FOLDS,
-        scoring="neg_mean_squared_error",
-        n_jobs=-1,
-        verbose=1
-    )
-
-    grid.fit(X_train, y_train)
-
-    best_model = grid.best_estimator_
+    param_grid = param_grid or (PARAM_GRID if estimator == "forest" else search_space(estimator, "model"))
+    search_kwargs = dict(cv=config.CV_FOLDS, scoring="neg_mean_squared_error", n_jobs=n_jobs, verbose=1)
+
+    if search == "halving":
+        # progress is kept next to the model, so an interrupted search resumes
+        search_cls = functools.partial(SuccessiveHalving, resource=resource, time_budget=time_budget,
+                                       state_path=os.path.splitext(model_path)[0] + "_search.json",
+                                       random_state=config.RANDOM_STATE)
+    else:
+        search_cls = GridSearchCV
+
+    print(f"Running {search} search ({estimator}, {encoding} encoding{', shared CV matrix' if shared_cv else ''})...")
+    start = time.perf_counter()
+    if shared_cv:
+        best_model, grid = fit_search_shared(search_cls, pipeline, param_grid, X_train, y_train, **search_kwargs)
+    else:
+        grid = search_cls(pipeline, param_grid, **search_kwargs)
+        grid.fit(X_train, y_train)
+        best_model = grid.best_estimator_
+    print(f"Search took {time.perf_counter() - start:.1f}s, best CV score {grid.best_score_:.4f}")
     print("Best Params:", grid.best_params_)
 
     y_pred = best_model.predict(X_test)
@@ -58,8 +99,36 @@ def train_and_save(model_path=None):
     joblib.dump(best_model, model_path)
     print("Model saved at:", model_path)
 
+    if mmap:
+        # memory-mappable arrays next to the pickle, shared by all API workers
+        from src.serving.forest import compiled_dir, export_artifact
+        export_artifact(model_path, obj=best_model)
+        print("Memory-mappable forest saved at:", compiled_dir(model_path))
+
     return best_model
 
 
 if __name__ == "__main__":
-    train_and_save()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train crop yield model.")
+    parser.add_argument("--mmap", action="store_true", help="Also export a memory-mappable compiled forest.")
+    parser.add_argument("--model-path", default=config.MODEL_PATH, help="Path to save the trained pipeline.")
+    parser.add_argument("--estimator", choices=ESTIMATORS, default="forest",
+                        help="Random forest or gradient boosting (xgboost must be installed separately).")
+    parser.add_argument("--encoding", choices=ENCODINGS, default=None,
+                        help="Categorical encoding (default: onehot for forests, ordinal for boosting).")
+    parser.add_argument("--shared-cv", action="store_true",
+                        help="Encode the training split once into a float32 matrix memory-mapped by all CV workers.")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Search worker processes.")
+    parser.add_argument("--search", choices=["grid", "halving"], default="grid",
+                        help="Exhaustive grid search or successive halving.")
+    parser.add_argument("--resource", choices=RESOURCES, default="n_estimators",
+                        help="What successive halving grows between rounds.")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Stop successive halving after this many seconds and keep the best so far.")
+    args = parser.parse_args()
+
+    train_and_save(model_path=args.model_path, mmap=args.mmap, encoding=args.encoding, shared_cv=args.shared_cv,
+                   n_jobs=args.n_jobs, search=args.search, resource=args.resource, time_budget=args.time_budget,
+                   estimator=args.estimator)
@@ -0,0 +1,40 @@
+# tests/conftest.py
+# Shared fixtures. Every model is fitted here from the CSVs under data/,
+# so the suite never depends on artifacts in models/.
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+IRRIGATION_CSV = os.path.join(ROOT_DIR, "data", "scheduler", "processed", "irrigation_clean.csv")
+CROP_CSV = os.path.join(ROOT_DIR, "data", "recommendation", "raw", "Crop_recommendation.csv")
+
+
+@pytest.fixture(scope="session")
+def irrigation_frame() -> pd.DataFrame:
+    return pd.read_csv(IRRIGATION_CSV)
+
+
+@pytest.fixture(scope="session")
+def irrigation_model(irrigation_frame):
+    """The tree train_model.py fits, on the columns the scheduler serves."""
+    from src.irrigation_scheduler.scheduler import FEATURE_COLUMNS
+    model = DecisionTreeClassifier(max_depth=5, min_samples_leaf=20, random_state=42)
+    return model.fit(irrigation_frame[FEATURE_COLUMNS], irrigation_frame["irrigation_needed"])
+
+
+@pytest.fixture(scope="session")
+def crop_frame() -> pd.DataFrame:
+    return pd.read_csv(CROP_CSV)
+
+
+def with_missing(X: pd.DataFrame, fraction: float = 0.05, seed: int = 0) -> pd.DataFrame:
+    """Copy of numeric frame `X` with a random `fraction` of its cells set to NaN."""
+    X = X.copy()
+    mask = np.random.default_rng(seed).random(X.shape) < fraction
+    X[mask] = np.nan
+    return X
@@ -0,0 +1,65 @@
+import gzip
+import sys
+
+import numpy as np
+import pytest
+
+from src.irrigation_scheduler import data_generation as gen
+
+
+@pytest.mark.parametrize("header", [True, False])
+@pytest.mark.parametrize("seed", [0, 1, 42])
+def test_csv_bytes_matches_to_csv(seed, header):
+    chunk = gen.generate(5000, seed=seed)
+    assert gen.csv_bytes(chunk, header=header) == chunk.to_csv(index=False, header=header).encode()
+
+
+def test_csv_bytes_with_skewed_crops():
+    # some categories never drawn: codes index a table that still lists every crop
+    chunk = gen.generate(2000, seed=3, crop_weights={"Wheat": 1, "Paddy": 3})
+    assert gen.csv_bytes(chunk, header=True) == chunk.to_csv(index=False).encode()
+
+
+def test_csv_bytes_falls_back_outside_two_digit_range():
+    chunk = gen.generate(100, seed=0)
+    chunk.loc[3, "temperature"] = 9.99
+    chunk.loc[5, "humidity"] = 100.0
+    assert gen.csv_bytes(chunk, header=True) == chunk.to_csv(index=False).encode()
+
+
+def test_csv_bytes_empty_chunk():
+    chunk = gen.generate(10, seed=0).iloc[:0]
+    assert gen.csv_bytes(chunk, header=False) == b""
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".csv.gz"])
+def test_write_streams_the_same_rows(tmp_path, suffix):
+    path = str(tmp_path / f"readings{suffix}")
+    assert gen.write(path, 2500, seed=7, chunk_rows=1000) == 2500
+    opener = gzip.open if suffix.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        text = f.read()
+    assert text == gen.generate(2500, seed=7, chunk_rows=1000).to_csv(index=False).encode()
+
+
+def test_generation_matches_labelling_rule():
+    df = gen.generate(20000, seed=5)
+    thresholds = df["crop_type"].map(gen.CROP_THRESHOLDS).astype(float)
+    expected = ((df["soil_moisture"] < thresholds) & (df["rain_forecast"] == 0)).astype(np.int64)
+    np.testing.assert_array_equal(df["irrigation_needed"], expected)
+
+
+def test_write_zero_rows_keeps_the_header(tmp_path):
+    path = str(tmp_path / "empty.csv")
+    assert gen.write(path, 0) == 0
+    with open(path, "rb") as f:
+        assert f.read() == gen.generate(0).to_csv(index=False).encode()
+
+
+@pytest.mark.parametrize("name, module", [("readings.parquet", "pyarrow"), ("readings.csv.zst", "zstandard")])
+def test_missing_writer_dependency_fails_before_writing(tmp_path, monkeypatch, name, module):
+    monkeypatch.setitem(sys.modules, module, None)  # import raises ImportError
+    path = tmp_path / "out" / name
+    with pytest.raises(RuntimeError, match=module):
+        gen.write(str(path), 10)
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,96 @@
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+
+from src.serving import fast_path
+
+from .conftest import ROOT_DIR, with_missing
+
+
+def _records_with_gaps(X: pd.DataFrame, categorical, seed=0):
+    """Rows as dicts, some with None / NaN values and categories never seen in training."""
+    records = X.to_dict("records")
+    rng = np.random.default_rng(seed)
+    columns = list(X.columns)
+    for i, record in enumerate(records):
+        if i % 7 == 0:
+            record[columns[rng.integers(len(columns))]] = None
+        if i % 11 == 0:
+            record[columns[rng.integers(len(columns))]] = np.nan
+        if i % 13 == 0 and categorical:
+            record[categorical[rng.integers(len(categorical))]] = "never-seen"
+    return records
+
+
+@pytest.fixture(scope="module")
+def yield_frame():
+    from src.yield_pred.preprocess import load_data
+    return load_data().sample(4000, random_state=0)
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "sparse", "ordinal"])
+def test_yield_pipeline_arrays_match_sklearn(yield_frame, encoding):
+    from src.yield_pred.preprocess import build_preprocessing_pipeline
+    preprocessor, info = build_preprocessing_pipeline(yield_frame, encoding=encoding)
+    features = info["numeric_cols"] + info["categorical_cols"]
+    pipeline = Pipeline([("preprocessor", preprocessor),
+                         ("model", RandomForestRegressor(n_estimators=5, max_depth=10, random_state=0))])
+    pipeline.fit(yield_frame[features], yield_frame[info["target_col"]])
+
+    records = _records_with_gaps(yield_frame[features].iloc[:500], info["categorical_cols"])
+    fast = fast_path.fast_model(pipeline)
+    assert isinstance(fast, fast_path.PipelineArrays)
+    expected = pipeline.predict(pd.DataFrame(records, columns=features))
+    np.testing.assert_array_equal(fast.predict(records), expected)
+
+
+@pytest.fixture(scope="module")
+def fertilizer_preprocess():
+    # the fertilizer scripts import their siblings by bare name
+    sys.path.insert(0, os.path.join(ROOT_DIR, "src", "fertilizer_recom"))
+    return importlib.import_module("preprocess")
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "ordinal"])
+def test_fertilizer_pipeline_arrays_match_sklearn(fertilizer_preprocess, encoding):
+    df = fertilizer_preprocess.load_data().sample(5000, random_state=0)
+    df.columns = df.columns.str.strip()
+    prep = fertilizer_preprocess.prepare_train_test(df, target_col="Fertilizer Name", encoding=encoding)
+    pipeline = Pipeline([("preprocessor", prep["preprocessor"]),
+                         ("clf", RandomForestClassifier(n_estimators=5, max_depth=10, random_state=0))])
+    pipeline.fit(prep["X_train"], prep["y_train"])
+
+    features = prep["feature_columns"]
+    records = _records_with_gaps(prep["X_test"], prep["categorical_cols"])
+    fast = fast_path.fast_model(pipeline)
+    assert isinstance(fast, fast_path.PipelineArrays)
+    frame = pd.DataFrame(records, columns=features)
+    np.testing.assert_array_equal(fast.transform(records),
+                                  np.asarray(pipeline[0].transform(frame), dtype=np.float64))
+    np.testing.assert_array_equal(fast.predict_proba(records), pipeline.predict_proba(frame))
+
+
+def test_array_model_matches_sklearn(crop_frame):
+    X = with_missing(crop_frame.drop(columns="label"))
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, crop_frame["label"])
+    fast = fast_path.fast_model(model)
+    assert isinstance(fast, fast_path.ArrayModel)
+    records = X.to_dict("records")
+    np.testing.assert_array_equal(fast.predict_proba(records), model.predict_proba(X))
+    # one-row calls go through the per-thread row buffer
+    for i in range(5):
+        np.testing.assert_array_equal(fast.predict_proba(records[i:i + 1]), model.predict_proba(X.iloc[i:i + 1]))
+
+
+def test_feature_order_mismatch_is_cached_as_unsupported(crop_frame, monkeypatch):
+    X = crop_frame.drop(columns="label")
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, crop_frame["label"])
+    monkeypatch.setattr(fast_path.config, "FAST_PATH_ENABLED", True)
+    assert fast_path.for_model(model, list(reversed(X.columns))) is None
+    assert fast_path._FAST_MODELS[model] is fast_path._UNSUPPORTED
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.irrigation_scheduler import rules
+from src.irrigation_scheduler.fleet import DECISIONS, READING_COLUMNS, FleetScheduler, record_source
+from src.irrigation_scheduler.scheduler import FEATURE_COLUMNS
+
+
+def _readings(n_fields=40, ticks=30, seed=0) -> pd.DataFrame:
+    """Probe time series with gaps: forecast every 4th tick, crop only on the first."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    moisture = rng.uniform(10, 80, n_fields)
+    for tick in range(ticks):
+        moisture = np.clip(moisture + rng.normal(-1.5, 4, n_fields), 10, 80)
+        reporting = rng.random(n_fields) < 0.8
+        frames.append(pd.DataFrame({
+            "timestamp": tick,
+            "field_id": np.array([f"f{i}" for i in range(n_fields)], dtype=object),
+            "soil_moisture": np.where(rng.random(n_fields) < 0.1, np.nan, np.round(moisture, 2)),
+            "temperature": np.round(rng.uniform(20, 45, n_fields), 2),
+            "humidity": np.round(rng.uniform(20, 90, n_fields), 2),
+            "rain_forecast": (rng.random(n_fields) < 0.3).astype(float) if tick % 4 == 0 else np.nan,
+            "crop_type_encoded": rng.integers(0, 11, n_fields).astype(float) if tick == 0 else np.nan,
+        })[reporting])
+    readings = pd.concat(frames, ignore_index=True)[READING_COLUMNS]
+    # interleave fields within each tick
+    return readings.sample(frac=1, random_state=seed).sort_values("timestamp", kind="stable")
+
+
+def _naive_changes(readings: pd.DataFrame, model) -> pd.DataFrame:
+    """One reading at a time: merge into the field's state, predict, emit on change."""
+    state, decision, changes = {}, {}, []
+    for row in readings.itertuples(index=False):
+        known = state.setdefault(row.field_id, {})
+        for name in FEATURE_COLUMNS:
+            value = getattr(row, name)
+            if not pd.isna(value):
+                known[name] = float(value)
+        if len(known) < len(FEATURE_COLUMNS):
+            continue
+        label = DECISIONS[int(model.predict(pd.DataFrame([known], columns=FEATURE_COLUMNS))[0] == 1)]
+        if decision.get(row.field_id) != label:
+            decision[row.field_id] = label
+            changes.append((row.timestamp, row.field_id, label))
+    return pd.DataFrame(changes, columns=["timestamp", "field_id", "decision"])
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+@pytest.mark.parametrize("batch_rows", [1, 97, 100000])
+def test_engine_matches_naive_loop(irrigation_model, monkeypatch, compiled, batch_rows):
+    if not compiled:
+        monkeypatch.setattr(rules, "for_model", lambda model: None)
+    readings = _readings()
+    expected = _naive_changes(readings, irrigation_model)
+
+    engine = FleetScheduler(model=irrigation_model)
+    records = readings.itertuples(index=False, name=None)
+    changes = list(engine.run(record_source(records, batch_rows=batch_rows)))
+    got = pd.concat(changes, ignore_index=True) if changes else expected.iloc[:0]
+
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(got.astype(object), expected.astype(object))
+    assert engine.stats()["readings"] == len(readings)
+    assert engine.stats()["fields"] == readings["field_id"].nunique()
@@ -0,0 +1,135 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from src.serving import config
+from src.serving.forest import CompiledForest, compile_forest, export_artifact, load_artifact, load_compiled
+from src.serving.prune import truncate_forest
+
+from .conftest import with_missing
+
+
+@pytest.fixture(scope="module")
+def crop_xy(crop_frame):
+    return with_missing(crop_frame.drop(columns="label")), crop_frame["label"]
+
+
+@pytest.fixture(scope="module")
+def crop_forest(crop_xy):
+    X, y = crop_xy
+    return RandomForestClassifier(n_estimators=30, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def rainfall_forest(crop_xy):
+    X, _ = crop_xy
+    X = X.dropna(subset=["rainfall"])
+    return RandomForestRegressor(n_estimators=20, max_depth=12, random_state=0).fit(
+        X.drop(columns="rainfall"), X["rainfall"])
+
+
+def test_classifier_matches_sklearn_bit_for_bit(crop_forest, crop_xy):
+    X, _ = crop_xy
+    compiled = compile_forest(crop_forest)
+    np.testing.assert_array_equal(compiled.predict_proba(X), crop_forest.predict_proba(X))
+    np.testing.assert_array_equal(compiled.predict(X), crop_forest.predict(X))
+
+
+def test_regressor_matches_sklearn_bit_for_bit(rainfall_forest, crop_xy):
+    X, _ = crop_xy
+    X = X.drop(columns="rainfall")
+    compiled = compile_forest(rainfall_forest)
+    np.testing.assert_array_equal(compiled.predict(X), rainfall_forest.predict(X))
+    assert not hasattr(compiled, "predict_proba")
+
+
+def test_single_tree_matches_sklearn(crop_xy):
+    X, y = crop_xy
+    tree = DecisionTreeClassifier(random_state=0).fit(X, y)
+    np.testing.assert_array_equal(compile_forest(tree).predict_proba(X), tree.predict_proba(X))
+
+
+def test_row_blocks_do_not_change_results(crop_forest, crop_xy, monkeypatch):
+    X, _ = crop_xy
+    expected = crop_forest.predict_proba(X)
+    # blocks and tree chunks that don't divide the row / tree counts
+    monkeypatch.setattr(CompiledForest, "BLOCK_ROWS", 97)
+    monkeypatch.setattr(CompiledForest, "GATHER_BYTES", 3 * 97 * expected.shape[1] * 8)
+    compiled = compile_forest(crop_forest)
+    np.testing.assert_array_equal(compiled.predict_proba(X), expected)
+    assert compiled.apply(X[:0]).shape == (crop_forest.n_estimators, 0)
+    assert compiled.predict_proba(X[:0]).shape == (0, expected.shape[1])
+
+
+@pytest.mark.parametrize("mmap_mode", [None, "r"])
+def test_save_load_round_trip(crop_forest, crop_xy, tmp_path, mmap_mode):
+    X, _ = crop_xy
+    compile_forest(crop_forest).save(str(tmp_path))
+    loaded = CompiledForest.load(str(tmp_path), mmap_mode=mmap_mode)
+    np.testing.assert_array_equal(loaded.predict_proba(X), crop_forest.predict_proba(X))
+
+
+def test_exported_pipeline_matches_sklearn(crop_xy, tmp_path):
+    X, y = crop_xy
+    pipeline = Pipeline([("scale", StandardScaler()),
+                         ("model", RandomForestClassifier(n_estimators=10, random_state=0))]).fit(X, y)
+    artifact = tmp_path / "crop_model.pkl"
+    joblib.dump(pipeline, artifact)
+    export_artifact(artifact)
+    served = load_compiled(artifact, mmap_mode="r")
+    np.testing.assert_array_equal(served.predict_proba(X), pipeline.predict_proba(X))
+    np.testing.assert_array_equal(served.predict(X), pipeline.predict(X))
+
+
+def test_large_batches_go_to_the_pickled_estimator(crop_forest, crop_xy, tmp_path, monkeypatch):
+    X, _ = crop_xy
+    monkeypatch.setattr(config, "FOREST_BACKEND", "auto")
+    monkeypatch.setattr(config, "FOREST_SKLEARN_BATCH_ROWS", 100)
+    artifact = tmp_path / "crop_model.pkl"
+    joblib.dump(crop_forest, artifact)
+    export_artifact(artifact)
+
+    served = load_artifact(artifact)
+    assert isinstance(served, CompiledForest)
+    np.testing.assert_array_equal(served.predict_proba(X[:99]), crop_forest.predict_proba(X[:99]))
+    assert served._sklearn is None  # small batches never unpickle
+    np.testing.assert_array_equal(served.predict_proba(X), crop_forest.predict_proba(X))
+    np.testing.assert_array_equal(served.predict(X), crop_forest.predict(X))
+    assert isinstance(served._sklearn, RandomForestClassifier)
+
+
+def test_batch_fallback_skips_replaced_pickles(crop_forest, crop_xy, tmp_path, monkeypatch):
+    X, _ = crop_xy
+    monkeypatch.setattr(config, "FOREST_SKLEARN_BATCH_ROWS", 100)
+    artifact = tmp_path / "crop_model.pkl"
+    joblib.dump(crop_forest, artifact)
+    export_artifact(artifact)
+    served = load_artifact(artifact)
+
+    stat = artifact.stat()
+    os.utime(artifact, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    np.testing.assert_array_equal(served.predict_proba(X), crop_forest.predict_proba(X))
+    assert served._sklearn is False
+
+
+def test_untruncated_prune_is_identical(crop_forest, crop_xy):
+    X, _ = crop_xy
+    compiled = compile_forest(crop_forest)
+    np.testing.assert_array_equal(truncate_forest(compiled).predict_proba(X), compiled.predict_proba(X))
+
+
+def test_truncated_prefix_matches_first_trees(crop_forest, crop_xy):
+    X, _ = crop_xy
+    # sklearn's predict_proba: per-tree probabilities summed in order, then divided
+    expected = np.zeros((len(X), crop_forest.n_classes_))
+    for tree in crop_forest.estimators_[:10]:
+        expected += tree.predict_proba(X.to_numpy())
+    expected /= 10
+    pruned = truncate_forest(compile_forest(crop_forest), n_trees=10)
+    np.testing.assert_array_equal(pruned.predict_proba(X), expected)
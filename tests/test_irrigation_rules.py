@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from src.irrigation_scheduler import rules
+from src.irrigation_scheduler.scheduler import FEATURE_COLUMNS
+
+
+def _assert_identical(model, compiled, X):
+    assert rules.check_equivalence(model, compiled, X) == []
+
+
+def test_rules_match_model_on_full_training_csv(irrigation_model, irrigation_frame):
+    compiled = rules.CompiledRules(irrigation_model)
+    _assert_identical(irrigation_model, compiled, irrigation_frame[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+
+
+def test_rules_match_model_on_threshold_boundaries(irrigation_model):
+    compiled = rules.CompiledRules(irrigation_model)
+    _assert_identical(irrigation_model, compiled, rules._boundary_cases(irrigation_model, 2000))
+
+
+def test_rules_match_deep_tree_with_missing_values(irrigation_frame):
+    # unbounded depth and NaNs in training exercise every split and missing_go_to_left
+    X = irrigation_frame[FEATURE_COLUMNS].copy()
+    X[np.random.default_rng(1).random(X.shape) < 0.05] = np.nan
+    model = DecisionTreeClassifier(random_state=0).fit(X, irrigation_frame["irrigation_needed"])
+    compiled = rules.CompiledRules(model)
+    _assert_identical(model, compiled, X.to_numpy(dtype=np.float64))
+    _assert_identical(model, compiled, rules._boundary_cases(model, 2000))
+
+
+@pytest.mark.parametrize("n", [1, rules.VECTORIZE_FROM - 1, rules.VECTORIZE_FROM, 500])
+def test_predict_on_records_matches_model(irrigation_model, irrigation_frame, n):
+    compiled = rules.CompiledRules(irrigation_model)
+    frame = irrigation_frame[FEATURE_COLUMNS].iloc[:n]
+    expected = irrigation_model.predict(frame)
+    np.testing.assert_array_equal(compiled.predict(frame.to_dict("records")), expected)
+
+
+@pytest.mark.parametrize("threshold", [0.1, 1.0 / 3.0, 45.005, 1e-8, -2.5, 16777217.0])
+def test_float32_cutoff_agrees_with_float32_comparison(threshold):
+    op, cutoff = rules.float32_cutoff(threshold)
+    f = np.float32(cutoff)
+    probes = [cutoff, np.nextafter(cutoff, -np.inf), np.nextafter(cutoff, np.inf), threshold,
+              float(f), float(np.nextafter(f, np.float32(np.inf))), float(np.nextafter(f, np.float32(-np.inf)))]
+    for x in probes:
+        # sklearn compares the float32 feature with the float64 threshold in float64
+        expected = float(np.float32(x)) <= threshold
+        assert (x <= cutoff if op == "<=" else x < cutoff) == expected, x
@@ -0,0 +1,37 @@
+import asyncio
+
+from api.core.microbatch import MicroBatcher
+
+
+def _square_rows(rows):
+    for row in rows:
+        if row < 0:
+            raise ValueError(f"negative input {row}")
+    return [row * row for row in rows]
+
+
+def _submit_all(batcher, items):
+    async def run():
+        return await asyncio.gather(*(batcher.submit(item) for item in items), return_exceptions=True)
+    return asyncio.run(run())
+
+
+def test_coalesced_requests_get_their_own_results():
+    batcher = MicroBatcher("test_squares", _square_rows, max_wait_ms=50, max_size=64, enabled=True)
+    assert _submit_all(batcher, list(range(10))) == [i * i for i in range(10)]
+    assert batcher.stats()["batches"] == 1
+
+
+def test_failing_row_only_fails_its_own_request():
+    batcher = MicroBatcher("test_squares_failing", _square_rows, max_wait_ms=50, max_size=64, enabled=True)
+    results = _submit_all(batcher, [1, 2, -3, 4])
+    assert results[:2] == [1, 4] and results[3] == 16
+    assert isinstance(results[2], ValueError)
+    assert batcher.stats()["failed_batches"] == 1
+
+
+def test_wrong_result_count_fails_every_request():
+    batcher = MicroBatcher("test_short", lambda rows: [], max_wait_ms=50, enabled=True)
+    results = _submit_all(batcher, [1, 2])
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert "0 results for 1 items" in str(results[0])
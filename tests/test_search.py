@@ -0,0 +1,25 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.training.search import SuccessiveHalving, _key
+
+
+def test_key_treats_numpy_scalars_as_python_values():
+    assert _key({"depth": np.int64(3), "frac": np.float32(0.5), "boot": np.bool_(True)}) == \
+        _key({"depth": 3, "frac": 0.5, "boot": True})
+
+
+def test_numpy_grids_resume_from_state(crop_frame, tmp_path):
+    X, y = crop_frame.drop(columns="label"), crop_frame["label"]
+    state = str(tmp_path / "search.json")
+
+    def search():
+        return SuccessiveHalving(RandomForestClassifier(random_state=0),
+                                 {"max_depth": np.arange(2, 12), "n_estimators": [4, 12]},
+                                 resource="n_estimators", n_candidates=6, cv=3, state_path=state).fit(X, y)
+
+    first = search()
+    assert isinstance(first.best_params_["max_depth"], np.integer)
+    second = search()
+    assert second.best_params_ == first.best_params_
+    assert second.best_score_ == first.best_score_